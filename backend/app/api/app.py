@@ -6,34 +6,52 @@ import os
 from dotenv import load_dotenv
 load_dotenv()
 from fastapi import FastAPI, APIRouter, Query, Request, WebSocket, WebSocketDisconnect, Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
 import asyncio
+import json
 import time
+import logging
 from collections import defaultdict
+from contextlib import asynccontextmanager
 from uuid import uuid4
 from datetime import datetime, timezone
-import re
 from backend.app.clients.web_search_client import WebSearchClient
-from backend.app.clients.fourchan_client import FourChanClient
 from backend.app.preproc.cleaner import DataCleaner
+from backend.app.preproc.dedupe import DataDeduper
 from backend.app.nlp.sentiment import SentimentEnsemble
-from backend.app.clients.reddit_client import RedditClient
-from backend.app.clients.x_client import XClient
-from backend.app.clients.slack_client import SlackClient
 from backend.app.clients.openrouter_client import OpenRouterClient
+from backend.app.ingest.async_ingest import AsyncIngestor
+from backend.app.ingest.watermarks import INGEST_INCREMENTAL, get_watermark_store
 from backend.app.nlp.llm_prompts import SYSTEM_PROMPT
+from backend.app.nlp.ticker_matcher import get_ticker_matcher
 import httpx
+from backend.app.services.pg_store import get_pg_store
 from backend.app.services.supabase_store import get_watchlist as sb_get_watchlist, add_ticker as sb_add_ticker, remove_ticker as sb_remove_ticker, store_signals as sb_store_signals
+from backend.app.rag.index_service import save_index_service
 from backend.app.rag.langchain_rag import RAGPipeline
+from backend.app.rag.pgvector_retriever import get_pgvector_index, recent_window
+from backend.app.services.broadcast_hub import BroadcastHub
+from backend.app.services.signal_aggregator import BEARISH_THRESHOLD, BULLISH_THRESHOLD, get_signal_aggregator
+
+logger = logging.getLogger("api")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Adds since the last periodic RAG snapshot (up to RAG_SNAPSHOT_INTERVAL seconds) would be lost on exit
+    await asyncio.to_thread(save_index_service)
+
 
 app = FastAPI(
     title="MarketSentinel API",
     description="Production-oriented prototype for multi-source market sentiment, event extraction, and backtesting.",
     version="0.1.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS for frontend integration
@@ -53,6 +71,8 @@ RATE_LIMIT = int(os.getenv("RATE_LIMIT", "100"))
 RATE_PERIOD = int(os.getenv("RATE_PERIOD", "60"))  # seconds
 rate_limit_store = defaultdict(list)
 NEWS_CACHE_TTL = int(os.getenv("NEWS_CACHE_TTL", "60"))
+# Disable proxy buffering (nginx) so streamed tokens reach the client immediately
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
 _news_cache = {"ts": 0.0, "items": []}
 
 def check_rate_limit(ip: str, endpoint: str) -> bool:
@@ -75,20 +95,20 @@ TICKERS_DEFAULT = ["AAPL", "TSLA", "MSFT", "RELIANCE.NS"]
 
 # Helper aggregation
 
-def aggregate_signals_from_items(analyzed_items, tickers):
+def aggregate_signals_from_items(analyzed_items, tickers, bullish=BULLISH_THRESHOLD, bearish=BEARISH_THRESHOLD):
     per_ticker = {t: {"score_sum": 0.0, "count": 0} for t in tickers}
+    # One precompiled pass per item finds every mentioned ticker
+    matcher = get_ticker_matcher(tickers)
     for item in analyzed_items:
-        text = item.get("text", "")
-        for t in tickers:
-            if re.search(rf"\b{re.escape(t.split('.')[0])}\b", text, flags=re.IGNORECASE):
-                per_ticker[t]["score_sum"] += float(item.get("sentiment", 0.0))
-                per_ticker[t]["count"] += 1
+        for t in matcher.find(item.get("text", "")):
+            per_ticker[t]["score_sum"] += float(item.get("sentiment", 0.0))
+            per_ticker[t]["count"] += 1
     signals = []
     now = datetime.now(timezone.utc).isoformat()
     for t, agg in per_ticker.items():
         count = max(agg["count"], 1)
         score = agg["score_sum"] / count
-        signal_type = "bullish" if score > 0.6 else ("bearish" if score < 0.4 else "neutral")
+        signal_type = "bullish" if score > bullish else ("bearish" if score < bearish else "neutral")
         confidence = abs(score - 0.5) * 2  # 0 to 1
         signals.append({
             "id": str(uuid4()),
@@ -103,55 +123,41 @@ def aggregate_signals_from_items(analyzed_items, tickers):
     return signals
 
 
-def get_latest_signals_from_sources(tickers):
-    fourchan = FourChanClient()
-    reddit = RedditClient()
+async def get_latest_signals_from_sources_async(tickers, consumer="default", progress=None):
+    """Ingest -> clean -> dedupe -> sentiment. `progress(event)` is called on the loop after each source
+    and stage finishes, e.g. {"stage": "source", "source": "reddit", "items": 12}.
+    `consumer=None` always takes a full snapshot, even with INGEST_INCREMENTAL on."""
+    report = progress or (lambda event: None)
     use_x = os.getenv("USE_X_SCRAPE", "false").lower() == "true"
-    xclient = XClient() if use_x else None
-    slack = SlackClient()
-    websearch = WebSearchClient()
+    # Incremental mode only emits items new since this consumer's previous refresh (see ingest/watermarks.py)
+    watermarks = get_watermark_store(consumer) if INGEST_INCREMENTAL and consumer else None
+    ingestor = AsyncIngestor(use_x=use_x, watermarks=watermarks)
     cleaner = DataCleaner()
+    # Stateless (no window): copies of a story across sources collapse to one item, but stories carried over
+    # from the previous refresh still count towards this refresh's signals
+    deduper = DataDeduper(mode="near")
     sentiment = SentimentEnsemble()
 
-    # 4chan
-    catalog = fourchan.fetch_board_catalog("biz")
-    posts = []
-    for page in catalog[:1]:
-        for thread in page.get("threads", []):
-            posts += fourchan.fetch_thread_posts("biz", thread.get("no"))
-    fourchan_items = [{**p, "text": p.get("com", ""), "source": "4chan"} for p in posts if p.get("com")]
-
-    # Reddit (fallback if Pushshift 403)
-    try:
-        reddit_items_raw = reddit.fetch_posts_for_tickers(tickers, max_results=20)
-        reddit_items = [{"text": p.get("title", "") + " " + p.get("selftext", ""), "source": "reddit"} for p in reddit_items_raw]
-    except Exception:
-        reddit_items = []
-
-    # X.com (optional)
-    x_items = []
-    if use_x and xclient is not None:
+    # All sources are fetched concurrently with per-source deadlines; slow sources return partial results
+    all_items = await ingestor.fetch_items(tickers, lambda source, n: report({"stage": "source", "source": source, "items": n}))
+    # Cleaning and model inference are CPU-bound; keep them off the event loop. Cleaning streams into dedupe.
+    unique = await asyncio.to_thread(deduper.dedupe, cleaner.iter_clean(all_items))
+    report({"stage": "dedupe", "items": len(unique)})
+    analyzed = await asyncio.to_thread(sentiment.compute_sentiment, unique)
+    report({"stage": "sentiment", "items": len(analyzed)})
+    # One COPY per cycle into raw_items/documents/nlp_results when DATABASE_URL is configured
+    pg_store = get_pg_store()
+    if pg_store.enabled:
         try:
-            x_items_raw = xclient.fetch_tweets_for_tickers(tickers, max_results=20)
-            x_items = [{"text": t.get("content", ""), "source": "x.com"} for t in x_items_raw]
-        except Exception:
-            x_items = []
-
-    # Slack
-    slack_items = []
-    for ticker in tickers:
-        try:
-            slack_items += [{"text": m.get("text", ""), "source": "slack"} for m in slack.fetch_messages_for_tickers("general", [ticker], max_results=10)]
-        except Exception:
-            pass
+            await pg_store.persist(analyzed, tickers)
+        except Exception as e:
+            logger.warning(f"Postgres persist failed: {e}")
+    return analyzed
 
-    # Google News
-    news_items = [{"text": n.get("title", "") + " " + n.get("summary", ""), "source": "news"} for n in websearch.fetch_news_for_tickers(tickers, max_results=10)]
 
-    all_items = fourchan_items + reddit_items + x_items + slack_items + news_items
-    cleaned = cleaner.clean(all_items)
-    analyzed = sentiment.compute_sentiment(cleaned)
-    return analyzed
+def get_latest_signals_from_sources(tickers, consumer="default"):
+    # Sync endpoints run in FastAPI's threadpool, so there is no running event loop here
+    return asyncio.run(get_latest_signals_from_sources_async(tickers, consumer))
 
 @api_router.get("/signals", tags=["Signals"])
 def get_signals(request: Request, watchlist_id: str = Query("demo", description="Watchlist ID")):
@@ -159,8 +165,9 @@ def get_signals(request: Request, watchlist_id: str = Query("demo", description=
     if not check_rate_limit(ip, "/signals"):
         return JSONResponse(status_code=429, content={"error": "Rate limit exceeded"})
     tickers = TICKERS_DEFAULT
-    analyzed = get_latest_signals_from_sources(tickers)
-    signals = aggregate_signals_from_items(analyzed, tickers)
+    analyzed = get_latest_signals_from_sources(tickers, consumer="signals")
+    # Only items not seen within the window are folded in; scores move with the rolling state
+    signals = get_signal_aggregator().update(analyzed, tickers)
     sample_response = {
         "disclaimer": "This is a research prototype — not financial advice.",
         "watchlist_id": watchlist_id,
@@ -217,40 +224,35 @@ def remove_from_watchlist(payload: dict = Body(...), user_id: str = "demo"):
 def chat_options():
     return JSONResponse(content={"ok": True})
 
-@api_router.post("/chat", tags=["Chat"])
-def chat_endpoint(payload: dict = Body(...)):
-    query = payload.get("query", "").strip()
-    tickers = payload.get("tickers") or TICKERS_DEFAULT
-    if not query:
-        return JSONResponse(status_code=400, content={"error": "query is required"})
-    # Build context from current analyzed items
-    analyzed = get_latest_signals_from_sources(tickers)
+def _web_citations(query):
     # Add web search context (real-time)
     websearch = WebSearchClient()
     web_docs = websearch.search(query, max_results=5)
-    citations = [
+    return [
         {"title": d.get("title"), "url": d.get("url"), "snippet": d.get("snippet", d.get("summary", ""))}
         for d in (web_docs or [])
     ]
-    news_ctx = "\n".join([f"- {c['title']} ({c['url']}): {c['snippet']}" for c in citations[:3]])
 
+
+def _chat_prompt(query, analyzed, citations):
+    news_ctx = "\n".join([f"- {c['title']} ({c['url']}): {c['snippet']}" for c in citations[:3]])
     context = "\n".join([item.get("text", "") for item in analyzed[:20]])
-    prompt = (
+    return (
         f"User query: {query}\n\nRecent market chatter/news context:\n{context}\n\n"
         f"Top web results (include citations in your reasoning):\n{news_ctx}\n\n"
         f"Return a concise summary and trade ideas (JSON)."
     )
-    llm = OpenRouterClient()
-    llm_response = llm.summarize(prompt, SYSTEM_PROMPT)
-    summary = None
-    if isinstance(llm_response, dict) and "choices" in llm_response:
-        summary = llm_response.get("choices", [{}])[0].get("message", {}).get("content")
-    if not summary:
-        agg = aggregate_signals_from_items(analyzed, tickers)
-        ranked = sorted(agg, key=lambda x: x["score"], reverse=True)[:3]
-        summary = "; ".join([f"{r['ticker']}: {r['type']} ({r['score']})" for r in ranked]) or "No data"
-    response = {
-        "chat_id": str(uuid4()),
+
+
+def _fallback_summary(analyzed, tickers):
+    agg = aggregate_signals_from_items(analyzed, tickers)
+    ranked = sorted(agg, key=lambda x: x["score"], reverse=True)[:3]
+    return "; ".join([f"{r['ticker']}: {r['type']} ({r['score']})" for r in ranked]) or "No data"
+
+
+def _chat_response(query, tickers, analyzed, citations, summary, llm_response, chat_id=None):
+    return {
+        "chat_id": chat_id or str(uuid4()),
         "generated_at": datetime.now(timezone.utc).isoformat(),
         "query": query,
         "summary": summary,
@@ -277,7 +279,121 @@ def chat_endpoint(payload: dict = Body(...)):
             "data_retention_hint": "posts summarized and anonymized",
         },
     }
-    return response
+
+
+def _rag_response(query, summary, sources, chat_id=None):
+    # Normalize to ChatResponse-like shape expected by the frontend
+    return {
+        "chat_id": chat_id or str(uuid4()),
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "query": query,
+        "summary": summary or "No answer",
+        "disclaimer": "This is a research prototype — not financial advice.",
+        "recommendations": [],
+        "global_confidence": 0.0,
+        "explainability": {
+            "ensemble": {"finbert": 0.5, "llm": 0.3, "lexicon": 0.2},
+            "top_contributing_sentences": [],
+        },
+        "notes": {
+            "politician_claims_policy": "verify with official filings",
+            "data_retention_hint": "posts summarized and anonymized",
+        },
+        "sources": sources,
+    }
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+async def _ingest_events(tickers, consumer):
+    """Runs the ingestion pipeline for a stream, yielding `progress` SSE events as each source and stage
+    finishes so the client sees activity during the scrape; the analyzed items are in `result` at the end."""
+    queue = asyncio.Queue()
+    result = {"analyzed": []}
+
+    async def run():
+        try:
+            result["analyzed"] = await get_latest_signals_from_sources_async(tickers, consumer, progress=queue.put_nowait)
+        except Exception as e:
+            logger.warning(f"stream ingestion failed: {e}")
+        queue.put_nowait(None)
+
+    task = asyncio.create_task(run())
+    try:
+        while (event := await queue.get()) is not None:
+            yield _sse("progress", event)
+    finally:
+        task.cancel()  # no-op once finished; stops the scrape if the client went away
+    yield result
+
+
+@api_router.post("/chat", tags=["Chat"])
+def chat_endpoint(payload: dict = Body(...)):
+    query = payload.get("query", "").strip()
+    tickers = payload.get("tickers") or TICKERS_DEFAULT
+    if not query:
+        return JSONResponse(status_code=400, content={"error": "query is required"})
+    # Build context from a full snapshot; an incremental consumer would hand a follow-up question no context
+    analyzed = get_latest_signals_from_sources(tickers, consumer=None)
+    citations = _web_citations(query)
+    llm = OpenRouterClient()
+    llm_response = llm.summarize(_chat_prompt(query, analyzed, citations), SYSTEM_PROMPT)
+    summary = None
+    if isinstance(llm_response, dict) and "choices" in llm_response:
+        summary = llm_response.get("choices", [{}])[0].get("message", {}).get("content")
+    if not summary:
+        summary = _fallback_summary(analyzed, tickers)
+    return _chat_response(query, tickers, analyzed, citations, summary, llm_response)
+
+@api_router.post("/chat/stream", tags=["Chat"])
+async def chat_stream(payload: dict = Body(...)):
+    """Server-Sent Events variant of /chat: `meta`, `progress` while sources are scraped, then `token` deltas,
+    then the full response as `result`."""
+    query = payload.get("query", "").strip()
+    tickers = payload.get("tickers") or TICKERS_DEFAULT
+    if not query:
+        return JSONResponse(status_code=400, content={"error": "query is required"})
+
+    async def events():
+        chat_id = str(uuid4())
+        # Flush a first event immediately, then progress events, so the client sees activity while context is gathered
+        yield _sse("meta", {"chat_id": chat_id, "query": query})
+        analyzed = []
+        async for event in _ingest_events(tickers, None):
+            if isinstance(event, dict):
+                analyzed = event["analyzed"]
+            else:
+                yield event
+        try:
+            citations = await asyncio.to_thread(_web_citations, query)
+        except Exception:
+            citations = []
+        parts = []
+        try:
+            async for delta in OpenRouterClient().astream_llm(_chat_prompt(query, analyzed, citations), SYSTEM_PROMPT, temperature=0.2):
+                parts.append(delta)
+                yield _sse("token", {"delta": delta})
+        except Exception as e:
+            yield _sse("error", {"error": f"LLM stream failed: {e}"})
+        summary = "".join(parts) or _fallback_summary(analyzed, tickers)
+        llm_response = {"choices": [{"message": {"content": summary}}]} if parts else None
+        yield _sse("result", _chat_response(query, tickers, analyzed, citations, summary, llm_response, chat_id=chat_id))
+        yield _sse("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+RAG_BACKEND = os.getenv("RAG_BACKEND", "faiss")  # faiss | pgvector
+
+
+def _rag_pipeline(tickers):
+    """In-process FAISS index by default; with RAG_BACKEND=pgvector all workers share the Postgres index."""
+    if RAG_BACKEND == "pgvector":
+        return RAGPipeline(index_service=get_pgvector_index(), filters={"tickers": tickers, "since": recent_window()},
+                           index_args={"tickers": tickers})
+    return RAGPipeline()
+
 
 @api_router.post("/rag_chat", tags=["Chat"])
 def rag_chat(payload: dict = Body(...)):
@@ -286,10 +402,10 @@ def rag_chat(payload: dict = Body(...)):
     use_web = bool(payload.get("web_search", False))
     if not query:
         return JSONResponse(status_code=400, content={"error": "query is required"})
-    # Gather recent items + web docs
+    # Gather a snapshot of recent items (not incremental, so every question sees the current page) + web docs
     analyzed = []
     try:
-        analyzed = get_latest_signals_from_sources(tickers)
+        analyzed = get_latest_signals_from_sources(tickers, consumer=None)
     except Exception as e:
         analyzed = []
     web_docs = []
@@ -300,7 +416,7 @@ def rag_chat(payload: dict = Body(...)):
         except Exception:
             web_docs = []
     # Build RAG index
-    rag = RAGPipeline()
+    rag = _rag_pipeline(tickers)
     indexed = rag.index((analyzed or []) + (web_docs or []))
     if not indexed:
         return {"result": "No context available", "sources": []}
@@ -312,32 +428,55 @@ def rag_chat(payload: dict = Body(...)):
     except Exception as e:
         # Never let this crash the API; return graceful error to avoid frontend blank
         res = {"result": f"RAG error: {str(e)}", "sources": []}
-    # Normalize to ChatResponse-like shape expected by the frontend
     summary = res.get("result") if isinstance(res, dict) else str(res)
     # Fallback: if RAG failed or provided empty/diagnostic text, synthesize a summary from aggregates
     if not summary or str(summary).lower().startswith("rag error") or str(summary).lower().startswith("rag model"):
-        agg = aggregate_signals_from_items(analyzed or [], tickers)
-        ranked = sorted(agg, key=lambda x: x["score"], reverse=True)[:3]
-        summary = "; ".join([f"{r['ticker']}: {r['type']} ({r['score']})" for r in ranked]) or "No data"
-    normalized = {
-        "chat_id": str(uuid4()),
-        "generated_at": datetime.now(timezone.utc).isoformat(),
-        "query": query,
-        "summary": summary or "No answer",
-        "disclaimer": "This is a research prototype — not financial advice.",
-        "recommendations": [],
-        "global_confidence": 0.0,
-        "explainability": {
-            "ensemble": {"finbert": 0.5, "llm": 0.3, "lexicon": 0.2},
-            "top_contributing_sentences": [],
-        },
-        "notes": {
-            "politician_claims_policy": "verify with official filings",
-            "data_retention_hint": "posts summarized and anonymized",
-        },
-        "sources": res.get("sources", []) if isinstance(res, dict) else [],
-    }
-    return normalized
+        summary = _fallback_summary(analyzed or [], tickers)
+    return _rag_response(query, summary, res.get("sources", []) if isinstance(res, dict) else [])
+
+@api_router.post("/rag_chat/stream", tags=["Chat"])
+async def rag_chat_stream(payload: dict = Body(...)):
+    """Server-Sent Events variant of /rag_chat: `meta`, `progress` while sources are scraped, then `token` deltas,
+    then the full response with sources as `result`."""
+    query = payload.get("query", "").strip()
+    tickers = payload.get("tickers") or TICKERS_DEFAULT
+    use_web = bool(payload.get("web_search", False))
+    if not query:
+        return JSONResponse(status_code=400, content={"error": "query is required"})
+
+    async def events():
+        chat_id = str(uuid4())
+        yield _sse("meta", {"chat_id": chat_id, "query": query})
+        analyzed = []
+        async for event in _ingest_events(tickers, None):
+            if isinstance(event, dict):
+                analyzed = event["analyzed"]
+            else:
+                yield event
+        web_docs = []
+        if use_web:
+            try:
+                web_docs = await asyncio.to_thread(WebSearchClient().search, query, 5) or []
+            except Exception:
+                web_docs = []
+        rag = _rag_pipeline(tickers)
+        hits = []
+        if await asyncio.to_thread(rag.index, analyzed + web_docs):
+            hits = await asyncio.to_thread(rag.retrieve, query)
+        parts = []
+        if hits:
+            try:
+                async for delta in OpenRouterClient().astream_llm(rag.build_prompt(query, hits), temperature=0.0):
+                    parts.append(delta)
+                    yield _sse("token", {"delta": delta})
+            except Exception as e:
+                yield _sse("error", {"error": f"RAG error: {e}"})
+        summary = "".join(parts) or _fallback_summary(analyzed, tickers)
+        sources = [{k: v for k, v in h.items() if k != "score"} for h in hits]
+        yield _sse("result", _rag_response(query, summary, sources, chat_id=chat_id))
+        yield _sse("done", {})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
 
 @api_router.get("/llm_diagnostics", tags=["Health"])
 def llm_diagnostics():
@@ -391,7 +530,7 @@ def get_feed(tickers: Optional[str] = None, limit: int = 30, fast: bool = True):
     analyzed = []
     if not fast:
         try:
-            analyzed = get_latest_signals_from_sources(tickers_list)
+            analyzed = get_latest_signals_from_sources(tickers_list, consumer="feed")
         except Exception:
             analyzed = []
     # Normalize
@@ -443,89 +582,99 @@ def get_feed(tickers: Optional[str] = None, limit: int = 30, fast: bool = True):
 app.include_router(api_router)
 
 # Realtime websockets
-@app.websocket("/ws/signals")
-async def websocket_signals(websocket: WebSocket):
-    await websocket.accept()
-    last_sent = None
+# One producer per process computes signals/insights once per tick and fans them out to every subscriber.
+WS_TICK_SECONDS = float(os.getenv("WS_TICK_SECONDS", "15"))
+_last_alert = {"payload": None}
+
+
+async def _summarize_insights(analyzed, tickers):
+    # LLM summary using OpenRouter, with fallback if unauthorized
+    llm = OpenRouterClient()
+    context = "\n".join([item.get("text", "") for item in analyzed[:20]])
+    prompt = f"Summarize the current market sentiment and key events based on the following posts:\n{context}"
+    try:
+        llm_response = await llm.asummarize(prompt, SYSTEM_PROMPT)
+    except Exception:
+        llm_response = {"error": "llm call failed"}
+    summary = None
+    if isinstance(llm_response, dict) and "choices" in llm_response:
+        summary = llm_response.get("choices", [{}])[0].get("message", {}).get("content")
+    return summary or _fallback_summary(analyzed, tickers)
+
+
+async def _send_alerts(signals):
+    # Optional webhook alerts, deduplicated against the last alert sent
+    if not ALERT_WEBHOOK_URL:
+        return
+    high_conf = [s for s in signals if s["confidence"] >= 0.7]
+    payload = {"type": "signals_alert", "signals": high_conf}
+    if not high_conf or payload == _last_alert["payload"]:
+        return
     try:
         async with httpx.AsyncClient(timeout=5) as client:
-            while True:
-                tickers = TICKERS_DEFAULT
-                try:
-                    analyzed = get_latest_signals_from_sources(tickers)
-                except Exception:
-                    analyzed = []
-                signals = aggregate_signals_from_items(analyzed, tickers)
-                # persist
-                try:
-                    sb_store_signals(signals)
-                except Exception:
-                    pass
-                await websocket.send_json(signals)
-                # Optional webhook alerts
-                if ALERT_WEBHOOK_URL:
-                    high_conf = [s for s in signals if s["confidence"] >= 0.7]
-                    payload = {"type": "signals_alert", "signals": high_conf}
-                    try:
-                        if high_conf and payload != last_sent:
-                            await client.post(ALERT_WEBHOOK_URL, json=payload)
-                            last_sent = payload
-                    except Exception:
-                        pass
-                await asyncio.sleep(15)
-    except WebSocketDisconnect:
+            await client.post(ALERT_WEBHOOK_URL, json=payload)
+        _last_alert["payload"] = payload
+    except Exception:
         pass
+
+
+async def produce_ws_tick(topics):
+    """Computes one tick of payloads for the subscribed topics ("signals", "insights")."""
+    tickers = TICKERS_DEFAULT
+    try:
+        analyzed = await get_latest_signals_from_sources_async(tickers, consumer="ws")
     except Exception:
-        # Prevent crashing the connection on unexpected errors
-        try:
-            await websocket.close()
-        except Exception:
-            pass
+        analyzed = []
+    signals = get_signal_aggregator().update(analyzed, tickers)
+    # persist once per tick, not once per connection; the write-behind queue never blocks the loop
+    try:
+        sb_store_signals(signals)
+    except Exception:
+        pass
+    await _send_alerts(signals)
+    payloads = {"signals": signals}
+    if "insights" in topics:
+        summary = await _summarize_insights(analyzed, tickers)
+        payloads["insights"] = {
+            "summary": summary,
+            "top_sentiments": signals[:5],
+            "sources": list({item.get("source", "unknown") for item in analyzed[:5]}),
+        }
+    return payloads
 
-@app.websocket("/ws/insights")
-async def websocket_insights(websocket: WebSocket):
+
+ws_hub = BroadcastHub(produce_ws_tick, interval=WS_TICK_SECONDS)
+
+
+async def _serve_topic(websocket: WebSocket, topic: str):
     await websocket.accept()
+    sub = ws_hub.subscribe(topic)
     try:
         while True:
-            # Fetch and preprocess data from all sources
-            tickers = TICKERS_DEFAULT
-            try:
-                analyzed = get_latest_signals_from_sources(tickers)
-            except Exception:
-                analyzed = []
-            # LLM summary using OpenRouter, with fallback if unauthorized
-            llm = OpenRouterClient()
-            context = "\n".join([item.get("text", "") for item in analyzed[:20]])
-            prompt = f"Summarize the current market sentiment and key events based on the following posts:\n{context}"
-            try:
-                llm_response = llm.summarize(prompt, SYSTEM_PROMPT)
-            except Exception:
-                llm_response = {"error": "llm call failed"}
-            summary = None
-            if isinstance(llm_response, dict) and "choices" in llm_response:
-                summary = llm_response.get("choices", [{}])[0].get("message", {}).get("content")
-            if not summary:
-                # Fallback summary from aggregates
-                agg = aggregate_signals_from_items(analyzed, tickers)
-                ranked = sorted(agg, key=lambda x: x["score"], reverse=True)[:3]
-                summary = "; ".join([f"{r['ticker']}: {r['type']} ({r['score']})" for r in ranked]) or "No data"
-            insights = {
-                "summary": summary,
-                "top_sentiments": aggregate_signals_from_items(analyzed, tickers)[:5],
-                "sources": list({item.get("source", "unknown") for item in analyzed[:5]}),
-            }
-            try:
-                await websocket.send_json(insights)
-            except Exception:
-                pass
-            await asyncio.sleep(15)
+            payload = await sub.get()
+            if payload is None:
+                # Dropped by the hub as a slow consumer
+                break
+            await websocket.send_json(payload)
     except WebSocketDisconnect:
         pass
     except Exception:
+        # Prevent crashing the server on unexpected send errors
+        pass
+    finally:
+        ws_hub.unsubscribe(sub)
         try:
             await websocket.close()
         except Exception:
             pass
 
-# Note: Add webhook posting inside websocket loops when ALERT_WEBHOOK_URL is set to broadcast high-confidence signals.
+
+@app.websocket("/ws/signals")
+async def websocket_signals(websocket: WebSocket):
+    await _serve_topic(websocket, "signals")
+
+@app.websocket("/ws/insights")
+async def websocket_insights(websocket: WebSocket):
+    await _serve_topic(websocket, "insights")
+
 # Note: X/Twitter scraping is disabled by default via USE_X_SCRAPE=false.
@@ -1,20 +1,174 @@
 """
 Backtest Engine for MarketSentinel
 Runs backtests on historical data for given strategies.
+Prices and positions are columnar (bars x tickers) NumPy arrays; positions are target weights of equity held
+from a bar's close to the next. Portfolio returns, turnover costs (fees + slippage, in bps of traded notional)
+and the equity curve are computed with array operations over row chunks, so there is no per-bar Python loop
+and memory stays bounded for minute bars over large universes. Trade lists are turned into a position matrix
+with a scatter-add of entry/exit deltas and a cumulative sum.
 """
 import logging
-from typing import List, Dict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 logger = logging.getLogger("backtest_engine")
 
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+DEFAULT_PERIODS_PER_YEAR = 252
+
+
+def to_epoch(value) -> float:
+    """Epoch seconds from a number, datetime or ISO-8601 string."""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def price_matrix(prices: List[Dict]) -> Tuple[np.ndarray, List[str], np.ndarray]:
+    """(bar times, tickers, close[bars, tickers]) from price rows {ticker, timestamp|time, close|price}.
+    Gaps are forward-filled; bars before a ticker's first price stay NaN."""
+    if not prices:
+        return np.zeros(0), [], np.zeros((0, 0))
+    times = np.array([to_epoch(p.get("timestamp", p.get("time"))) for p in prices])
+    names = [p["ticker"] for p in prices]
+    values = np.array([float(p.get("close", p.get("price"))) for p in prices])
+    bar_times, rows = np.unique(times, return_inverse=True)
+    tickers, cols = np.unique(names, return_inverse=True)
+    close = np.full((len(bar_times), len(tickers)), np.nan)
+    close[rows, cols] = values
+    return bar_times, tickers.tolist(), forward_fill(close)
+
+
+def forward_fill(a: np.ndarray) -> np.ndarray:
+    idx = np.where(np.isnan(a), 0, np.arange(a.shape[0])[:, None])
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return a[idx, np.arange(a.shape[1])]
+
+
+def _trade_side(trade: Dict) -> float:
+    side = str(trade.get("side", "long")).lower()
+    return -1.0 if side in ("short", "sell") else 1.0
+
+
+def positions_from_trades(trades: List[Dict], times: np.ndarray, tickers: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Position matrix for trades {ticker, entry_time, exit_time?, side?, size?}; size is a fraction of equity
+    (default 1). A trade is held from the first bar at/after entry_time until the first bar at/after exit_time,
+    or to the end without an exit. Also returns each trade's entry and exit bar (-1 if its ticker has no prices)."""
+    col_of = {t: i for i, t in enumerate(tickers)}
+    n = len(trades)
+    cols = np.array([col_of.get(t.get("ticker"), -1) for t in trades], dtype=np.int64)
+    entry = np.array([to_epoch(t["entry_time"]) for t in trades]) if n else np.zeros(0)
+    exit_ = np.array([to_epoch(t["exit_time"]) if t.get("exit_time") is not None else np.inf for t in trades]) if n else np.zeros(0)
+    weight = np.array([_trade_side(t) * float(t.get("size", 1.0)) for t in trades])
+    entry_bar = np.searchsorted(times, entry, side="left")
+    exit_bar = np.searchsorted(times, exit_, side="left")
+    delta = np.zeros((len(times) + 1, len(tickers)))
+    ok = cols >= 0
+    np.add.at(delta, (entry_bar[ok], cols[ok]), weight[ok])
+    np.add.at(delta, (exit_bar[ok], cols[ok]), -weight[ok])
+    entry_bar = np.where(ok, entry_bar, -1)
+    exit_bar = np.where(ok, exit_bar, -1)
+    return np.cumsum(delta[:-1], axis=0), entry_bar, exit_bar
+
+
+def periods_per_year(times: Optional[np.ndarray]) -> float:
+    """Bars per year as observed in the timestamps (so session gaps and weekends are accounted for)."""
+    if times is None or len(times) < 2 or times[-1] <= times[0]:
+        return DEFAULT_PERIODS_PER_YEAR
+    return (len(times) - 1) / ((times[-1] - times[0]) / SECONDS_PER_YEAR)
+
+
+def portfolio_returns(close: np.ndarray, positions: np.ndarray, cost_bps: float = 0.0,
+                      chunk_rows: int = 16384) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-bar portfolio returns net of costs, and per-bar turnover (sum of |weight changes|).
+    r[t] = sum_j pos[t-1, j] * (close[t, j] / close[t-1, j] - 1) - cost * turnover[t]."""
+    bars, n = close.shape
+    returns = np.zeros(bars)
+    turnover = np.zeros(bars)
+    cost = cost_bps / 1e4
+    prev_close = np.full(n, np.nan, dtype=close.dtype)
+    prev_pos = np.zeros(n, dtype=positions.dtype)
+    for lo in range(0, bars, chunk_rows):
+        hi = min(bars, lo + chunk_rows)
+        c = close[lo:hi]
+        p = positions[lo:hi]
+        c_prev = np.vstack([prev_close[None, :], c[:-1]])
+        p_prev = np.vstack([prev_pos[None, :], p[:-1]])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            asset = c / c_prev - 1.0
+        np.nan_to_num(asset, copy=False, nan=0.0, posinf=0.0, neginf=0.0)
+        turnover[lo:hi] = np.abs(p - p_prev).sum(axis=1)
+        returns[lo:hi] = np.einsum("ij,ij->i", p_prev, asset, dtype=np.float64) - cost * turnover[lo:hi]
+        prev_close, prev_pos = c[-1], p[-1]
+    return returns, turnover
+
+
+def performance_metrics(returns: np.ndarray, ppy: float) -> Dict[str, float]:
+    """Sharpe (annualized, zero risk-free rate), annualized return, total return and max drawdown (positive fraction)."""
+    if not len(returns):
+        return {"sharpe": 0.0, "yearly_return": 0.0, "total_return": 0.0, "max_drawdown": 0.0}
+    growth = np.cumprod(1.0 + returns)
+    std = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    sharpe = float(returns.mean() / std * np.sqrt(ppy)) if std > 0 else 0.0
+    final = float(growth[-1])
+    yearly = final ** (ppy / len(returns)) - 1.0 if final > 0 else -1.0
+    drawdown = 1.0 - growth / np.maximum.accumulate(np.maximum(growth, 1.0))
+    return {"sharpe": sharpe, "yearly_return": float(yearly), "total_return": final - 1.0, "max_drawdown": float(drawdown.max())}
+
+
+def run_vectorized(close: np.ndarray, positions: np.ndarray, times: Optional[np.ndarray] = None, fee_bps: float = 1.0,
+                   slippage_bps: float = 1.0, initial_capital: float = 1.0, ppy: Optional[float] = None) -> Dict:
+    """Columnar backtest: close and positions are aligned [bars, tickers] arrays (float32 is fine)."""
+    if close.shape != positions.shape:
+        raise ValueError(f"close {close.shape} and positions {positions.shape} must have the same shape")
+    ppy = ppy or periods_per_year(times)
+    returns, turnover = portfolio_returns(close, positions, fee_bps + slippage_bps)
+    metrics = performance_metrics(returns, ppy)
+    metrics["turnover"] = float(turnover.sum())
+    metrics["costs"] = float(turnover.sum() * (fee_bps + slippage_bps) / 1e4)
+    return {"equity": initial_capital * np.cumprod(1.0 + returns), "returns": returns, "metrics": metrics}
+
+
 class BacktestEngine:
+    def __init__(self, fee_bps: float = 1.0, slippage_bps: float = 1.0, initial_capital: float = 1.0):
+        self.fee_bps = fee_bps
+        self.slippage_bps = slippage_bps
+        self.initial_capital = initial_capital
+
     def run_backtest(self, trades: List[Dict], prices: List[Dict]) -> Dict:
         """
         Runs a simple backtest and returns performance metrics.
         """
-        # Placeholder: implement actual backtest logic
+        times, tickers, close = price_matrix(prices)
+        if not len(times):
+            return {"equity_curve": [], "trade_list": trades,
+                    "metrics": {"sharpe": 0.0, "yearly_return": 0.0, "max_drawdown": 0.0}}
+        positions, entry_bar, exit_bar = positions_from_trades(trades, times, tickers)
+        result = run_vectorized(close, positions, times, self.fee_bps, self.slippage_bps, self.initial_capital)
         return {
-            "equity_curve": [],
-            "trade_list": trades,
-            "metrics": {"sharpe": 0.0, "yearly_return": 0.0, "max_drawdown": 0.0}
+            "equity_curve": [{"timestamp": float(t), "equity": float(e)} for t, e in zip(times, result["equity"])],
+            "trade_list": self._trade_list(trades, close, tickers, entry_bar, exit_bar),
+            "metrics": result["metrics"],
         }
+
+    def _trade_list(self, trades, close, tickers, entry_bar, exit_bar) -> List[Dict]:
+        col_of = {t: i for i, t in enumerate(tickers)}
+        cost = 2 * (self.fee_bps + self.slippage_bps) / 1e4
+        last = close.shape[0] - 1
+        out = []
+        for trade, eb, xb in zip(trades, entry_bar, exit_bar):
+            trade = dict(trade)
+            if 0 <= eb <= last:
+                col = col_of[trade["ticker"]]
+                entry_price = trade.get("entry_price") or float(close[eb, col])
+                exit_price = trade.get("exit_price") or float(close[min(xb, last), col])
+                ret = _trade_side(trade) * (exit_price / entry_price - 1.0) - cost
+                trade["entry_price"], trade["exit_price"] = entry_price, exit_price
+                trade["return"] = ret
+                trade.setdefault("pnl", ret * float(trade.get("size", 1.0)) * self.initial_capital)
+            out.append(trade)
+        return out
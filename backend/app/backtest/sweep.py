@@ -0,0 +1,207 @@
+"""
+Parameter Sweeps for MarketSentinel
+Grid-searches the sentiment strategy (ensemble weights -> bullish/bearish thresholds -> holding period) over the
+columnar backtester, optionally with walk-forward train/test splits.
+Prices and per-bar component scores live in multiprocessing shared memory; workers attach to them once in the
+pool initializer, so tasks only carry parameters. Combinations are ordered and chunked by parameter prefix, and
+each worker caches the blended sentiment per weights and the signal series per (weights, thresholds) in an LRU
+bounded by bytes, so a chunk mostly reuses its prefix and only the holding period and backtest are recomputed
+per task. Positions are only built for the requested bar ranges (plus the holding-period look-back), and one
+pool serves every pass of a walk-forward run.
+"""
+import os
+import logging
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import product
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from backend.app.backtest.backtest_engine import run_vectorized
+from backend.app.services.signal_aggregator import BEARISH_THRESHOLD, BULLISH_THRESHOLD
+
+logger = logging.getLogger("sweep")
+
+COMPONENTS = ("finbert", "llm", "lexicon")
+# Per-worker budget for cached sentiment/signal arrays
+SWEEP_CACHE_MB = float(os.getenv("SWEEP_CACHE_MB", "512"))
+
+
+# -- strategy ---------------------------------------------------------------------------------------------
+
+def blend(components: np.ndarray, weights: Sequence[float]) -> np.ndarray:
+    """Weighted sentiment from [n_components, bars, tickers] scores, renormalizing over the non-NaN components
+    like SentimentEnsemble does. Bars with no scores stay NaN."""
+    # One component at a time, so temporaries stay [bars, tickers] rather than [n_components, bars, tickers]
+    total = np.zeros(components.shape[1:], dtype="float32")
+    score = np.zeros(components.shape[1:], dtype="float32")
+    for w, c in zip(weights, components):
+        present = ~np.isnan(c)
+        total += np.float32(w) * present
+        np.add(score, np.float32(w) * c, out=score, where=present)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        score /= total
+    score[total <= 0] = np.nan
+    return score
+
+
+def signal_series(sentiment: np.ndarray, bullish: float = BULLISH_THRESHOLD, bearish: float = BEARISH_THRESHOLD) -> np.ndarray:
+    """+1 / -1 where a bar's sentiment crosses the thresholds, 0 otherwise (int8)."""
+    with np.errstate(invalid="ignore"):
+        return (sentiment > bullish).astype("int8") - (sentiment < bearish).astype("int8")
+
+
+def hold_positions(signals: np.ndarray, hold: int) -> np.ndarray:
+    """Equal-weight positions: each ticker holds the side of its latest signal for `hold` bars after it."""
+    bars, n = signals.shape
+    idx = np.arange(bars)[:, None]
+    last = np.where(signals != 0, idx, -1)
+    np.maximum.accumulate(last, axis=0, out=last)
+    active = (last >= 0) & (idx - last < hold)
+    side = np.take_along_axis(signals, np.maximum(last, 0), axis=0)
+    return np.where(active, side, 0).astype("float32") / n
+
+
+def param_grid(weights: Sequence[Sequence[float]], thresholds: Sequence[Tuple[float, float]],
+               holds: Sequence[int]) -> List[Dict]:
+    """All combinations, ordered by prefix (weights, then thresholds, then hold) so chunks share cached work."""
+    return [
+        {"weights": tuple(w), "bullish": bull, "bearish": bear, "hold": int(h)}
+        for w, (bull, bear), h in product(weights, thresholds, holds)
+    ]
+
+
+def walk_forward_splits(bars: int, train: int, test: int, step: Optional[int] = None) -> Iterator[Tuple[slice, slice]]:
+    """Rolling (train, test) row slices; the test window directly follows its train window."""
+    step = step or test
+    for lo in range(0, bars - train - test + 1, step):
+        yield slice(lo, lo + train), slice(lo + train, lo + train + test)
+
+
+# -- worker side ------------------------------------------------------------------------------------------
+
+_shared: Dict[str, np.ndarray] = {}
+_handles: List[shared_memory.SharedMemory] = []
+_options: Dict = {}
+_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+
+
+def _attach(specs: Dict[str, Tuple[str, tuple, str]], options: Dict) -> None:
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        _handles.append(shm)
+        _shared[key] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _options.update(options)
+    _cache.clear()
+
+
+def _cached(key: tuple, compute):
+    if key in _cache:
+        _cache.move_to_end(key)
+        return _cache[key]
+    value = _cache[key] = compute()
+    budget = _options.get("cache_bytes", SWEEP_CACHE_MB * 2 ** 20)
+    used = sum(v.nbytes for v in _cache.values())
+    while used > budget and len(_cache) > 1:
+        used -= _cache.popitem(last=False)[1].nbytes
+    return value
+
+
+def _evaluate(params: Dict, ranges: List[Tuple[Optional[int], Optional[int]]]) -> List[Dict]:
+    weights = params["weights"]
+    sentiment = _cached(("sentiment", weights), lambda: blend(_shared["components"], weights))
+    thresholds = (weights, params["bullish"], params["bearish"])
+    signals = _cached(("signals",) + thresholds, lambda: signal_series(sentiment, params["bullish"], params["bearish"]))
+    hold = params["hold"]
+    results = []
+    for start, stop in ranges:
+        start, stop, _ = slice(start, stop).indices(len(signals))
+        # A bar's position depends on the signals of the hold - 1 bars before it
+        lo = max(0, start - hold + 1)
+        positions = hold_positions(signals[lo:stop], hold)[start - lo:]
+        result = run_vectorized(_shared["close"][start:stop], positions, fee_bps=_options["fee_bps"],
+                                slippage_bps=_options["slippage_bps"], ppy=_options["ppy"])
+        results.append({"params": params, "metrics": result["metrics"]})
+    return results
+
+
+def _evaluate_chunk(chunk: List[Dict], ranges: List[Tuple[Optional[int], Optional[int]]]) -> List[List[Dict]]:
+    """Per combination, its results over each bar range (e.g. every walk-forward train window)."""
+    return [_evaluate(params, ranges) for params in chunk]
+
+
+# -- driver -----------------------------------------------------------------------------------------------
+
+class SweepRunner:
+    def __init__(self, close: np.ndarray, components: np.ndarray, workers: Optional[int] = None,
+                 fee_bps: float = 1.0, slippage_bps: float = 1.0, ppy: float = 252 * 390, chunk_size: int = 0,
+                 cache_mb: float = SWEEP_CACHE_MB):
+        """close: [bars, tickers] prices; components: [len(COMPONENTS), bars, tickers] per-bar scores (NaN = none)."""
+        if components.shape[1:] != close.shape:
+            raise ValueError(f"components {components.shape} do not line up with close {close.shape}")
+        self.close = close
+        self.components = components
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.options = {"fee_bps": fee_bps, "slippage_bps": slippage_bps, "ppy": ppy, "cache_bytes": cache_mb * 2 ** 20}
+
+    def _chunks(self, grid: List[Dict]) -> List[List[Dict]]:
+        # Default: about 4 chunks per worker, cut on contiguous (prefix-ordered) runs of the grid
+        size = self.chunk_size or max(1, -(-len(grid) // (self.workers * 4)))
+        return [grid[i:i + size] for i in range(0, len(grid), size)]
+
+    def _share(self) -> Tuple[Dict, List[shared_memory.SharedMemory]]:
+        specs, blocks = {}, []
+        for key, arr in (("close", self.close), ("components", self.components)):
+            arr = np.ascontiguousarray(arr)
+            shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+            np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+            blocks.append(shm)
+            specs[key] = (shm.name, arr.shape, arr.dtype.str)
+        return specs, blocks
+
+    @contextmanager
+    def _pool(self):
+        """Shares the arrays and starts the workers once; every _map inside the block reuses them."""
+        specs, blocks = self._share()
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_attach, initargs=(specs, self.options)) as pool:
+                yield pool
+        finally:
+            for shm in blocks:
+                shm.close()
+                shm.unlink()
+
+    @staticmethod
+    def _map(pool, jobs: List[Tuple[List[Dict], List[Tuple]]]) -> List[List[List[Dict]]]:
+        futures = [pool.submit(_evaluate_chunk, chunk, ranges) for chunk, ranges in jobs]
+        return [f.result() for f in futures]
+
+    def run(self, grid: List[Dict], rows: slice = slice(None)) -> List[Dict]:
+        """Backtests every combination on the given bar range; results are in grid order."""
+        with self._pool() as pool:
+            results = self._map(pool, [(chunk, [(rows.start, rows.stop)]) for chunk in self._chunks(grid)])
+        return [per_range[0] for chunk in results for per_range in chunk]
+
+    def walk_forward(self, grid: List[Dict], train: int, test: int, step: Optional[int] = None,
+                     metric: str = "sharpe") -> List[Dict]:
+        """Per fold: the combination with the best train `metric`, and its out-of-sample test metrics."""
+        splits = list(walk_forward_splits(self.close.shape[0], train, test, step))
+        if not splits:
+            return []
+        train_ranges = [(tr.start, tr.stop) for tr, _ in splits]
+        with self._pool() as pool:
+            # Each chunk is scored on every train window in one task, reusing its cached signal series
+            scored = [per_range for chunk in self._map(pool, [(c, train_ranges) for c in self._chunks(grid)])
+                      for per_range in chunk]
+            best = [max((per_range[f] for per_range in scored), key=lambda r: r["metrics"][metric])
+                    for f in range(len(splits))]
+            tests = self._map(pool, [([b["params"]], [(te.start, te.stop)]) for b, (_, te) in zip(best, splits)])
+        return [
+            {"train": (tr.start, tr.stop), "test": (te.start, te.stop), "params": b["params"],
+             "train_metrics": b["metrics"], "test_metrics": t[0][0]["metrics"]}
+            for (tr, te), b, t in zip(splits, best, tests)
+        ]
@@ -0,0 +1,35 @@
+import numpy as np
+
+from backend.app.backtest.backtest_engine import BacktestEngine, run_vectorized
+
+def test_trades_are_aligned_with_bars_and_costed():
+    prices = [{"ticker": "AAPL", "timestamp": t, "close": c} for t, c in zip([0, 60, 120, 180], [100, 110, 99, 99])]
+    prices += [{"ticker": "TSLA", "timestamp": 60, "close": 200}, {"ticker": "TSLA", "timestamp": 180, "close": 220}]
+    trades = [
+        {"ticker": "AAPL", "entry_time": 0, "exit_time": 60, "size": 0.5},
+        {"ticker": "TSLA", "entry_time": "1970-01-01T00:01:00Z", "side": "short", "size": 0.5},
+        {"ticker": "MSFT", "entry_time": 0},
+    ]
+    result = BacktestEngine(fee_bps=0, slippage_bps=0).run_backtest(trades, prices)
+    equity = [p["equity"] for p in result["equity_curve"]]
+    # +5% on AAPL over bar 0->1; TSLA is forward-filled at 200 over bar 2, then -5% over bar 3
+    assert np.allclose(equity, [1.0, 1.05, 1.05, 1.05 * 0.95])
+    aapl, tsla, msft = result["trade_list"]
+    assert np.isclose(aapl["pnl"], 0.05) and np.isclose(tsla["return"], -0.1) and "pnl" not in msft
+    assert np.isclose(result["metrics"]["max_drawdown"], 0.05)
+
+    costed = BacktestEngine(fee_bps=5, slippage_bps=5).run_backtest(trades, prices)
+    assert np.isclose(costed["metrics"]["turnover"], 1.5) and costed["equity_curve"][-1]["equity"] < equity[-1]
+
+def test_run_vectorized_matches_a_per_bar_loop():
+    rng = np.random.default_rng(0)
+    close = np.cumprod(1 + 0.01 * rng.standard_normal((500, 7)), axis=0).astype("float32")
+    positions = rng.choice([-0.2, 0.0, 0.2], size=close.shape).astype("float32")
+    result = run_vectorized(close, positions, fee_bps=1, slippage_bps=2, ppy=252)
+    equity, prev = 1.0, np.zeros(7)
+    for t in range(len(close)):
+        asset = close[t] / close[t - 1] - 1 if t else np.zeros(7)
+        equity *= 1 + prev @ asset - 3e-4 * np.abs(positions[t] - prev).sum()
+        prev = positions[t].astype(float)
+    assert np.isclose(result["equity"][-1], equity, rtol=1e-5)
+    assert result["metrics"]["max_drawdown"] >= 0 and np.isfinite(result["metrics"]["sharpe"])
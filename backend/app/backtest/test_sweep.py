@@ -0,0 +1,38 @@
+import numpy as np
+
+from backend.app.backtest.backtest_engine import run_vectorized
+from backend.app.backtest.sweep import SweepRunner, blend, hold_positions, param_grid, signal_series, walk_forward_splits
+
+def _market(bars=400, tickers=5, seed=0):
+    rng = np.random.default_rng(seed)
+    close = np.cumprod(1 + 0.01 * rng.standard_normal((bars, tickers)), axis=0).astype("float32")
+    components = rng.uniform(0, 1, (3, bars, tickers)).astype("float32")
+    components[1] = np.nan  # no LLM scores
+    return close, components
+
+def test_strategy_building_blocks():
+    components = np.array([[[0.9, np.nan]], [[np.nan, np.nan]], [[0.3, 0.2]]], dtype="float32")
+    assert np.allclose(blend(components, (0.5, 0.3, 0.2)), [[(0.45 + 0.06) / 0.7, 0.2]])
+    signals = np.array([[1, 0], [0, 0], [0, -1], [0, 0], [0, 0]], dtype="int8")
+    assert (hold_positions(signals, 2) * 2).tolist() == [[1, 0], [1, 0], [0, -1], [0, -1], [0, 0]]
+    assert signal_series(np.array([0.7, 0.5, 0.3, np.nan]), 0.6, 0.4).tolist() == [1, 0, -1, 0]
+    assert [(tr.start, te.stop) for tr, te in walk_forward_splits(100, 50, 20)] == [(0, 70), (20, 90)]
+
+def test_sweep_matches_direct_backtests_and_walks_forward():
+    close, components = _market()
+    grid = param_grid([(0.5, 0.3, 0.2), (0.2, 0.3, 0.5)], [(0.6, 0.4), (0.55, 0.45)], [1, 10])
+    runner = SweepRunner(close, components, workers=2, chunk_size=3, ppy=252)
+    results = runner.run(grid)
+    assert [r["params"] for r in results] == grid
+    p = grid[5]
+    positions = hold_positions(signal_series(blend(components, p["weights"]), p["bullish"], p["bearish"]), p["hold"])
+    expected = run_vectorized(close, positions, fee_bps=1, slippage_bps=1, ppy=252)["metrics"]
+    assert results[5]["metrics"] == expected
+    # Positions built over a bar range (with its look-back) match slicing the full-history positions
+    ranged = runner.run(grid, rows=slice(150, 300))[5]["metrics"]
+    assert ranged == run_vectorized(close[150:300], positions[150:300], fee_bps=1, slippage_bps=1, ppy=252)["metrics"]
+
+    folds = runner.walk_forward(grid, train=200, test=100, step=100)
+    assert [(f["train"], f["test"]) for f in folds] == [((0, 200), (200, 300)), ((100, 300), (300, 400))]
+    train_only = runner.run(grid, rows=slice(0, 200))
+    assert folds[0]["train_metrics"]["sharpe"] == max(r["metrics"]["sharpe"] for r in train_only)
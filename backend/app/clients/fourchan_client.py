@@ -3,8 +3,9 @@
 Fetches posts from 4chan boards (e.g., /biz/) for sentiment analysis.
 """
 import requests
+import httpx
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 
 logger = logging.getLogger("fourchan_client")
 
@@ -30,3 +31,40 @@ class FourChanClient:
         except Exception as e:
             logger.error(f"Failed to fetch 4chan thread {thread_id}: {e}")
             return []
+
+    async def fetch_board_catalog_async(self, http: httpx.AsyncClient, board="biz") -> List[Dict]:
+        try:
+            resp = await http.get(f"{self.BASE_URL}/{board}/catalog.json", timeout=10)
+            resp.raise_for_status()
+            return resp.json()
+        except Exception as e:
+            logger.error(f"Failed to fetch 4chan catalog: {e}")
+            return []
+
+    async def fetch_board_threads_if_modified_async(self, http: httpx.AsyncClient, board="biz",
+                                                    last_modified: Optional[str] = None) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Conditional fetch of threads.json (per page: thread no, last_modified and replies, without post bodies).
+        Returns (None, last_modified) when the board is unchanged (HTTP 304).
+        """
+        headers = {"If-Modified-Since": last_modified} if last_modified else {}
+        try:
+            resp = await http.get(f"{self.BASE_URL}/{board}/threads.json", headers=headers, timeout=10)
+            if resp.status_code == 304:
+                return None, last_modified
+            resp.raise_for_status()
+            return resp.json(), resp.headers.get("Last-Modified")
+        except Exception as e:
+            logger.error(f"Failed to fetch 4chan thread list: {e}")
+            return [], last_modified
+
+    async def fetch_thread_posts_async(self, http: httpx.AsyncClient, board="biz", thread_id=None) -> List[Dict]:
+        if not thread_id:
+            return []
+        try:
+            resp = await http.get(f"{self.BASE_URL}/{board}/thread/{thread_id}.json", timeout=10)
+            resp.raise_for_status()
+            return resp.json().get("posts", [])
+        except Exception as e:
+            logger.error(f"Failed to fetch 4chan thread {thread_id}: {e}")
+            return []
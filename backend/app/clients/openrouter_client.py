@@ -1,41 +1,156 @@
 """
 OpenRouter LLM Client for MarketSentinel
 Handles LLM calls for classification and summarization with system prompts and caching.
+Calls go through pooled keep-alive connections (a shared requests.Session for sync callers, a shared
+httpx.AsyncClient per event loop for async callers). Identical in-flight requests are coalesced into one
+upstream call, 429/5xx responses are retried with jittered exponential backoff, and successful responses are
+cached in memory and on disk under a key derived from model, system prompt, prompt and temperature.
 """
 import os
+import json
+import time
+import random
+import sqlite3
+import asyncio
+import hashlib
 import logging
+import threading
+import weakref
+from concurrent.futures import Future
+from pathlib import Path
 import requests
+import httpx
 from cachetools import TTLCache
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Optional
 
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY", "")
 # Support both OPENROUTER_BASE_URL and OPENROUTER_URL. If a /chat/completions endpoint is provided,
 # keep it as-is; otherwise append the correct path when calling.
 OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL") or os.getenv("OPENROUTER_URL") or "https://openrouter.ai/api/v1"
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "openai/gpt-oss-20b:free")
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = 20.0
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(60 * 60 * 24)))
+LLM_CACHE_PATH = Path(__file__).parent.parent / "data" / "llm_cache.sqlite"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
 
 logger = logging.getLogger("openrouter_client")
-cache = TTLCache(maxsize=128, ttl=60*60*24)  # 24h cache
+cache = TTLCache(maxsize=1024, ttl=LLM_CACHE_TTL)  # 24h in-memory cache in front of the disk cache
+
+
+class ResponseCache:
+    """SQLite-backed response cache shared by all clients in the process."""
+
+    def __init__(self, path: Path = LLM_CACHE_PATH, ttl: int = LLM_CACHE_TTL):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(path), check_same_thread=False)
+            self._db.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)")
+            self._db.commit()
+        except Exception as e:
+            logger.warning(f"LLM disk cache unavailable: {e}")
+            self._db = None
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        if self._db is None:
+            return None
+        with self._lock:
+            try:
+                row = self._db.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            except Exception as e:
+                logger.warning(f"LLM disk cache read failed: {e}")
+                return None
+        if not row or time.time() - row[1] > self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        if self._db is None:
+            return
+        with self._lock:
+            try:
+                now = time.time()
+                self._db.execute("INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)", (key, json.dumps(value), now))
+                self._db.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"LLM disk cache write failed: {e}")
+
+
+_disk_cache: Optional[ResponseCache] = None
+_session: Optional[requests.Session] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+_inflight: Dict[str, Future] = {}
+_async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Task]]" = weakref.WeakKeyDictionary()
+_shared_lock = threading.Lock()
+_memory_lock = threading.Lock()
+
+
+def _get_disk_cache() -> ResponseCache:
+    global _disk_cache
+    with _shared_lock:
+        if _disk_cache is None:
+            _disk_cache = ResponseCache()
+        return _disk_cache
+
+
+def _get_session() -> requests.Session:
+    global _session
+    with _shared_lock:
+        if _session is None:
+            _session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16)
+            _session.mount("https://", adapter)
+            _session.mount("http://", adapter)
+        return _session
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    # httpx clients are bound to the loop they were first used on, so keep one per loop
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(timeout=30, limits=httpx.Limits(max_connections=16, max_keepalive_connections=8))
+        _async_clients[loop] = client
+    return client
+
+
+def _backoff(attempt: int, retry_after: Optional[str] = None) -> float:
+    if retry_after:
+        try:
+            return min(float(retry_after), LLM_BACKOFF_MAX)
+        except ValueError:
+            pass
+    # Full jitter: uniform in [0, base * 2^attempt]
+    return random.uniform(0, min(LLM_BACKOFF_MAX, LLM_BACKOFF_BASE * (2 ** attempt)))
+
 
 class OpenRouterClient:
     def __init__(self, api_key: str = None, model: str = None):
         self.api_key = api_key or OPENROUTER_API_KEY
         self.model = model or OPENROUTER_MODEL
 
-    def call_llm(self, prompt: str, system_prompt: str = None, temperature: float = 0.0, cache_key: str = None) -> Dict[str, Any]:
-        """
-        Calls OpenRouter LLM with prompt and system message. Caches response for efficiency.
-        """
-        if cache_key and cache_key in cache:
-            return cache[cache_key]
-        headers = {
+    def _url(self) -> str:
+        url = OPENROUTER_BASE_URL.rstrip("/")
+        if not url.endswith("/chat/completions"):
+            url = f"{url}/chat/completions"
+        return url
+
+    def _headers(self) -> Dict[str, str]:
+        return {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json",
             # OpenRouter recommends these headers but they are optional for basic use
             "HTTP-Referer": os.getenv("OPENROUTER_REFERRER", "http://localhost"),
             "X-Title": os.getenv("OPENROUTER_X_TITLE", "MarketSentinel"),
         }
-        payload = {
+
+    def _payload(self, prompt: str, system_prompt: str, temperature: float) -> Dict[str, Any]:
+        return {
             "model": self.model,
             "messages": [
                 {"role": "system", "content": system_prompt or ""},
@@ -47,22 +162,164 @@ class OpenRouterClient:
             # Provide a stable user identifier for better caching/analytics (optional)
             "user": os.getenv("OPENROUTER_USER", "marketsentinel-demo")
         }
+
+    def cache_key_for(self, prompt: str, system_prompt: str = None, temperature: float = 0.0) -> str:
+        raw = json.dumps([self.model, system_prompt or "", prompt, round(float(temperature), 4)], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str) -> Optional[Dict[str, Any]]:
+        with _memory_lock:
+            hit = cache.get(key)
+        if hit is not None:
+            return hit
+        hit = _get_disk_cache().get(key)
+        if hit is not None:
+            with _memory_lock:
+                cache[key] = hit
+        return hit
+
+    def _store(self, key: str, result: Dict[str, Any]) -> None:
+        if isinstance(result, dict) and "error" not in result:
+            with _memory_lock:
+                cache[key] = result
+            _get_disk_cache().set(key, result)
+
+    def _post(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        session = _get_session()
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                resp = session.post(self._url(), json=payload, headers=self._headers(), timeout=30)
+                if resp.status_code in RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                    time.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+                    continue
+                resp.raise_for_status()
+                return resp.json()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= LLM_MAX_RETRIES:
+                    raise
+                logger.warning(f"OpenRouter transport error, retrying: {e}")
+                time.sleep(_backoff(attempt))
+        raise RuntimeError("OpenRouter retries exhausted")
+
+    async def _apost(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        client = _get_async_client()
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            try:
+                resp = await client.post(self._url(), json=payload, headers=self._headers())
+                if resp.status_code in RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                    await asyncio.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+                    continue
+                resp.raise_for_status()
+                return resp.json()
+            except httpx.TransportError as e:
+                if attempt >= LLM_MAX_RETRIES:
+                    raise
+                logger.warning(f"OpenRouter transport error, retrying: {e}")
+                await asyncio.sleep(_backoff(attempt))
+        raise RuntimeError("OpenRouter retries exhausted")
+
+    def call_llm(self, prompt: str, system_prompt: str = None, temperature: float = 0.0, cache_key: str = None) -> Dict[str, Any]:
+        """
+        Calls OpenRouter LLM with prompt and system message. Caches response for efficiency.
+        Concurrent identical calls share a single upstream request.
+        """
+        key = cache_key or self.cache_key_for(prompt, system_prompt, temperature)
+        hit = self._cached(key)
+        if hit is not None:
+            return hit
+        with _shared_lock:
+            pending = _inflight.get(key)
+            owner = pending is None
+            if owner:
+                pending = _inflight[key] = Future()
+        if not owner:
+            return pending.result()
+        try:
+            result = self._post(self._payload(prompt, system_prompt, temperature))
+            self._store(key, result)
+        except Exception as e:
+            logger.error(f"OpenRouter LLM call failed: {e}")
+            result = {"error": str(e)}
+        finally:
+            with _shared_lock:
+                _inflight.pop(key, None)
+        pending.set_result(result)
+        return result
+
+    async def acall_llm(self, prompt: str, system_prompt: str = None, temperature: float = 0.0, cache_key: str = None) -> Dict[str, Any]:
+        """Async variant of call_llm over the pooled httpx client."""
+        key = cache_key or self.cache_key_for(prompt, system_prompt, temperature)
+        hit = self._cached(key)
+        if hit is not None:
+            return hit
+        loop = asyncio.get_running_loop()
+        inflight = _async_inflight.setdefault(loop, {})
+        task = inflight.get(key)
+        if task is None:
+            # The shared call is its own task, so cancelling any one caller (even the first) never cancels it
+            task = inflight[key] = loop.create_task(self._acall_shared(key, self._payload(prompt, system_prompt, temperature)))
+            task.add_done_callback(lambda done: inflight.pop(key, None) if inflight.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    async def _acall_shared(self, key: str, payload: Dict[str, Any]) -> Dict[str, Any]:
         try:
-            url = OPENROUTER_BASE_URL.rstrip("/")
-            if not url.endswith("/chat/completions"):
-                url = f"{url}/chat/completions"
-            resp = requests.post(url, json=payload, headers=headers, timeout=30)
-            resp.raise_for_status()
-            result = resp.json()
-            if cache_key:
-                cache[cache_key] = result
-            return result
+            result = await self._apost(payload)
+            self._store(key, result)
         except Exception as e:
             logger.error(f"OpenRouter LLM call failed: {e}")
-            return {"error": str(e)}
+            result = {"error": str(e)}
+        return result
+
+    async def astream_llm(self, prompt: str, system_prompt: str = None, temperature: float = 0.0) -> AsyncIterator[str]:
+        """
+        Yields content deltas as OpenRouter streams them (SSE). A cached response is replayed as a single chunk;
+        a completed stream is cached like a regular call.
+        """
+        key = self.cache_key_for(prompt, system_prompt, temperature)
+        hit = self._cached(key)
+        if hit is not None:
+            content = hit.get("choices", [{}])[0].get("message", {}).get("content")
+            if content:
+                yield content
+                return
+        payload = {**self._payload(prompt, system_prompt, temperature), "stream": True}
+        client = _get_async_client()
+        parts = []
+        for attempt in range(LLM_MAX_RETRIES + 1):
+            async with client.stream("POST", self._url(), json=payload, headers=self._headers()) as resp:
+                if resp.status_code in RETRY_STATUSES and attempt < LLM_MAX_RETRIES:
+                    await asyncio.sleep(_backoff(attempt, resp.headers.get("Retry-After")))
+                    continue
+                resp.raise_for_status()
+                async for line in resp.aiter_lines():
+                    # Lines starting with ":" are keep-alive comments
+                    if not line.startswith("data:"):
+                        continue
+                    data = line[5:].strip()
+                    if data == "[DONE]":
+                        break
+                    try:
+                        chunk = json.loads(data)
+                    except ValueError:
+                        continue
+                    if "error" in chunk:
+                        raise RuntimeError(chunk["error"].get("message", "stream error") if isinstance(chunk["error"], dict) else chunk["error"])
+                    delta = (chunk.get("choices") or [{}])[0].get("delta", {}).get("content")
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            break
+        if parts:
+            self._store(key, {"choices": [{"message": {"role": "assistant", "content": "".join(parts)}}]})
 
     def classify(self, prompt: str, system_prompt: str, cache_key: str = None) -> Dict[str, Any]:
         return self.call_llm(prompt, system_prompt, temperature=0.0, cache_key=cache_key)
 
     def summarize(self, prompt: str, system_prompt: str, cache_key: str = None) -> Dict[str, Any]:
         return self.call_llm(prompt, system_prompt, temperature=0.2, cache_key=cache_key)
+
+    async def aclassify(self, prompt: str, system_prompt: str, cache_key: str = None) -> Dict[str, Any]:
+        return await self.acall_llm(prompt, system_prompt, temperature=0.0, cache_key=cache_key)
+
+    async def asummarize(self, prompt: str, system_prompt: str, cache_key: str = None) -> Dict[str, Any]:
+        return await self.acall_llm(prompt, system_prompt, temperature=0.2, cache_key=cache_key)
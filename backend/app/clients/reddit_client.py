@@ -1,16 +1,17 @@
 """
 Reddit Client for MarketSentinel
-Fetches Reddit posts for a given ticker or list of tickers using PRAW or Pushshift and dumps to data/raw/.
+Fetches Reddit posts for a given ticker or list of tickers using PRAW or Pushshift and appends them to the raw data lake.
 """
 import os
+import asyncio
 import logging
 import requests
-from pathlib import Path
-from typing import List
+import httpx
+from typing import List, Optional
+
+from backend.app.ingest.raw_store import write_records
 
 logger = logging.getLogger("reddit_client")
-RAW_DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
-RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 class RedditClient:
     def __init__(self):
@@ -19,26 +20,9 @@ class RedditClient:
         self.user_agent = os.getenv("REDDIT_USER_AGENT", "MarketSentinelBot/0.1")
 
     def fetch_posts(self, ticker: str, max_results: int = 100) -> List[dict]:
-        output_file = RAW_DATA_DIR / f"{ticker}_reddit.json"
         posts = []
         if self.client_id and self.client_secret:
-            try:
-                import praw
-                reddit = praw.Reddit(
-                    client_id=self.client_id,
-                    client_secret=self.client_secret,
-                    user_agent=self.user_agent
-                )
-                for submission in reddit.subreddit("all").search(ticker, limit=max_results):
-                    posts.append({
-                        "title": submission.title,
-                        "selftext": submission.selftext,
-                        "url": submission.url,
-                        "created_utc": submission.created_utc,
-                        "score": submission.score
-                    })
-            except Exception as e:
-                logger.error(f"PRAW fetch failed: {e}")
+            posts = self._fetch_praw(ticker, max_results)
         else:
             url = f"https://api.pushshift.io/reddit/search/submission/?q={ticker}&size={max_results}"
             try:
@@ -47,16 +31,64 @@ class RedditClient:
                 posts = resp.json().get("data", [])
             except Exception as e:
                 logger.error(f"Pushshift fetch failed: {e}")
+        self._write_raw(ticker, posts)
+        return posts
+
+    def _fetch_praw(self, ticker: str, max_results: int, after: Optional[float] = None) -> List[dict]:
+        posts = []
         try:
-            with open(output_file, "w") as f:
-                import json
-                json.dump(posts, f)
+            import praw
+            reddit = praw.Reddit(
+                client_id=self.client_id,
+                client_secret=self.client_secret,
+                user_agent=self.user_agent
+            )
+            # Incremental fetches walk newest-first and stop at the created_utc watermark
+            sort = "new" if after is not None else "relevance"
+            for submission in reddit.subreddit("all").search(ticker, sort=sort, limit=max_results):
+                if after is not None and submission.created_utc <= after:
+                    break
+                posts.append({
+                    "title": submission.title,
+                    "selftext": submission.selftext,
+                    "url": submission.url,
+                    "created_utc": submission.created_utc,
+                    "score": submission.score
+                })
         except Exception as e:
-            logger.error(f"Failed to write Reddit posts: {e}")
+            logger.error(f"PRAW fetch failed: {e}")
         return posts
 
+    def _write_raw(self, ticker: str, posts: List[dict]) -> None:
+        write_records("reddit", posts, ticker=ticker)
+
     def fetch_posts_for_tickers(self, tickers: List[str], max_results: int = 100) -> List[dict]:
         all_posts = []
         for ticker in tickers:
             all_posts.extend(self.fetch_posts(ticker, max_results=max_results))
         return all_posts
+
+    async def fetch_posts_async(self, http: httpx.AsyncClient, ticker: str, max_results: int = 100,
+                                after: Optional[float] = None) -> List[dict]:
+        """
+        Async variant of fetch_posts. PRAW is blocking, so it runs in a worker thread.
+        With `after` (a created_utc watermark) only newer posts are returned.
+        """
+        posts = []
+        if self.client_id and self.client_secret:
+            posts = await asyncio.to_thread(self._fetch_praw, ticker, max_results, after)
+        else:
+            url = "https://api.pushshift.io/reddit/search/submission/"
+            params = {"q": ticker, "size": max_results}
+            if after is not None:
+                params["after"] = int(after)
+            try:
+                resp = await http.get(url, params=params, timeout=30)
+                resp.raise_for_status()
+                posts = resp.json().get("data", [])
+            except Exception as e:
+                logger.error(f"Pushshift fetch failed: {e}")
+            if after is not None:
+                posts = [p for p in posts if p.get("created_utc", 0) > after]
+        self._write_raw(ticker, posts)
+        return posts
@@ -4,11 +4,14 @@ Fetches messages from public Slack channels for a given ticker or list of ticker
 """
 import os
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
 import requests
+import httpx
 
 logger = logging.getLogger("slack_client")
 
+SEARCH_URL = "https://slack.com/api/search.messages"
+
 class SlackClient:
     def __init__(self):
         self.token = os.getenv("SLACK_API_KEY")
@@ -16,28 +19,48 @@ class SlackClient:
     def fetch_messages(self, channel: str, query: str, max_results: int = 50) -> List[Dict]:
         if not self.token:
             return []
-        url = "https://slack.com/api/search.messages"
         headers = {"Authorization": f"Bearer {self.token}"}
         params = {"query": query, "count": max_results, "sort": "timestamp", "sort_dir": "desc"}
         try:
-            resp = requests.get(url, headers=headers, params=params, timeout=10)
+            resp = requests.get(SEARCH_URL, headers=headers, params=params, timeout=10)
             resp.raise_for_status()
-            data = resp.json()
-            messages = []
-            for match in data.get("messages", {}).get("matches", []):
-                if match.get("channel", {}).get("name") == channel:
-                    messages.append({
-                        "text": match.get("text", ""),
-                        "user": match.get("username", "anon"),
-                        "ts": match.get("ts", "")
-                    })
-            return messages
+            return self._parse_matches(resp.json(), channel)
         except Exception as e:
             logger.error(f"Failed to fetch Slack messages: {e}")
             return []
 
+    def _parse_matches(self, data: Dict, channel: str) -> List[Dict]:
+        messages = []
+        for match in data.get("messages", {}).get("matches", []):
+            if match.get("channel", {}).get("name") == channel:
+                messages.append({
+                    "text": match.get("text", ""),
+                    "user": match.get("username", "anon"),
+                    "ts": match.get("ts", "")
+                })
+        return messages
+
     def fetch_messages_for_tickers(self, channel: str, tickers: List[str], max_results: int = 50) -> List[Dict]:
         all_msgs = []
         for ticker in tickers:
             all_msgs.extend(self.fetch_messages(channel, ticker, max_results=max_results))
         return all_msgs
+
+    async def fetch_messages_async(self, http: httpx.AsyncClient, channel: str, query: str, max_results: int = 50,
+                                   oldest: Optional[str] = None) -> List[Dict]:
+        """With `oldest` (a message ts watermark) only newer messages are returned."""
+        if not self.token:
+            return []
+        headers = {"Authorization": f"Bearer {self.token}"}
+        params = {"query": query, "count": max_results, "sort": "timestamp", "sort_dir": "desc"}
+        try:
+            resp = await http.get(SEARCH_URL, headers=headers, params=params, timeout=10)
+            resp.raise_for_status()
+            messages = self._parse_matches(resp.json(), channel)
+            if oldest:
+                # search.messages only filters by day; ts strings compare as floats
+                messages = [m for m in messages if m["ts"] and float(m["ts"]) > float(oldest)]
+            return messages
+        except Exception as e:
+            logger.error(f"Failed to fetch Slack messages: {e}")
+            return []
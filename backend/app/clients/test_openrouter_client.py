@@ -13,3 +13,86 @@ def test_openrouter_error(monkeypatch):
     monkeypatch.setattr(client, "call_llm", lambda *a, **kw: {"error": "fail"})
     result = client.classify("prompt", "system", cache_key="bar")
     assert "error" in result
+
+def _isolate(monkeypatch, tmp_path, handler):
+    import httpx
+    from backend.app.clients import openrouter_client as orc
+    monkeypatch.setattr(orc, "_disk_cache", orc.ResponseCache(tmp_path / "llm.sqlite"))
+    monkeypatch.setattr(orc, "cache", orc.TTLCache(maxsize=16, ttl=60))
+    monkeypatch.setattr(orc, "_backoff", lambda *a, **kw: 0)
+    monkeypatch.setattr(orc, "_get_async_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    return orc
+
+def test_async_coalesces_retries_and_persists(monkeypatch, tmp_path):
+    import asyncio
+    import httpx
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        if len(calls) == 1:
+            return httpx.Response(429)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    orc = _isolate(monkeypatch, tmp_path, handler)
+    client = OpenRouterClient(api_key="demo-key")
+
+    async def burst():
+        return await asyncio.gather(*(client.aclassify("same prompt", "system") for _ in range(5)))
+
+    results = asyncio.run(burst())
+    assert len(calls) == 2  # one 429 + one retry, shared by all five callers
+    assert all(r["choices"][0]["message"]["content"] == "ok" for r in results)
+    orc.cache.clear()
+    assert asyncio.run(client.aclassify("same prompt", "system"))["choices"][0]["message"]["content"] == "ok"
+    assert len(calls) == 2  # served from the on-disk cache
+
+def test_cancelling_the_first_caller_does_not_cancel_coalesced_waiters(monkeypatch, tmp_path):
+    import asyncio
+    import httpx
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, json={"choices": [{"message": {"content": "ok"}}]})
+
+    _isolate(monkeypatch, tmp_path, handler)
+    client = OpenRouterClient(api_key="demo-key")
+
+    async def run():
+        first = asyncio.create_task(client.aclassify("prompt", "system"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(client.aclassify("prompt", "system"))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second, first.cancelled()
+
+    result, cancelled = asyncio.run(run())
+    assert cancelled and result["choices"][0]["message"]["content"] == "ok" and len(calls) == 1
+
+def test_astream_llm_yields_deltas_and_caches(monkeypatch, tmp_path):
+    import asyncio
+    import httpx
+    body = (
+        ": OPENROUTER PROCESSING\n\n"
+        'data: {"choices": [{"delta": {"content": "Hel"}}]}\n\n'
+        'data: {"choices": [{"delta": {"content": "lo"}}]}\n\n'
+        "data: [DONE]\n\n"
+    )
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+
+    _isolate(monkeypatch, tmp_path, handler)
+    client = OpenRouterClient(api_key="demo-key")
+
+    async def collect():
+        return [d async for d in client.astream_llm("prompt", "system")]
+
+    assert asyncio.run(collect()) == ["Hel", "lo"]
+    assert asyncio.run(collect()) == ["Hello"]
+    assert len(calls) == 1
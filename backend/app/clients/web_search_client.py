@@ -3,9 +3,11 @@ Web Search and News Client for MarketSentinel
 Supports Google Custom Search API and Google News RSS feeds for news ingestion.
 """
 import os
+import calendar
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple
 import requests
+import httpx
 import feedparser
 
 logger = logging.getLogger("web_search_client")
@@ -44,15 +46,22 @@ class WebSearchClient:
         """
         Fetches news articles for a ticker using Google News RSS feed.
         """
-        url = f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+        url = self._news_url(ticker)
         feed = feedparser.parse(url)
+        return self._entries_to_articles(feed, max_results)
+
+    def _news_url(self, ticker: str) -> str:
+        return f"https://news.google.com/rss/search?q={ticker}+stock&hl=en-US&gl=US&ceid=US:en"
+
+    def _entries_to_articles(self, feed, max_results: int) -> List[Dict]:
         articles = []
         for entry in feed.entries[:max_results]:
             articles.append({
                 "title": getattr(entry, "title", ""),
                 "url": getattr(entry, "link", ""),
                 "published": getattr(entry, "published", ""),
-                "summary": getattr(entry, "summary", "")
+                "summary": getattr(entry, "summary", ""),
+                "published_ts": calendar.timegm(entry.published_parsed) if getattr(entry, "published_parsed", None) else None
             })
         return articles
 
@@ -61,18 +70,50 @@ class WebSearchClient:
         q = requests.utils.quote(query)
         url = f"https://news.google.com/rss/search?q={q}&hl=en-US&gl=US&ceid=US:en"
         feed = feedparser.parse(url)
-        articles = []
-        for entry in feed.entries[:max_results]:
-            articles.append({
-                "title": getattr(entry, "title", ""),
-                "url": getattr(entry, "link", ""),
-                "published": getattr(entry, "published", ""),
-                "summary": getattr(entry, "summary", "")
-            })
-        return articles
+        return self._entries_to_articles(feed, max_results)
 
     def fetch_news_for_tickers(self, tickers: List[str], max_results: int = 10) -> List[Dict]:
         all_news = []
         for ticker in tickers:
             all_news.extend(self.fetch_google_news(ticker, max_results=max_results))
         return all_news
+
+    async def fetch_google_news_async(self, http: httpx.AsyncClient, ticker: str, max_results: int = 10) -> List[Dict]:
+        """Async variant of fetch_google_news: downloads the RSS body with httpx and parses it locally."""
+        try:
+            resp = await http.get(self._news_url(ticker), timeout=10)
+            resp.raise_for_status()
+        except Exception as e:
+            logger.error(f"Google News RSS fetch failed for {ticker}: {e}")
+            return []
+        return self._entries_to_articles(feedparser.parse(resp.content), max_results)
+
+    async def fetch_google_news_since_async(self, http: httpx.AsyncClient, ticker: str, watermark: Dict,
+                                            max_results: int = 10) -> Tuple[List[Dict], Dict]:
+        """
+        Incremental fetch_google_news_async. Sends the stored ETag/Last-Modified as a conditional request and
+        drops articles published at or before the watermark. Returns (new articles, updated watermark).
+        """
+        headers = {}
+        if watermark.get("etag"):
+            headers["If-None-Match"] = watermark["etag"]
+        if watermark.get("last_modified"):
+            headers["If-Modified-Since"] = watermark["last_modified"]
+        try:
+            resp = await http.get(self._news_url(ticker), headers=headers, timeout=10)
+            if resp.status_code == 304:
+                return [], watermark
+            resp.raise_for_status()
+        except Exception as e:
+            logger.error(f"Google News RSS fetch failed for {ticker}: {e}")
+            return [], watermark
+        articles = self._entries_to_articles(feedparser.parse(resp.content), max_results)
+        since = watermark.get("published", 0)
+        fresh = [a for a in articles if a["published_ts"] is None or a["published_ts"] > since]
+        published = [a["published_ts"] for a in articles if a["published_ts"] is not None]
+        mark = {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "published": max(published + [since]),
+        }
+        return fresh, mark
@@ -1,16 +1,14 @@
 """
 X.com (Twitter) Client for MarketSentinel
-Fetches tweets for a given ticker or list of tickers using snscrape.
+Fetches tweets for a given ticker or list of tickers using snscrape and appends them to the raw data lake.
 """
-import json
+import asyncio
 import logging
 from typing import List
-from pathlib import Path
-import subprocess
+
+from backend.app.ingest.raw_store import RawWriter, tee_command, write_records
 
 logger = logging.getLogger("x_client")
-RAW_DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
-RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 class XClient:
     def fetch_tweets(self, ticker: str, max_results: int = 100) -> List[dict]:
@@ -27,26 +25,22 @@ class XClient:
                     "url": getattr(tweet, "url", ""),
                     "user": getattr(getattr(tweet, "user", None), "username", "")
                 })
+            write_records("x.com", results, ticker=ticker)
             return results
         except Exception as e:
             logger.warning(f"snscrape module fallback to CLI due to: {e}")
-        # Fallback: CLI
-        output_file = RAW_DATA_DIR / f"{ticker}_tweets.json"
+        # Fallback: CLI, streamed into the raw data lake (source=x.com)
         cmd = [
             "snscrape",
             "--jsonl",
+            "--max-results",
+            str(max_results),
             "twitter-search",
             f"{ticker} lang:en",
         ]
         try:
-            with open(output_file, "w") as f:
-                proc = subprocess.Popen(cmd, stdout=f, stderr=subprocess.PIPE)
-                _, err = proc.communicate(timeout=60)
-                if proc.returncode != 0:
-                    logger.error(f"snscrape failed: {err}")
-            with open(output_file) as f:
-                tweets = [json.loads(line) for line in f][:max_results]
-            return tweets
+            with RawWriter("x.com", ticker=ticker) as writer:
+                return tee_command(cmd, writer, max_results)
         except Exception as e:
             logger.error(f"Failed to fetch tweets for {ticker}: {e}")
             return []
@@ -56,3 +50,7 @@ class XClient:
         for ticker in tickers:
             all_tweets.extend(self.fetch_tweets(ticker, max_results=max_results))
         return all_tweets
+
+    async def fetch_tweets_async(self, ticker: str, max_results: int = 100) -> List[dict]:
+        """snscrape has no async API; run the blocking scrape in a worker thread."""
+        return await asyncio.to_thread(self.fetch_tweets, ticker, max_results)
@@ -1,23 +1,21 @@
 """
 YouTube Transcript Client for MarketSentinel
-Fetches YouTube transcripts for a query and dumps to data/raw/.
+Fetches YouTube transcripts for a query and appends them to the raw data lake.
 """
 import logging
 from youtube_transcript_api import YouTubeTranscriptApi, NoTranscriptFound
-from pathlib import Path
 from typing import List
 
+from backend.app.ingest.raw_store import write_records
+
 logger = logging.getLogger("youtube_client")
-RAW_DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
-RAW_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 class YouTubeClient:
     def fetch_transcripts(self, video_ids: List[str]) -> dict:
         """
         Fetches transcripts for a list of YouTube video IDs.
-        Dumps results to data/raw/youtube_transcripts.json.
+        Appends results to the raw data lake (source=youtube), one record per video.
         """
-        output_file = RAW_DATA_DIR / "youtube_transcripts.json"
         transcripts = {}
         for vid in video_ids:
             try:
@@ -27,7 +25,5 @@ class YouTubeClient:
                 logger.warning(f"No transcript found for video {vid}")
             except Exception as e:
                 logger.error(f"Error fetching transcript for {vid}: {e}")
-        with open(output_file, "w") as f:
-            import json
-            json.dump(transcripts, f)
+        write_records("youtube", ({"video_id": vid, "transcript": t} for vid, t in transcripts.items()))
         return transcripts
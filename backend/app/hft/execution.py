@@ -0,0 +1,222 @@
+"""
+Execution Strategies for MarketSentinel
+Batched, columnar simulations of VWAP/TWAP parent orders and micro-momentum trading over [series, bars] arrays
+(one row per session/day). Everything is expressed with array primitives, so thousands of days, parent orders
+or parameter sets are evaluated together instead of looping per tick:
+- schedules: target cumulative-quantity curves (linear for TWAP, a trailing-days volume profile for VWAP),
+  capped by a participation limit with carry-over via a running minimum, E_t = C_t + min(0, min_s<=t (T_s - C_s));
+- momentum: rolling log returns from shifted log prices, entry edges, forward-path windows for stop/take/reversal
+  exit masks, and a vectorized "next entry after exit" chain to keep trades non-overlapping.
+"""
+import logging
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("execution")
+
+TWAP, VWAP = 0, 1
+SCHEDULES = {"twap": TWAP, "vwap": VWAP}
+ORDER_CHUNK = 16384
+CANDIDATE_CHUNK = 16384
+# Momentum parameters a param set may leave out
+MOMENTUM_LOOKBACK = 5
+MOMENTUM_THRESHOLD = 0.001
+
+
+# -- bars ------------------------------------------------------------------------------------------------
+
+def bars_from_ticks(ts: np.ndarray, price: np.ndarray, size: np.ndarray, n_bars: int):
+    """(bar price, bar volume) over n_bars equal time buckets; the bar price is the bucket's VWAP, carried
+    forward through empty buckets."""
+    ts = np.asarray(ts, dtype=np.float64)
+    span = max(ts[-1] - ts[0], 1e-12)
+    bucket = np.minimum(((ts - ts[0]) / span * n_bars).astype(np.int64), n_bars - 1)
+    volume = np.bincount(bucket, weights=size, minlength=n_bars)
+    notional = np.bincount(bucket, weights=np.asarray(price) * size, minlength=n_bars)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        bar_price = np.where(volume > 0, notional / volume, np.nan)
+    idx = np.where(np.isnan(bar_price), 0, np.arange(n_bars))
+    np.maximum.accumulate(idx, out=idx)
+    bar_price = bar_price[idx]
+    if np.isnan(bar_price[0]):
+        bar_price[np.isnan(bar_price)] = price[0]
+    return bar_price, volume
+
+
+def volume_profile(volume: np.ndarray, lookback: int = 20) -> np.ndarray:
+    """Per-day forecast of the intraday volume distribution: the mean of the previous `lookback` days' bar
+    fractions (no look-ahead); uniform on the first day."""
+    days, bars = volume.shape
+    totals = volume.sum(axis=1, keepdims=True)
+    frac = np.divide(volume, totals, out=np.full(volume.shape, 1.0 / bars), where=totals > 0)
+    csum = np.vstack([np.zeros((1, bars)), np.cumsum(frac, axis=0)])
+    d = np.arange(days)
+    lo = np.maximum(d - lookback, 0)
+    count = (d - lo)[:, None]
+    return np.where(count > 0, (csum[d] - csum[lo]) / np.maximum(count, 1), 1.0 / bars)
+
+
+# -- VWAP / TWAP ----------------------------------------------------------------------------------------
+
+def execute_schedules(price: np.ndarray, volume: np.ndarray, orders: Dict[str, np.ndarray],
+                      max_participation: float = 0.1, impact_bps: float = 10.0, lookback: int = 20,
+                      profile: Optional[np.ndarray] = None, children: bool = False) -> Dict[str, np.ndarray]:
+    """Simulates many parent orders at once over [days, bars] price/volume arrays.
+    orders: arrays day, start, end (bar range [start, end)), qty, side (+1 buy / -1 sell), schedule (TWAP/VWAP).
+    VWAP weights come from `profile` ([days, bars]) when given, else from volume_profile(volume, lookback).
+    Each bar's child fills at the bar price moved against us by impact_bps x participation.
+    Returns per-order filled qty, average price, market VWAP over the window, arrival price and slippage (bps,
+    positive = worse than the benchmark); with children=True also the [orders, bars] child_qty and child_price."""
+    price = np.asarray(price, dtype=np.float64)
+    volume = np.asarray(volume, dtype=np.float64)
+    profile = volume_profile(volume, lookback) if profile is None else np.broadcast_to(profile, price.shape)
+    n = len(orders["day"])
+    out = {k: np.zeros(n) for k in ("filled", "avg_price", "market_vwap", "arrival", "vs_vwap_bps", "vs_arrival_bps")}
+    bars = np.arange(price.shape[1])
+    if children:
+        out["child_qty"] = np.zeros((n, price.shape[1]))
+        out["child_price"] = np.zeros((n, price.shape[1]))
+    for lo in range(0, n, ORDER_CHUNK):
+        sl = slice(lo, min(n, lo + ORDER_CHUNK))
+        day = np.asarray(orders["day"][sl], dtype=np.int64)
+        start = np.asarray(orders["start"][sl], dtype=np.int64)[:, None]
+        end = np.asarray(orders["end"][sl], dtype=np.int64)[:, None]
+        qty = np.asarray(orders["qty"][sl], dtype=np.float64)[:, None]
+        side = np.asarray(orders["side"][sl], dtype=np.float64)
+        schedule = np.asarray(orders["schedule"][sl])[:, None]
+        window = (bars >= start) & (bars < end)
+        px, vol = price[day], volume[day]
+        weights = np.where(schedule == VWAP, profile[day], 1.0) * window
+        target = qty * np.cumsum(weights, axis=1) / np.maximum(weights.sum(axis=1, keepdims=True), 1e-12)
+        cap = np.cumsum(max_participation * vol * window, axis=1)
+        executed = cap + np.minimum(np.minimum.accumulate(target - cap, axis=1), 0.0)
+        child = np.diff(executed, axis=1, prepend=0.0)
+        child[child < 1e-12] = 0.0
+        participation = np.divide(child, vol, out=np.zeros_like(child), where=vol > 0)
+        fill_px = px * (1.0 + side[:, None] * impact_bps / 1e4 * participation)
+        filled = child.sum(axis=1)
+        avg = np.divide((child * fill_px).sum(axis=1), filled, out=np.full(len(filled), np.nan), where=filled > 0)
+        wvol = vol * window
+        market_vwap = np.divide((px * wvol).sum(axis=1), wvol.sum(axis=1), out=np.full(len(filled), np.nan),
+                                where=wvol.sum(axis=1) > 0)
+        arrival = px[np.arange(len(day)), np.minimum(start[:, 0], price.shape[1] - 1)]
+        out["filled"][sl] = filled
+        out["avg_price"][sl] = avg
+        out["market_vwap"][sl] = market_vwap
+        out["arrival"][sl] = arrival
+        out["vs_vwap_bps"][sl] = side * (avg / market_vwap - 1.0) * 1e4
+        out["vs_arrival_bps"][sl] = side * (avg / arrival - 1.0) * 1e4
+        if children:
+            out["child_qty"][sl] = child
+            out["child_price"][sl] = fill_px
+    return out
+
+
+# -- micro-momentum -------------------------------------------------------------------------------------
+
+def rolling_log_return(logp: np.ndarray, lookback: int) -> np.ndarray:
+    """log(p_t / p_{t-lookback}) along the last axis; NaN for the first `lookback` bars."""
+    r = np.full(logp.shape, np.nan)
+    r[..., lookback:] = logp[..., lookback:] - logp[..., :-lookback]
+    return r
+
+
+def next_index(mask: np.ndarray) -> np.ndarray:
+    """For each position along the last axis, the index of the next True at or after it (len if none)."""
+    n = mask.shape[-1]
+    idx = np.where(mask, np.arange(n, dtype=np.int32), np.int32(n))
+    return np.minimum.accumulate(idx[..., ::-1], axis=-1)[..., ::-1]
+
+
+def momentum_trades(price: np.ndarray, params: Sequence[Dict], cost_bps: float = 0.0) -> Dict[str, np.ndarray]:
+    """All trades of every parameter set over [series, bars] prices, as flat arrays tagged with the param index.
+    params: lookback (bars, default MOMENTUM_LOOKBACK), threshold (log return to enter, default MOMENTUM_THRESHOLD),
+    stop / take (log return from entry), max_hold (bars).
+    Enters on the bar a rolling return first clears +/-threshold; exits at the first bar where the stop or take
+    level is hit, the signal reverses, max_hold elapses or the series ends. One position at a time per series;
+    an entry on the exit bar flips the position."""
+    logp = np.log(np.asarray(price, dtype=np.float64))
+    if logp.ndim == 1:
+        logp = logp[None, :]
+    n_series, n_bars = logp.shape
+    lookback = [int(p.get("lookback", MOMENTUM_LOOKBACK)) for p in params]
+    threshold = [float(p.get("threshold", MOMENTUM_THRESHOLD)) for p in params]
+    returns = {lb: rolling_log_return(logp, lb) for lb in set(lookback)}
+    signals = np.empty((len(params), n_series, n_bars), dtype=np.int8)
+    for k in range(len(params)):
+        r = returns[lookback[k]]
+        with np.errstate(invalid="ignore"):
+            signals[k] = (r > threshold[k]).astype(np.int8) - (r < -threshold[k]).astype(np.int8)
+    prev = np.concatenate([np.zeros(signals.shape[:2] + (1,), dtype=np.int8), signals[..., :-1]], axis=-1)
+    pk, ps, pt = np.nonzero((signals != 0) & (signals != prev))
+    side = signals[pk, ps, pt].astype(np.float64)
+
+    stop = np.array([p.get("stop", np.inf) for p in params])[pk]
+    take = np.array([p.get("take", np.inf) for p in params])[pk]
+    hold = np.array([int(p.get("max_hold", n_bars)) for p in params])[pk]
+
+    # Exit by reversal, max_hold or series end in O(1) per entry: next bar with the opposite signal
+    exit_t = np.minimum(pt + hold, n_bars - 1)
+    after = np.minimum(pt + 1, n_bars - 1)
+    for k in range(len(params)):
+        sel = np.flatnonzero(pk == k)
+        if not len(sel):
+            continue
+        for sign in (1, -1):
+            opposite = next_index(signals[k] == -sign)
+            mine = sel[side[sel] == sign]
+            exit_t[mine] = np.minimum(exit_t[mine], opposite[ps[mine], after[mine]])
+    # Stop/take levels need the price path up to that exit; scan it in chunks of similar length
+    scan = np.flatnonzero(np.isfinite(stop) | np.isfinite(take))
+    scan = scan[np.argsort(exit_t[scan] - pt[scan], kind="stable")]
+    for lo in range(0, len(scan), CANDIDATE_CHUNK):
+        c = scan[lo:lo + CANDIDATE_CHUNK]
+        length = exit_t[c] - pt[c]
+        width = int(length.max()) if len(c) else 0
+        if width <= 0:
+            continue
+        steps = np.arange(1, width + 1)
+        path = side[c, None] * (logp[ps[c, None], np.minimum(pt[c, None] + steps, n_bars - 1)] - logp[ps[c], pt[c]][:, None])
+        hit = ((path <= -stop[c, None]) | (path >= take[c, None])) & (steps <= length[:, None])
+        first = np.argmax(hit, axis=1)
+        found = hit[np.arange(len(c)), first]
+        exit_t[c[found]] = pt[c[found]] + first[found] + 1
+    ret = side * (logp[ps, exit_t] - logp[ps, pt])
+
+    # Keep trades non-overlapping: from each group's first entry, follow "first entry at or after this exit"
+    # (a reversal exit and the opposite entry share a bar, i.e. the position flips)
+    group = pk * n_series + ps
+    key = group * (n_bars + 1) + pt
+    nxt = np.maximum(np.searchsorted(key, group * (n_bars + 1) + exit_t, side="left"), np.arange(len(key)) + 1)
+    nxt[(nxt < len(key)) & (group[np.minimum(nxt, len(key) - 1)] != group)] = len(key)
+    accepted = np.zeros(len(key), dtype=bool)
+    ptr = np.flatnonzero(np.r_[True, group[1:] != group[:-1]]) if len(key) else np.zeros(0, dtype=np.int64)
+    while len(ptr):
+        accepted[ptr] = True
+        ptr = nxt[ptr]
+        ptr = ptr[ptr < len(key)]
+    a = accepted
+    return {
+        "param": pk[a], "series": ps[a], "entry": pt[a], "exit": exit_t[a], "side": side[a].astype(np.int8),
+        "return": ret[a] - 2 * cost_bps / 1e4,
+    }
+
+
+def summarize_trades(trades: Dict[str, np.ndarray], n_params: int) -> List[Dict]:
+    """Per parameter set: trade count, total and mean log return, hit rate and per-trade Sharpe."""
+    k, r = trades["param"], trades["return"]
+    count = np.bincount(k, minlength=n_params)
+    total = np.bincount(k, weights=r, minlength=n_params)
+    sq = np.bincount(k, weights=r * r, minlength=n_params)
+    wins = np.bincount(k, weights=(r > 0).astype(float), minlength=n_params)
+    safe = np.maximum(count, 1)
+    mean = total / safe
+    var = np.maximum(sq / safe - mean ** 2, 0.0) * safe / np.maximum(count - 1, 1)
+    std = np.sqrt(var)
+    sharpe = np.divide(mean, std, out=np.zeros(n_params), where=std > 0)
+    return [
+        {"trades": int(count[i]), "total_return": float(total[i]), "mean_return_bps": float(mean[i] * 1e4),
+         "hit_rate": float(wins[i] / safe[i]), "sharpe_per_trade": float(sharpe[i])}
+        for i in range(n_params)
+    ]
@@ -0,0 +1,217 @@
+"""
+Limit Order Book Simulator for MarketSentinel
+Event-driven replay of L2 depth updates and trades through an array-backed book (one qty slot per price tick
+per side), with our own orders tracked at L3 granularity: each working quote knows the queue ahead of it.
+Fill model:
+- Trades at our price first consume the queue ahead, then fill us; trades through our price fill us fully.
+- Depth decreases at our level shrink the queue ahead to at most the new level size (cancels are assumed to
+  come from ahead of us, the conservative choice).
+- Order entry, replace and cancel take `latency` (in event-timestamp units) to reach the book; until then the
+  old quote can still trade. Quotes are post-only: one that would cross on arrival is dropped, as is one that
+  would breach the position limit given the inventory at arrival.
+The strategy quotes around the mid skewed against inventory, within a position limit. The replay loop is a
+plain function over NumPy arrays, compiled with numba when it is installed (pure Python otherwise).
+"""
+import logging
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("lob_sim")
+
+DEPTH, TRADE = 0, 1
+BID, ASK = 1, -1
+
+
+def _replay(ts, kind, side, price, qty, base, n_levels, half_spread, skew, quote_size, max_position, latency,
+            out_ts, out_side, out_price, out_qty):
+    bid_book = np.zeros(n_levels)
+    ask_book = np.zeros(n_levels)
+    best_bid, best_ask = -1, n_levels
+    # Per side (0 = our bid, 1 = our ask): working order and the pending entry/replace/cancel
+    live_px = np.full(2, -1, dtype=np.int64)
+    live_qty = np.zeros(2)
+    queue = np.zeros(2)
+    pend_px = np.full(2, -1, dtype=np.int64)
+    pend_at = np.full(2, -1, dtype=np.int64)
+    inventory = 0.0
+    cash = 0.0  # in ticks x qty
+    volume = 0.0
+    max_inventory = 0.0
+    orders = 0
+    n_trades = 0
+    cap = out_ts.shape[0]
+    for i in range(ts.shape[0]):
+        t = ts[i]
+        # 1. pending orders that have reached the book
+        for s in range(2):
+            if pend_at[s] >= 0 and pend_at[s] <= t:
+                pend_at[s] = -1
+                px = pend_px[s]
+                live_px[s] = -1
+                live_qty[s] = 0.0
+                # The old quote may have filled while this one was in flight: re-check the position limit
+                allowed = inventory + quote_size <= max_position if s == 0 else inventory - quote_size >= -max_position
+                if px >= 0 and allowed:
+                    crosses = px >= best_ask if s == 0 else px <= best_bid
+                    if not crosses:
+                        live_px[s] = px
+                        live_qty[s] = quote_size
+                        queue[s] = (bid_book[px] if s == 0 else ask_book[px]) if 0 <= px < n_levels else 0.0
+        # 2. the market event
+        p = price[i] - base
+        q = qty[i]
+        if kind[i] == DEPTH:
+            if 0 <= p < n_levels:
+                if side[i] == BID:
+                    bid_book[p] = q
+                    if q > 0:
+                        if p > best_bid:
+                            best_bid = p
+                        while best_ask <= p:  # uncross stale asks
+                            ask_book[best_ask] = 0.0
+                            best_ask += 1
+                            while best_ask < n_levels and ask_book[best_ask] == 0.0:
+                                best_ask += 1
+                    elif p == best_bid:
+                        while best_bid >= 0 and bid_book[best_bid] == 0.0:
+                            best_bid -= 1
+                    if live_px[0] == p and queue[0] > q:
+                        queue[0] = q
+                else:
+                    ask_book[p] = q
+                    if q > 0:
+                        if p < best_ask:
+                            best_ask = p
+                        while best_bid >= p:  # uncross stale bids
+                            bid_book[best_bid] = 0.0
+                            best_bid -= 1
+                            while best_bid >= 0 and bid_book[best_bid] == 0.0:
+                                best_bid -= 1
+                    elif p == best_ask:
+                        while best_ask < n_levels and ask_book[best_ask] == 0.0:
+                            best_ask += 1
+                    if live_px[1] == p and queue[1] > q:
+                        queue[1] = q
+        # 3. fills against our working orders
+        for s in range(2):
+            if live_px[s] < 0:
+                continue
+            px = live_px[s]
+            fill = 0.0
+            if kind[i] == TRADE and side[i] == (ASK if s == 0 else BID):
+                # a sell aggressor trades with bids (s = 0), a buy aggressor with asks (s = 1)
+                through = p < px if s == 0 else p > px
+                if through:
+                    fill = live_qty[s]
+                elif p == px:
+                    fill = min(live_qty[s], max(0.0, q - queue[s]))
+                    queue[s] = max(0.0, queue[s] - q)
+            elif kind[i] == DEPTH:
+                crossed = (best_ask <= px) if s == 0 else (best_bid >= px)
+                if crossed:
+                    fill = live_qty[s]
+            if fill > 0.0:
+                direction = 1.0 if s == 0 else -1.0
+                inventory += direction * fill
+                cash -= direction * (px + base) * fill
+                volume += fill
+                if abs(inventory) > max_inventory:
+                    max_inventory = abs(inventory)
+                live_qty[s] -= fill
+                if live_qty[s] <= 0.0:
+                    live_px[s] = -1
+                if n_trades < cap:
+                    out_ts[n_trades] = t
+                    out_side[n_trades] = BID if s == 0 else ASK
+                    out_price[n_trades] = px + base
+                    out_qty[n_trades] = fill
+                n_trades += 1
+        # 4. requote
+        if best_bid < 0 or best_ask >= n_levels:
+            continue
+        reservation = 0.5 * (best_bid + best_ask) - skew * inventory
+        for s in range(2):
+            if pend_at[s] >= 0:
+                continue
+            if s == 0:
+                want = np.int64(np.floor(reservation - half_spread)) if inventory + quote_size <= max_position else -1
+                if want >= best_ask:
+                    want = best_ask - 1
+            else:
+                want = np.int64(np.ceil(reservation + half_spread)) if inventory - quote_size >= -max_position else -1
+                if 0 <= want <= best_bid:
+                    want = best_bid + 1
+            if want != live_px[s]:
+                pend_px[s] = want
+                pend_at[s] = t + latency
+                orders += 1
+    mid2 = best_bid + best_ask if best_bid >= 0 and best_ask < n_levels else -1
+    return n_trades, cash, inventory, mid2 + 2 * base if mid2 >= 0 else -1, volume, max_inventory, orders
+
+
+def _compile():
+    try:
+        from numba import njit
+    except ImportError:
+        logger.info("numba not installed; replaying the order book in pure Python")
+        return _replay
+    return njit(cache=True, nogil=True)(_replay)
+
+
+_kernel = None
+
+
+def _get_kernel():
+    global _kernel
+    if _kernel is None:
+        _kernel = _compile()
+    return _kernel
+
+
+def events_from_ticks(tick_data: List[Dict], tick_size: float) -> Dict[str, np.ndarray]:
+    """Columnar events from rows {ts, type: depth|trade, side: bid|ask (depth) or buy|sell (aggressor), price, size}."""
+    sides = {"bid": BID, "buy": BID, "ask": ASK, "sell": ASK}
+    return {
+        "ts": np.array([int(r["ts"]) for r in tick_data], dtype=np.int64),
+        "kind": np.array([TRADE if r.get("type") == "trade" else DEPTH for r in tick_data], dtype=np.int8),
+        "side": np.array([sides[str(r["side"]).lower()] for r in tick_data], dtype=np.int8),
+        "price": np.rint(np.array([float(r["price"]) for r in tick_data]) / tick_size).astype(np.int64),
+        "qty": np.array([float(r.get("size", r.get("qty", 0.0))) for r in tick_data], dtype=np.float64),
+    }
+
+
+def simulate_market_making(events: Dict[str, np.ndarray], tick_size: float = 0.01, half_spread: float = 1.0,
+                           skew: float = 0.0, quote_size: float = 1.0, max_position: float = 10.0, latency: int = 0,
+                           maker_fee: float = 0.0, max_trades: int = 1_000_000) -> Dict:
+    """Replays columnar events (ts, kind, side, price in ticks, qty); half_spread and skew (ticks per unit of
+    inventory) are in ticks, maker_fee is per unit filled (negative for a rebate). PnL marks inventory at the last mid."""
+    n = len(events["ts"])
+    if not n:
+        return {"trades": {}, "pnl": 0.0, "inventory": 0.0, "volume": 0.0, "orders": 0, "max_inventory": 0.0}
+    price = np.ascontiguousarray(events["price"], dtype=np.int64)
+    base = int(price.min()) - 1
+    n_levels = int(price.max()) - base + 2
+    cap = min(n, max_trades)
+    out_ts, out_side = np.zeros(cap, dtype=np.int64), np.zeros(cap, dtype=np.int8)
+    out_price, out_qty = np.zeros(cap, dtype=np.int64), np.zeros(cap)
+    n_trades, cash, inventory, mid2, volume, max_inventory, orders = _get_kernel()(
+        np.ascontiguousarray(events["ts"], dtype=np.int64), np.ascontiguousarray(events["kind"], dtype=np.int8),
+        np.ascontiguousarray(events["side"], dtype=np.int8), price, np.ascontiguousarray(events["qty"], dtype=np.float64),
+        base, n_levels, float(half_spread), float(skew), float(quote_size), float(max_position), int(latency),
+        out_ts, out_side, out_price, out_qty,
+    )
+    if n_trades > cap:
+        logger.warning(f"{n_trades} fills, only the first {cap} are returned")
+    kept = min(n_trades, cap)
+    mark = mid2 / 2.0 if mid2 >= 0 else 0.0
+    pnl = (cash + inventory * mark) * tick_size - maker_fee * volume
+    return {
+        "trades": {"ts": out_ts[:kept], "side": out_side[:kept], "price": out_price[:kept] * tick_size, "qty": out_qty[:kept]},
+        "pnl": float(pnl),
+        "inventory": float(inventory),
+        "volume": float(volume),
+        "orders": int(orders),
+        "max_inventory": float(max_inventory),
+        "fills": int(n_trades),
+    }
@@ -1,35 +1,93 @@
 """
 HFT Simulation Engine for MarketSentinel
-Provides research-grade simulation skeletons for market making, VWAP/TWAP, and micro-momentum strategies.
+Provides research-grade simulations for market making (hft/lob_sim.py), VWAP/TWAP and micro-momentum (hft/execution.py) strategies.
 
 NOTE: This is a simulation skeleton for research. Running live requires direct market access, co-location, and regulatory compliance. Do NOT use for production HFT.
 """
 import logging
 from typing import List, Dict
 
+import numpy as np
+
+from backend.app.hft.execution import SCHEDULES, bars_from_ticks, execute_schedules, momentum_trades, summarize_trades
+from backend.app.hft.lob_sim import events_from_ticks, simulate_market_making
+
 logger = logging.getLogger("sim_engine")
 
 class HFTSimEngine:
     def market_making(self, tick_data: List[Dict], params: Dict) -> Dict:
         """
         Simulates a simple market making strategy on tick/minute data.
+        tick_data is a list of depth/trade rows (see lob_sim.events_from_ticks) or already-columnar events with
+        prices in ticks; params are simulate_market_making's keyword arguments (tick_size, half_spread, skew, ...).
         """
-        # Pseudo-code: place bid/ask, fill if spread crosses, track PnL
-        return {"trades": [], "pnl": 0.0}
+        tick_size = params.get("tick_size", 0.01)
+        events = tick_data if isinstance(tick_data, dict) else events_from_ticks(tick_data, tick_size)
+        result = simulate_market_making(events, **{"tick_size": tick_size, **params})
+        trades = result["trades"]
+        result["trades"] = [
+            {"ts": int(t), "side": "buy" if s > 0 else "sell", "price": float(p), "size": float(q)}
+            for t, s, p, q in zip(trades.get("ts", []), trades.get("side", []), trades.get("price", []), trades.get("qty", []))
+        ]
+        return result
 
     def vwap_twap(self, tick_data: List[Dict], params: Dict) -> Dict:
         """
         Simulates VWAP/TWAP slicing execution on tick/minute data.
+        tick_data: rows {ts, price, size} for one session, bucketed into params["bars"] (default 390) bars; or
+        columnar {"price": [days, bars], "volume": [days, bars]} with a batch of parent orders in params["orders"]
+        (see execution.execute_schedules). params: qty, side (buy|sell), schedule (vwap|twap), start, end,
+        max_participation, impact_bps. A single session has no volume history, so VWAP falls back to params
+        ["volume_profile"] or a uniform curve. pnl is the shortfall vs the arrival price (negative = cost).
         """
-        # Pseudo-code: slice order over time, execute at interval prices
-        return {"trades": [], "pnl": 0.0}
+        options = {k: params[k] for k in ("max_participation", "impact_bps", "lookback") if k in params}
+        if isinstance(tick_data, dict):
+            return execute_schedules(tick_data["price"], tick_data["volume"], params["orders"], **options)
+        if not tick_data:
+            # Nothing traded in the session: no fills, and no prices to benchmark against
+            nan = float("nan")
+            return {"filled": 0.0, "avg_price": nan, "market_vwap": nan, "arrival": nan, "vs_vwap_bps": nan,
+                    "vs_arrival_bps": nan, "pnl": 0.0, "trades": []}
+        n_bars = int(params.get("bars", 390))
+        price, volume = bars_from_ticks([r["ts"] for r in tick_data], np.array([float(r["price"]) for r in tick_data]),
+                                        np.array([float(r.get("size", 0.0)) for r in tick_data]), n_bars)
+        profile = np.asarray(params.get("volume_profile", np.ones(n_bars)), dtype=np.float64)
+        side = -1 if str(params.get("side", "buy")).lower() == "sell" else 1
+        orders = {"day": [0], "start": [int(params.get("start", 0))], "end": [int(params.get("end", n_bars))],
+                  "qty": [float(params.get("qty", 1.0))], "side": [side], "schedule": [SCHEDULES[params.get("schedule", "vwap")]]}
+        result = execute_schedules(price[None, :], volume[None, :], orders, profile=profile[None, :],
+                                   children=True, **options)
+        child_qty, child_price = result.pop("child_qty")[0], result.pop("child_price")[0]
+        summary = {k: float(v[0]) for k, v in result.items()}
+        summary["pnl"] = -side * (summary["avg_price"] - summary["arrival"]) * summary["filled"] if summary["filled"] else 0.0
+        summary["trades"] = [
+            {"bar": int(b), "side": "buy" if side > 0 else "sell", "price": float(child_price[b]), "size": float(child_qty[b])}
+            for b in np.flatnonzero(child_qty)
+        ]
+        return summary
 
     def micro_momentum(self, tick_data: List[Dict], params: Dict) -> Dict:
         """
         Simulates short-term momentum strategy on tick/minute data.
+        tick_data: rows {price} or an array of prices ([bars] or [series, bars]). params: lookback, threshold,
+        stop, take, max_hold, cost_bps (lookback and threshold have defaults, see execution.momentum_trades); or
+        params["grid"], a list of such dicts evaluated in one batched pass.
         """
-        # Pseudo-code: enter on micro-trend, exit on reversal or stop
-        return {"trades": [], "pnl": 0.0}
+        price = np.asarray(tick_data if not isinstance(tick_data, list) else [float(r["price"]) for r in tick_data], dtype=np.float64)
+        grid = params.get("grid") or [params]
+        trades = momentum_trades(price, grid, cost_bps=params.get("cost_bps", 0.0))
+        summary = summarize_trades(trades, len(grid))
+        if "grid" in params:
+            return {"results": [{"params": p, **s} for p, s in zip(grid, summary)]}
+        # The trade list replaces summarize_trades' count (it is len(trades))
+        return {
+            **summary[0],
+            "trades": [
+                {"series": int(s), "entry": int(e), "exit": int(x), "side": "buy" if d > 0 else "sell", "return": float(r)}
+                for s, e, x, d, r in zip(trades["series"], trades["entry"], trades["exit"], trades["side"], trades["return"])
+            ],
+            "pnl": summary[0]["total_return"],
+        }
 
 """
 HFT vs Simulation Documentation:
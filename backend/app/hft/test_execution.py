@@ -0,0 +1,50 @@
+import numpy as np
+
+from backend.app.hft.execution import TWAP, VWAP, execute_schedules, momentum_trades, summarize_trades
+from backend.app.hft.sim_engine import HFTSimEngine
+
+def test_schedules_follow_profile_and_participation_cap():
+    price = np.tile(np.array([10.0, 10.0, 11.0, 12.0]), (3, 1))
+    volume = np.tile(np.array([100.0, 300.0, 100.0, 100.0]), (3, 1))
+    orders = {"day": [2, 2, 2], "start": [0, 0, 0], "end": [4, 4, 4], "qty": [60, 60, 60], "side": [1, 1, -1],
+              "schedule": [TWAP, VWAP, TWAP]}
+    out = execute_schedules(price, volume, orders, max_participation=1.0, impact_bps=0.0, children=True)
+    assert np.allclose(out["child_qty"][0], 15) and np.allclose(out["child_qty"][1], [10, 30, 10, 10])
+    assert np.isclose(out["avg_price"][1], out["market_vwap"][1]) and np.isclose(out["vs_vwap_bps"][1], 0.0)
+    assert out["vs_arrival_bps"][0] > 0 and out["vs_arrival_bps"][2] < 0  # rising prices hurt buys, help sells
+
+    # 10% participation: 10 + 30 + 10 + 10 = 60 available, the TWAP shortfall in bar 0 is made up later
+    capped = execute_schedules(price, volume, {**orders, "qty": [60, 70, 60]}, max_participation=0.1, children=True)
+    assert np.allclose(capped["child_qty"][0], [10, 20, 10, 10]) and np.isclose(capped["filled"][1], 60)
+    assert capped["avg_price"][1] > 10.0 and (capped["child_price"][0] > price[0]).all()
+
+def test_momentum_trades_do_not_overlap_and_respect_exits():
+    price = np.array([100, 101, 102, 103, 104, 103, 102, 101, 100, 101, 102, 103], dtype=float)
+    grid = [{"lookback": 1, "threshold": 0.005, "max_hold": 2}, {"lookback": 1, "threshold": 0.005}]
+    trades = momentum_trades(price, grid)
+    held_2 = trades["param"] == 0
+    assert trades["entry"][held_2].tolist() == [1, 5, 9] and trades["exit"][held_2].tolist() == [3, 7, 11]
+    # Without a hold limit the long rides until the reversal at bar 5, then the short until bar 9
+    assert list(zip(trades["entry"][~held_2], trades["exit"][~held_2], trades["side"][~held_2])) == [(1, 5, 1), (5, 9, -1), (9, 11, 1)]
+    summary = summarize_trades(trades, len(grid))
+    assert summary[1]["trades"] == 3 and summary[1]["hit_rate"] == 1.0
+    # Take profit once up ~1.5% from the 101 entry (bar 3), before the reversal
+    taken = momentum_trades(price, [{"lookback": 1, "threshold": 0.005, "take": 0.015}])
+    assert (taken["entry"][0], taken["exit"][0]) == (1, 3) and np.isclose(taken["return"][0], np.log(103 / 101))
+
+def test_engine_wrappers():
+    ticks = [{"ts": t, "price": 10 + 0.01 * t, "size": 10} for t in range(100)]
+    result = HFTSimEngine().vwap_twap(ticks, {"bars": 10, "qty": 50, "schedule": "twap", "impact_bps": 0})
+    assert np.isclose(sum(t["size"] for t in result["trades"]), 50) and result["pnl"] < 0
+    result = HFTSimEngine().micro_momentum(ticks, {"grid": [{"lookback": 5, "threshold": 0.001}]})
+    assert result["results"][0]["trades"] == 1
+
+def test_engine_handles_empty_sessions_and_default_params():
+    engine = HFTSimEngine()
+    result = engine.vwap_twap([], {})
+    assert result["filled"] == 0.0 and result["pnl"] == 0.0 and result["trades"] == []
+    result = engine.micro_momentum([], {})
+    assert result["trades"] == [] and result["pnl"] == 0.0
+    ticks = [{"price": p} for p in [100, 100, 100, 100, 100, 100, 101, 102, 103, 104]]
+    result = engine.micro_momentum(ticks, {})
+    assert [(t["entry"], t["side"]) for t in result["trades"]] == [(6, "buy")]
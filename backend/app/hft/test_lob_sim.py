@@ -0,0 +1,56 @@
+import numpy as np
+
+from backend.app.hft import lob_sim
+from backend.app.hft.lob_sim import _replay, simulate_market_making
+from backend.app.hft.sim_engine import HFTSimEngine
+
+def _book(ts=0):
+    return [
+        {"ts": ts, "type": "depth", "side": "bid", "price": 9.99, "size": 5},
+        {"ts": ts, "type": "depth", "side": "ask", "price": 10.01, "size": 5},
+    ]
+
+def test_queue_position_and_latency():
+    ticks = _book() + [
+        # our bid joins behind 5 at 9.99 (latency 10), so the first 5 sold only clear the queue ahead
+        {"ts": 20, "type": "trade", "side": "sell", "price": 9.99, "size": 5},
+        {"ts": 21, "type": "trade", "side": "sell", "price": 9.99, "size": 1},
+        {"ts": 22, "type": "depth", "side": "bid", "price": 9.99, "size": 3},
+    ]
+    result = HFTSimEngine().market_making(ticks, {"half_spread": 1, "quote_size": 1, "latency": 10})
+    assert [(t["side"], t["price"], t["size"]) for t in result["trades"]] == [("buy", 9.99, 1.0)]
+    assert result["inventory"] == 1.0 and np.isclose(result["pnl"], 10.0 - 9.99)
+
+def test_fills_are_lost_while_the_order_is_in_flight_and_inventory_is_capped():
+    ticks = _book() + [{"ts": 5, "type": "trade", "side": "sell", "price": 9.98, "size": 100}]
+    assert HFTSimEngine().market_making(ticks, {"latency": 10})["fills"] == 0
+    ticks = _book() + [{"ts": 20 + i, "type": "trade", "side": "sell", "price": 9.95, "size": 100} for i in range(10)]
+    result = HFTSimEngine().market_making(ticks, {"latency": 0, "max_position": 3, "quote_size": 1})
+    assert result["inventory"] == 3.0 and result["max_inventory"] == 3.0
+
+def test_position_limit_holds_with_latency():
+    from backend.app.scripts.bench_lob import synthetic_events
+    events = {k: v[:200_000] for k, v in synthetic_events(200_000).items()}
+    for latency in (50, 200):
+        result = simulate_market_making(events, half_spread=1, skew=0.05, quote_size=1, max_position=3, latency=latency)
+        assert result["fills"] > 0 and result["max_inventory"] <= 3
+
+def test_compiled_kernel_matches_python_replay():
+    rng = np.random.default_rng(0)
+    n = 20000
+    mid = 1000 + np.cumsum(rng.choice([-1, 0, 0, 0, 1], n))
+    side = rng.choice(np.array([1, -1], dtype=np.int8), n)
+    kind = (rng.random(n) < 0.2).astype(np.int8)
+    level = rng.geometric(0.5, n) - 1
+    price = np.where(kind == 1, np.where(side > 0, mid + 1, mid), np.where(side > 0, mid - level, mid + 1 + level))
+    events = {"ts": np.arange(n, dtype=np.int64), "kind": kind, "side": side, "price": price.astype(np.int64),
+              "qty": rng.integers(0, 10, n).astype(float)}
+    params = {"half_spread": 1, "skew": 0.1, "quote_size": 1, "max_position": 5, "latency": 3}
+    fast = simulate_market_making(events, **params)
+    kernel, lob_sim._kernel = lob_sim._kernel, _replay
+    try:
+        slow = simulate_market_making(events, **params)
+    finally:
+        lob_sim._kernel = kernel
+    assert fast["fills"] == slow["fills"] > 0 and np.isclose(fast["pnl"], slow["pnl"])
+    assert abs(fast["inventory"]) <= 5
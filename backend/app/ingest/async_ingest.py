@@ -0,0 +1,230 @@
+"""
+Async Ingestion for MarketSentinel
+Fans out to 4chan, Reddit, X.com, Slack and Google News concurrently. Each source runs with its own
+concurrency limit and deadline; a source that times out contributes whatever it fetched so far.
+With a WatermarkStore the ingestor is incremental: it fetches conditionally or past each source's watermark,
+emits only items that are new since the previous refresh, and persists the advanced watermarks.
+Every item carries its source's own timestamp as `published_ts` (epoch seconds), which the aggregator and
+Postgres store read through item_published_at.
+4chan always goes through the process-wide 1 req/s limiter. Incremental refreshes use FourChanCrawler; a snapshot
+(no store) reads catalog.json in one request, which already carries every first-page thread's OP and latest
+replies, then spends what is left of the deadline at 1 req/s on the busiest threads' full replies.
+"""
+import os
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from backend.app.clients.fourchan_client import FourChanClient
+from backend.app.clients.reddit_client import RedditClient
+from backend.app.clients.slack_client import SlackClient
+from backend.app.clients.web_search_client import WebSearchClient
+from backend.app.clients.x_client import XClient
+from backend.app.ingest.fourchan_crawler import FourChanCrawler, fourchan_limiter
+from backend.app.ingest.watermarks import WatermarkStore
+
+logger = logging.getLogger("async_ingest")
+
+SOURCE_DEADLINE = float(os.getenv("INGEST_SOURCE_DEADLINE", "8"))
+# Max in-flight requests per source
+SOURCE_CONCURRENCY = {"4chan": 8, "reddit": 4, "x.com": 2, "slack": 4, "news": 6}
+SLACK_CHANNEL = os.getenv("SLACK_CHANNEL", "general")
+FOURCHAN_BOARD = "biz"
+
+Call = Callable[[], Awaitable[List[Dict]]]
+
+
+def _epoch(value) -> Optional[float]:
+    """Epoch seconds from a source timestamp: numbers or numeric strings (reddit, slack) or ISO dates (x.com)."""
+    if value in (None, ""):
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+async def _run_bounded(calls: List[Call], limit: int, sink: List[Dict]) -> None:
+    """Runs calls with at most `limit` in flight, appending results to `sink` as each finishes."""
+    sem = asyncio.Semaphore(max(limit, 1))
+
+    async def run(call: Call):
+        async with sem:
+            try:
+                sink.extend(await call())
+            except Exception as e:
+                logger.warning(f"Ingest call failed: {e}")
+
+    await asyncio.gather(*(run(c) for c in calls))
+
+
+async def _with_deadline(source: str, fetch: Callable[[List[Dict]], Awaitable[None]], deadline: float) -> List[Dict]:
+    """Awaits fetch(sink) for at most `deadline` seconds and returns the (possibly partial) sink."""
+    sink: List[Dict] = []
+    try:
+        await asyncio.wait_for(fetch(sink), timeout=deadline)
+    except asyncio.TimeoutError:
+        logger.warning(f"{source} ingest hit {deadline}s deadline; returning {len(sink)} partial items")
+    except Exception as e:
+        logger.warning(f"{source} ingest failed: {e}")
+    return sink
+
+
+class AsyncIngestor:
+    def __init__(self, use_x: bool = False, deadline: float = SOURCE_DEADLINE, concurrency: Optional[Dict[str, int]] = None,
+                 watermarks: Optional[WatermarkStore] = None):
+        self.use_x = use_x
+        self.deadline = deadline
+        self.concurrency = {**SOURCE_CONCURRENCY, **(concurrency or {})}
+        self.watermarks = watermarks
+        self.fourchan = FourChanClient()
+        self.fourchan_limiter = fourchan_limiter
+        # Incremental 4chan ingestion diffs threads.json and only downloads threads that changed
+        self.fourchan_crawler = FourChanCrawler(self.fourchan, FOURCHAN_BOARD, concurrency=self.concurrency["4chan"],
+                                                watermarks=watermarks, limiter=fourchan_limiter) if watermarks is not None else None
+        self.reddit = RedditClient()
+        self.slack = SlackClient()
+        self.websearch = WebSearchClient()
+        self.xclient = XClient() if use_x else None
+
+    def _mark(self, source: str, key: str) -> Dict:
+        return self.watermarks.get(source, key) if self.watermarks is not None else {}
+
+    def _advance(self, source: str, key: str, mark: Dict) -> None:
+        if self.watermarks is not None:
+            self.watermarks.set(source, key, mark)
+
+    def _fourchan_budget(self) -> int:
+        """Thread fetches a snapshot can afford after the catalog request, with one interval spare."""
+        interval = getattr(self.fourchan_limiter, "min_interval", 0)
+        if interval <= 0:
+            return self.concurrency["4chan"]
+        return max(int(self.deadline / interval) - 2, 0)
+
+    async def _fourchan_snapshot(self, http: httpx.AsyncClient, posts: List[Dict]) -> None:
+        await self.fourchan_limiter.wait()
+        catalog = await self.fourchan.fetch_board_catalog_async(http, FOURCHAN_BOARD)
+        threads = [t for page in catalog[:1] for t in page.get("threads", [])]
+        seen = set()
+
+        def emit(thread_no, thread_posts):
+            for p in thread_posts:
+                if p.get("no") not in seen:
+                    seen.add(p.get("no"))
+                    posts.append({**p, "thread": thread_no})
+
+        # The whole first page from a single request, so a snapshot never comes back empty
+        for t in threads:
+            emit(t.get("no"), [t] + t.get("last_replies", []))
+        # Replies the catalog left out, busiest threads first, as far as the deadline allows
+        truncated = [t for t in threads if t.get("replies", 0) > len(t.get("last_replies", []))]
+        truncated.sort(key=lambda t: t.get("replies", 0), reverse=True)
+
+        def thread_call(t) -> Call:
+            async def call():
+                await self.fourchan_limiter.wait()
+                emit(t.get("no"), await self.fourchan.fetch_thread_posts_async(http, FOURCHAN_BOARD, t.get("no")))
+                return []
+            return call
+
+        # Concurrency only overlaps slow responses; request starts are still spaced by the limiter
+        await _run_bounded([thread_call(t) for t in truncated[:self._fourchan_budget()]], self.concurrency["4chan"], [])
+
+    async def _fourchan(self, http: httpx.AsyncClient, sink: List[Dict]) -> None:
+        posts: List[Dict] = []
+        try:
+            if self.fourchan_crawler is not None:
+                await self.fourchan_crawler.crawl(http, posts)
+            else:
+                await self._fourchan_snapshot(http, posts)
+        finally:
+            # Runs on deadline cancellation too, so partially crawled posts are kept
+            sink.extend({**p, "text": p.get("com", ""), "source": "4chan"} for p in posts if p.get("com"))
+
+    async def _reddit(self, http: httpx.AsyncClient, tickers: List[str], sink: List[Dict]) -> None:
+        def ticker_call(t) -> Call:
+            async def call():
+                after = self._mark("reddit", t).get("created_utc")
+                posts = await self.reddit.fetch_posts_async(http, t, max_results=20, after=after)
+                if posts:
+                    self._advance("reddit", t, {"created_utc": max(p.get("created_utc", 0) for p in posts)})
+                return [{"text": p.get("title", "") + " " + p.get("selftext", ""), "source": "reddit",
+                         "published_ts": _epoch(p.get("created_utc"))} for p in posts]
+            return call
+
+        await _run_bounded([ticker_call(t) for t in tickers], self.concurrency["reddit"], sink)
+
+    async def _x(self, tickers: List[str], sink: List[Dict]) -> None:
+        def ticker_call(t) -> Call:
+            async def call():
+                tweets = await self.xclient.fetch_tweets_async(t, max_results=20)
+                return [{"text": tw.get("content", ""), "source": "x.com", "published_ts": _epoch(tw.get("date"))} for tw in tweets]
+            return call
+
+        await _run_bounded([ticker_call(t) for t in tickers], self.concurrency["x.com"], sink)
+
+    async def _slack(self, http: httpx.AsyncClient, tickers: List[str], sink: List[Dict]) -> None:
+        def ticker_call(t) -> Call:
+            async def call():
+                key = f"{SLACK_CHANNEL}/{t}"
+                oldest = self._mark("slack", key).get("ts")
+                msgs = await self.slack.fetch_messages_async(http, SLACK_CHANNEL, t, max_results=10, oldest=oldest)
+                stamps = [m["ts"] for m in msgs if m.get("ts")]
+                if stamps:
+                    self._advance("slack", key, {"ts": max(stamps, key=float)})
+                return [{"text": m.get("text", ""), "source": "slack", "published_ts": _epoch(m.get("ts"))} for m in msgs]
+            return call
+
+        await _run_bounded([ticker_call(t) for t in tickers], self.concurrency["slack"], sink)
+
+    async def _news(self, http: httpx.AsyncClient, tickers: List[str], sink: List[Dict]) -> None:
+        def ticker_call(t) -> Call:
+            async def call():
+                if self.watermarks is None:
+                    news = await self.websearch.fetch_google_news_async(http, t, max_results=10)
+                else:
+                    news, mark = await self.websearch.fetch_google_news_since_async(http, t, self._mark("news", t), max_results=10)
+                    self._advance("news", t, mark)
+                return [{"text": n.get("title", "") + " " + n.get("summary", ""), "source": "news",
+                     "published_ts": n.get("published_ts")} for n in news]
+            return call
+
+        await _run_bounded([ticker_call(t) for t in tickers], self.concurrency["news"], sink)
+
+    async def fetch_by_source(self, tickers: List[str],
+                              on_source: Optional[Callable[[str, int], None]] = None) -> Dict[str, List[Dict]]:
+        """Fetches all sources concurrently; returns {source: items}. Failed or slow sources yield partial lists.
+        `on_source(source, n_items)` is called on the event loop as each source finishes."""
+
+        async def run(name, fetch):
+            items = await _with_deadline(name, fetch, self.deadline)
+            if on_source is not None:
+                on_source(name, len(items))
+            return items
+
+        async with httpx.AsyncClient(timeout=10, follow_redirects=True) as http:
+            jobs = {
+                "4chan": lambda sink: self._fourchan(http, sink),
+                "reddit": lambda sink: self._reddit(http, tickers, sink),
+                "slack": lambda sink: self._slack(http, tickers, sink),
+                "news": lambda sink: self._news(http, tickers, sink),
+            }
+            if self.use_x and self.xclient is not None:
+                jobs["x.com"] = lambda sink: self._x(tickers, sink)
+            results = await asyncio.gather(*(run(name, fetch) for name, fetch in jobs.items()))
+        if self.watermarks is not None:
+            self.watermarks.save()
+        return dict(zip(jobs.keys(), results))
+
+    async def fetch_items(self, tickers: List[str], on_source: Optional[Callable[[str, int], None]] = None) -> List[Dict]:
+        by_source = await self.fetch_by_source(tickers, on_source)
+        order = ["4chan", "reddit", "x.com", "slack", "news"]
+        return [item for src in order for item in by_source.get(src, [])]
@@ -0,0 +1,108 @@
+"""
+4chan Crawler for MarketSentinel
+Change-aware crawl of a 4chan board. Each round reads threads.json (conditionally, with If-Modified-Since),
+diffs every thread's last_modified and reply count against what was seen last time, and downloads only the
+threads that changed, emitting only posts numbered past the last one seen. Requests go through a
+process-wide limiter that keeps to the API's one-request-per-second rule.
+"""
+import time
+import asyncio
+import logging
+import threading
+from typing import Dict, List, Optional
+
+import httpx
+
+from backend.app.clients.fourchan_client import FourChanClient
+from backend.app.ingest.watermarks import WatermarkStore
+
+logger = logging.getLogger("fourchan_crawler")
+
+FOURCHAN_MIN_INTERVAL = 1.0
+
+
+class RateLimiter:
+    """
+    Spaces request starts at least `min_interval` seconds apart; safe to share across event loops.
+    A slot is claimed only once it is free, never reserved ahead of the sleep, so a waiter cancelled by an
+    ingest deadline gives nothing up and does not push back the callers behind it.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    async def wait(self) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now >= self._next:
+                    self._next = now + self.min_interval
+                    return
+                delay = self._next - now
+            await asyncio.sleep(delay)
+
+
+fourchan_limiter = RateLimiter(FOURCHAN_MIN_INTERVAL)
+
+
+class FourChanCrawler:
+    def __init__(self, client: Optional[FourChanClient] = None, board: str = "biz", pages: int = 1, concurrency: int = 8,
+                 watermarks: Optional[WatermarkStore] = None, limiter: RateLimiter = fourchan_limiter):
+        self.client = client or FourChanClient()
+        self.board = board
+        self.pages = pages
+        self.concurrency = concurrency
+        # Without a persisted store the crawler still remembers what it saw for its own lifetime
+        self.watermarks = watermarks if watermarks is not None else WatermarkStore(path=None)
+        self.limiter = limiter
+
+    def _key(self, no) -> str:
+        return f"{self.board}/{no}"
+
+    def changed_threads(self, pages: List[Dict]) -> List[Dict]:
+        """Threads on the first `pages` pages whose last_modified or reply count moved since they were last seen."""
+        changed = []
+        for page in pages[:self.pages]:
+            for thread in page.get("threads", []):
+                seen = self.watermarks.get("4chan", self._key(thread.get("no")))
+                if thread.get("last_modified", 0) != seen.get("last_modified") or thread.get("replies", 0) != seen.get("replies"):
+                    changed.append(thread)
+        return changed
+
+    async def _crawl_thread(self, http: httpx.AsyncClient, thread: Dict, sink: List[Dict]) -> None:
+        no = thread.get("no")
+        await self.limiter.wait()
+        posts = await self.client.fetch_thread_posts_async(http, self.board, no)
+        if not posts:
+            return  # failed or pruned; leave the mark so the thread is retried next round
+        key = self._key(no)
+        last_no = self.watermarks.get("4chan", key).get("last_no", 0)
+        self.watermarks.set("4chan", key, {"last_modified": thread.get("last_modified", 0), "replies": thread.get("replies", 0),
+                                           "last_no": max(p.get("no", 0) for p in posts)})
+        sink.extend({**p, "thread": no} for p in posts if p.get("no", 0) > last_no)
+
+    async def crawl(self, http: httpx.AsyncClient, sink: List[Dict]) -> None:
+        """Appends posts that are new since the previous crawl to `sink` as each changed thread is fetched."""
+        list_key = f"{self.board}/threads"
+        await self.limiter.wait()
+        pages, last_modified = await self.client.fetch_board_threads_if_modified_async(
+            http, self.board, self.watermarks.get("4chan", list_key).get("last_modified"))
+        if pages is None:
+            return  # board unchanged since the last crawl
+        # Forget threads that fell off the board
+        self.watermarks.prune("4chan", [list_key] + [self._key(t.get("no")) for page in pages for t in page.get("threads", [])])
+        changed = self.changed_threads(pages)
+        sem = asyncio.Semaphore(max(self.concurrency, 1))
+
+        async def run(thread: Dict):
+            async with sem:
+                try:
+                    await self._crawl_thread(http, thread, sink)
+                except Exception as e:
+                    logger.warning(f"4chan thread {thread.get('no')} failed: {e}")
+
+        await asyncio.gather(*(run(t) for t in changed))
+        # Only after every changed thread was fetched; an interrupted crawl re-reads the thread list
+        self.watermarks.set("4chan", list_key, {"last_modified": last_modified})
@@ -0,0 +1,227 @@
+"""
+Raw Data Lake for MarketSentinel
+Append-only store for raw client payloads, partitioned by source and UTC date:
+
+    data/raw/source=<source>/date=<YYYY-MM-DD>/part-<unix_ms>-<pid>-<n>.jsonl.gz
+
+Every write goes to a new gzip JSONL part, one record per line, so history is never overwritten and payloads
+are serialized record by record. Readers stream parts line by line from a memory map; partitions can be
+compacted into a single Parquet file (requires pyarrow) that is read back one record batch at a time.
+Scraper subprocesses are teed into the lake line by line with a deadline (tee_command).
+"""
+import os
+import io
+import gzip
+import json
+import mmap
+import time
+import logging
+import itertools
+import tempfile
+import threading
+import subprocess
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger("raw_store")
+
+RAW_DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
+_part_counter = itertools.count()
+_compact_lock = threading.Lock()
+# Seconds a scraper subprocess may run before tee_command kills it
+SCRAPER_TIMEOUT = float(os.getenv("SCRAPER_TIMEOUT", "60"))
+
+
+def utc_date(ts: Optional[float] = None) -> str:
+    return datetime.fromtimestamp(time.time() if ts is None else ts, tz=timezone.utc).strftime("%Y-%m-%d")
+
+
+class RawWriter:
+    """Streaming writer for one new part file. Use as a context manager; the part is visible once closed."""
+
+    def __init__(self, source: str, root: Path = RAW_DATA_DIR, ticker: Optional[str] = None, now: Optional[float] = None):
+        self.ticker = ticker
+        now = time.time() if now is None else now
+        partition = Path(root) / f"source={source}" / f"date={utc_date(now)}"
+        partition.mkdir(parents=True, exist_ok=True)
+        name = f"part-{int(now * 1000)}-{os.getpid()}-{next(_part_counter)}.jsonl.gz"
+        self.path = partition / name
+        # Written under a dot-prefixed name so readers never see a half-written part
+        self._tmp = partition / f".{name}"
+        self._file = gzip.open(self._tmp, "wt", encoding="utf-8", compresslevel=6)
+        self.count = 0
+
+    def write(self, record: Dict) -> None:
+        row = {"ingested_at": time.time(), "ticker": self.ticker, "record": record}
+        self._file.write(json.dumps(row, default=str) + "\n")
+        self.count += 1
+
+    def write_many(self, records: Iterable[Dict]) -> None:
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.count:
+            os.replace(self._tmp, self.path)
+        else:
+            self._tmp.unlink(missing_ok=True)
+
+    def __enter__(self) -> "RawWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_records(source: str, records: Iterable[Dict], ticker: Optional[str] = None, root: Path = RAW_DATA_DIR) -> int:
+    """Appends records to the lake as one new part; returns how many were written. Errors are logged, not raised."""
+    try:
+        with RawWriter(source, root=root, ticker=ticker) as writer:
+            writer.write_many(records)
+            return writer.count
+    except Exception as e:
+        logger.error(f"Failed to write raw {source} records: {e}")
+        return 0
+
+
+def tee_jsonl(lines: Iterable[str], writer: RawWriter, max_results: Optional[int] = None) -> List[Dict]:
+    """Parses JSONL lines as they arrive, appending each record to `writer`; returns up to max_results records."""
+    records = []
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        writer.write(record)
+        records.append(record)
+        if max_results is not None and len(records) >= max_results:
+            break
+    return records
+
+
+def tee_command(cmd: List[str], writer: RawWriter, max_results: Optional[int] = None,
+                timeout: float = SCRAPER_TIMEOUT) -> List[Dict]:
+    """
+    Runs `cmd` and tees its JSONL stdout into `writer` (see tee_jsonl). stderr goes to a temp file, so it can
+    never fill a pipe and stall the process. The process is killed at the deadline, once max_results records
+    have been read, or if parsing fails; records read before that are returned (or the error is raised).
+    """
+    with tempfile.TemporaryFile("w+") as err:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=err, text=True)
+        expired = threading.Event()
+
+        def kill() -> None:
+            expired.set()
+            proc.kill()
+
+        timer = threading.Timer(timeout, kill)
+        timer.start()
+        records: List[Dict] = []
+        try:
+            records = tee_jsonl(proc.stdout, writer, max_results)
+            stopped = max_results is not None and len(records) >= max_results
+            if not stopped:
+                proc.wait()  # stdout hit EOF; the timer still bounds a process that lingers
+        finally:
+            timer.cancel()
+            if proc.poll() is None:
+                proc.kill()
+            proc.wait()
+            proc.stdout.close()
+        if expired.is_set():
+            logger.warning(f"{cmd[0]} timed out after {timeout}s with {len(records)} records")
+        elif not stopped and proc.returncode != 0:
+            err.seek(0)
+            logger.error(f"{cmd[0]} failed ({proc.returncode}): {err.read()[-2000:]}")
+    return records
+
+
+def _partitions(source: str, root: Path, start: Optional[str], end: Optional[str]) -> List[Path]:
+    base = Path(root) / f"source={source}"
+    if not base.exists():
+        return []
+    parts = []
+    for p in sorted(base.glob("date=*")):
+        date = p.name[len("date="):]
+        if (start is None or date >= start) and (end is None or date <= end):
+            parts.append(p)
+    return parts
+
+
+def _iter_jsonl_gz(path: Path) -> Iterator[Dict]:
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            with gzip.GzipFile(fileobj=mm) as gz:
+                for line in io.TextIOWrapper(gz, encoding="utf-8"):
+                    if line.strip():
+                        yield json.loads(line)
+
+
+def _iter_parquet(path: Path) -> Iterator[Dict]:
+    import pyarrow.parquet as pq
+    with pq.ParquetFile(path, memory_map=True) as pf:
+        for batch in pf.iter_batches(batch_size=10000):
+            for row in batch.to_pylist():
+                yield {**row, "record": json.loads(row["record"])}
+
+
+def iter_records(source: str, start_date: Optional[str] = None, end_date: Optional[str] = None,
+                 root: Path = RAW_DATA_DIR) -> Iterator[Dict]:
+    """
+    Streams {"ingested_at", "ticker", "record"} rows of `source` for UTC dates in [start_date, end_date]
+    (YYYY-MM-DD, inclusive), oldest partition first. Nothing is loaded beyond the current line/batch.
+    """
+    for partition in _partitions(source, root, start_date, end_date):
+        for path in sorted(partition.iterdir()):
+            if path.name.startswith("."):
+                continue
+            if path.suffix == ".parquet":
+                yield from _iter_parquet(path)
+            elif path.name.endswith(".jsonl.gz"):
+                yield from _iter_jsonl_gz(path)
+
+
+def compact_partition(source: str, date: str, root: Path = RAW_DATA_DIR) -> Optional[Path]:
+    """
+    Rewrites all JSONL parts of one partition (plus any earlier compaction) into a single Parquet file, then
+    removes the parts it replaced. Returns the Parquet path, or None if pyarrow is unavailable or there is
+    nothing to compact.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        logger.warning("pyarrow is not installed; raw partitions stay as JSONL")
+        return None
+    partition = Path(root) / f"source={source}" / f"date={date}"
+    schema = pa.schema([("ingested_at", pa.float64()), ("ticker", pa.string()), ("record", pa.string())])
+    target = partition / "compacted.parquet"
+    tmp = partition / ".compacted.parquet"
+    # Listed under the lock, so a concurrent compaction cannot delete parts this one is about to read
+    with _compact_lock:
+        sources = [p for p in sorted(partition.glob("*")) if not p.name.startswith(".")]
+        if not any(p.name.endswith(".jsonl.gz") for p in sources):
+            return None
+        with pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+            for path in sources:
+                rows = _iter_parquet(path) if path.suffix == ".parquet" else _iter_jsonl_gz(path)
+                batch: List[Dict] = []
+                for row in rows:
+                    batch.append({"ingested_at": row["ingested_at"], "ticker": row["ticker"],
+                                  "record": json.dumps(row["record"], default=str)})
+                    if len(batch) >= 10000:
+                        writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+                        batch = []
+                if batch:
+                    writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+        os.replace(tmp, target)
+        for path in sources:
+            if path != target:
+                path.unlink(missing_ok=True)
+    return target
+
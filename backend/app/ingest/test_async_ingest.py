@@ -0,0 +1,156 @@
+import asyncio
+from backend.app.ingest.async_ingest import AsyncIngestor
+from backend.app.ingest.fourchan_crawler import RateLimiter
+
+def _patch_quiet_sources(monkeypatch, ingestor):
+    async def empty(*a, **kw):
+        return []
+
+    monkeypatch.setattr(ingestor.reddit, "fetch_posts_async", empty)
+    monkeypatch.setattr(ingestor.slack, "fetch_messages_async", empty)
+    monkeypatch.setattr(ingestor.websearch, "fetch_google_news_async", empty)
+
+def test_partial_results_on_deadline(monkeypatch):
+    ingestor = AsyncIngestor(deadline=0.3)
+    ingestor.fourchan_limiter = RateLimiter(0)
+
+    async def catalog(http, board="biz"):
+        return [{"threads": [{"no": n, "com": f"op {n}", "replies": 1} for n in (1, 2, 3)]}]
+
+    async def thread(http, board="biz", thread_id=None):
+        if thread_id == 3:
+            await asyncio.sleep(5)
+        return [{"no": thread_id, "com": f"op {thread_id}"}, {"no": thread_id * 10, "com": f"reply {thread_id}"}]
+
+    monkeypatch.setattr(ingestor.fourchan, "fetch_board_catalog_async", catalog)
+    monkeypatch.setattr(ingestor.fourchan, "fetch_thread_posts_async", thread)
+    _patch_quiet_sources(monkeypatch, ingestor)
+    by_source = asyncio.run(ingestor.fetch_by_source(["AAPL"]))
+    assert sorted(i["text"] for i in by_source["4chan"]) == ["op 1", "op 2", "op 3", "reply 1", "reply 2"]
+    assert by_source["news"] == []
+
+def test_snapshot_mode_is_rate_limited_and_not_incremental(monkeypatch):
+    ingestor = AsyncIngestor()
+    waits = []
+
+    class CountingLimiter:
+        min_interval = 1.0
+
+        async def wait(self):
+            waits.append(1)
+
+    ingestor.fourchan_limiter = CountingLimiter()
+
+    async def catalog(http, board="biz"):
+        return [{"threads": [{"no": 1, "com": "op 1", "replies": 0},
+                             {"no": 2, "com": "op 2", "replies": 3, "last_replies": [{"no": 5, "com": "reply 5"}]}]}]
+
+    async def thread(http, board="biz", thread_id=None):
+        return [{"no": 2, "com": "op 2"}, {"no": 3, "com": "reply 3"}, {"no": 4, "com": "reply 4"}, {"no": 5, "com": "reply 5"}]
+
+    monkeypatch.setattr(ingestor.fourchan, "fetch_board_catalog_async", catalog)
+    monkeypatch.setattr(ingestor.fourchan, "fetch_thread_posts_async", thread)
+    _patch_quiet_sources(monkeypatch, ingestor)
+    for _ in range(2):
+        assert len(asyncio.run(ingestor.fetch_by_source(["AAPL"]))["4chan"]) == 5
+    assert len(waits) == 4  # catalog.json + the one truncated thread, per refresh
+
+def test_back_to_back_deadline_limited_snapshots_return_the_page(monkeypatch):
+    # More truncated threads than the deadline can fetch; the first refresh's cancelled waiters must not
+    # hold limiter slots that starve the second refresh's catalog request
+    ingestor = AsyncIngestor(deadline=0.5, concurrency={"4chan": 8})
+    ingestor.fourchan_limiter = RateLimiter(0.1)
+    page = [{"no": n, "com": f"op {n}", "replies": 50} for n in range(1, 16)]
+
+    async def catalog(http, board="biz"):
+        return [{"threads": page}]
+
+    async def thread(http, board="biz", thread_id=None):
+        await asyncio.sleep(5)
+        return []
+
+    monkeypatch.setattr(ingestor.fourchan, "fetch_board_catalog_async", catalog)
+    monkeypatch.setattr(ingestor.fourchan, "fetch_thread_posts_async", thread)
+    _patch_quiet_sources(monkeypatch, ingestor)
+    for _ in range(2):
+        assert len(asyncio.run(ingestor.fetch_by_source(["AAPL"]))["4chan"]) == 15
+
+def test_incremental_emits_only_new_items(monkeypatch, tmp_path):
+    from backend.app.ingest.watermarks import WatermarkStore
+    marks = WatermarkStore(tmp_path / "marks.json")
+    board = {1: [{"no": 1, "com": "op 1"}], 2: [{"no": 2, "com": "op 2"}]}
+    catalog = {"threads": [{"no": 1, "last_modified": 100, "replies": 0}, {"no": 2, "last_modified": 100, "replies": 0}]}
+    fetched = []
+
+    async def threads_if_modified(http, board="biz", last_modified=None):
+        return [catalog], "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    async def thread(http, board_name="biz", thread_id=None):
+        fetched.append(thread_id)
+        return board[thread_id]
+
+    async def reddit(http, ticker, max_results=100, after=None):
+        posts = [{"title": "old", "created_utc": 10}, {"title": "new", "created_utc": 20}]
+        return [p for p in posts if after is None or p["created_utc"] > after]
+
+    async def empty(*a, **kw):
+        return []
+
+    async def no_news(http, ticker, watermark, max_results=10):
+        return [], watermark
+
+    ingestor = AsyncIngestor(watermarks=marks)
+    ingestor.fourchan_crawler.limiter = RateLimiter(0)
+    monkeypatch.setattr(ingestor.fourchan, "fetch_board_threads_if_modified_async", threads_if_modified)
+    monkeypatch.setattr(ingestor.fourchan, "fetch_thread_posts_async", thread)
+    monkeypatch.setattr(ingestor.reddit, "fetch_posts_async", reddit)
+    monkeypatch.setattr(ingestor.slack, "fetch_messages_async", empty)
+    monkeypatch.setattr(ingestor.websearch, "fetch_google_news_since_async", no_news)
+    first = asyncio.run(ingestor.fetch_by_source(["AAPL"]))
+    assert len(first["4chan"]) == 2 and len(first["reddit"]) == 2
+
+    # Thread 1 gets a reply; thread 2 is untouched and is not refetched
+    board[1].append({"no": 3, "com": "reply 3"})
+    catalog["threads"][0].update(last_modified=200, replies=1)
+    fetched.clear()
+    second = asyncio.run(ingestor.fetch_by_source(["AAPL"]))
+    assert fetched == [1]
+    assert [i["text"] for i in second["4chan"]] == ["reply 3"]
+    assert second["reddit"] == []
+    # Watermarks survive a restart
+    assert WatermarkStore(tmp_path / "marks.json").get("reddit", "AAPL") == {"created_utc": 20}
+
+def test_non_4chan_items_carry_their_publish_time(monkeypatch):
+    from backend.app.services.pg_store import item_published_at
+    from backend.app.services.signal_aggregator import SignalAggregator
+    ingestor = AsyncIngestor(use_x=True)
+    ingestor.fourchan_limiter = RateLimiter(0)
+
+    async def no_catalog(http, board="biz"):
+        return []
+
+    async def reddit(http, ticker, max_results=100, after=None):
+        return [{"title": "AAPL old news", "selftext": "", "created_utc": 1000}]
+
+    async def slack(http, channel, query, max_results=10, oldest=None):
+        return [{"text": "AAPL slack", "ts": "5000.000100"}]
+
+    async def news(http, ticker, max_results=10):
+        return [{"title": "AAPL wire", "summary": "", "published_ts": 5000}]
+
+    async def tweets(ticker, max_results=100):
+        return [{"content": "AAPL tweet", "date": "1970-01-01 01:23:20+00:00"}]
+
+    monkeypatch.setattr(ingestor.fourchan, "fetch_board_catalog_async", no_catalog)
+    monkeypatch.setattr(ingestor.reddit, "fetch_posts_async", reddit)
+    monkeypatch.setattr(ingestor.slack, "fetch_messages_async", slack)
+    monkeypatch.setattr(ingestor.websearch, "fetch_google_news_async", news)
+    monkeypatch.setattr(ingestor.xclient, "fetch_tweets_async", tweets)
+    by_source = asyncio.run(ingestor.fetch_by_source(["AAPL"]))
+    stamps = {src: item_published_at(items[0]).timestamp() for src, items in by_source.items() if items}
+    assert stamps == {"reddit": 1000, "slack": 5000.0001, "news": 5000, "x.com": 5000}
+
+    # The aggregator places them at their own publish time: the reddit post is already out of the window
+    agg = SignalAggregator(window_seconds=1000)
+    items = [{**i, "sentiment": 0.9} for items in by_source.values() for i in items]
+    assert agg.fold(items, ["AAPL"], now=5500) == 3
@@ -0,0 +1,51 @@
+import time
+import asyncio
+from backend.app.ingest.fourchan_crawler import FourChanCrawler, RateLimiter
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(0.05)
+
+    async def burst():
+        start = time.monotonic()
+        await asyncio.gather(*(limiter.wait() for _ in range(5)))
+        return time.monotonic() - start
+
+    assert asyncio.run(burst()) >= 0.19
+
+def test_cancelled_wait_does_not_hold_a_slot():
+    limiter = RateLimiter(0.2)
+
+    async def run():
+        await limiter.wait()
+        waiters = [asyncio.ensure_future(limiter.wait()) for _ in range(5)]
+        await asyncio.sleep(0.01)
+        for w in waiters:
+            w.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        start = time.monotonic()
+        await limiter.wait()
+        return time.monotonic() - start
+
+    # One interval after the first call, not six
+    assert asyncio.run(run()) < 0.3
+
+def test_crawler_skips_unchanged_board():
+    crawler = FourChanCrawler(limiter=RateLimiter(0))
+    calls = []
+
+    async def threads_if_modified(http, board="biz", last_modified=None):
+        calls.append(last_modified)
+        if last_modified:
+            return None, last_modified
+        return [{"threads": [{"no": 7, "last_modified": 1, "replies": 0}]}], "Mon, 01 Jan 2024 00:00:00 GMT"
+
+    async def thread(http, board="biz", thread_id=None):
+        return [{"no": 7, "com": "op"}]
+
+    crawler.client.fetch_board_threads_if_modified_async = threads_if_modified
+    crawler.client.fetch_thread_posts_async = thread
+    first, second = [], []
+    asyncio.run(crawler.crawl(None, first))
+    asyncio.run(crawler.crawl(None, second))
+    assert [p["no"] for p in first] == [7] and second == []
+    assert calls == [None, "Mon, 01 Jan 2024 00:00:00 GMT"]
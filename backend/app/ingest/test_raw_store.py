@@ -0,0 +1,37 @@
+import sys
+import time
+
+import pytest
+from backend.app.ingest.raw_store import RawWriter, compact_partition, iter_records, tee_command, utc_date, write_records
+
+def test_append_only_partitions(tmp_path):
+    assert write_records("reddit", [{"title": "a"}, {"title": "b"}], ticker="AAPL", root=tmp_path) == 2
+    with RawWriter("reddit", root=tmp_path, ticker="TSLA") as writer:
+        writer.write({"title": "c"})
+    # Earlier writes are kept, not overwritten
+    rows = list(iter_records("reddit", root=tmp_path))
+    assert sorted(r["record"]["title"] for r in rows) == ["a", "b", "c"]
+    assert {r["ticker"] for r in rows} == {"AAPL", "TSLA"}
+    assert list(iter_records("reddit", start_date="2999-01-01", root=tmp_path)) == []
+    assert list(iter_records("gdelt", root=tmp_path)) == []
+
+def test_compact_partition_to_parquet(tmp_path):
+    pytest.importorskip("pyarrow")
+    write_records("news", [{"title": "a"}], root=tmp_path)
+    write_records("news", [{"title": "b"}], root=tmp_path)
+    target = compact_partition("news", utc_date(), root=tmp_path)
+    assert target is not None and target.name == "compacted.parquet"
+    assert [p.name for p in target.parent.iterdir()] == ["compacted.parquet"]
+    assert sorted(r["record"]["title"] for r in iter_records("news", root=tmp_path)) == ["a", "b"]
+
+def test_tee_command_stops_early_and_at_the_deadline(tmp_path):
+    # Floods stderr (would fill an undrained pipe), prints two records, then hangs
+    script = ("import sys, time\nsys.stderr.write('x' * 1000000)\n"
+              "print('{\"n\": 1}')\nprint('{\"n\": 2}', flush=True)\ntime.sleep(30)")
+    with RawWriter("x.com", root=tmp_path) as writer:
+        assert tee_command([sys.executable, "-c", script], writer, max_results=1) == [{"n": 1}]
+    start = time.monotonic()
+    with RawWriter("x.com", root=tmp_path) as writer:
+        assert tee_command([sys.executable, "-c", script], writer, timeout=1.0) == [{"n": 1}, {"n": 2}]
+    assert time.monotonic() - start < 10
+    assert len(list(iter_records("x.com", root=tmp_path))) == 3
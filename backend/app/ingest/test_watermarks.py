@@ -0,0 +1,12 @@
+from backend.app.ingest import watermarks
+from backend.app.ingest.watermarks import WatermarkStore, get_watermark_store
+
+def test_consumers_have_separate_namespaces(tmp_path, monkeypatch):
+    monkeypatch.setattr(watermarks, "WATERMARKS_PATH", tmp_path / "ingest_watermarks.json")
+    monkeypatch.setattr(watermarks, "_stores", {})
+    signals, chat = get_watermark_store("signals"), get_watermark_store("chat")
+    assert get_watermark_store("signals") is signals and signals is not chat
+    signals.set("reddit", "AAPL", {"created_utc": 100})
+    signals.save()
+    assert chat.get("reddit", "AAPL") == {}
+    assert WatermarkStore(tmp_path / "ingest_watermarks.signals.json").get("reddit", "AAPL") == {"created_utc": 100}
@@ -0,0 +1,93 @@
+"""
+Ingest Watermarks for MarketSentinel
+Persisted per-source, per-key high-water marks for incremental ingestion: 4chan thread last_modified and last
+post number, RSS ETag/Last-Modified and newest published time, Reddit created_utc and Slack ts. Clients fetch
+conditionally or filter against these so each refresh only emits items that are new since the last one.
+Every consumer (an API endpoint, the websocket tick) has its own namespace, i.e. its own store and file, so
+one consumer advancing the marks never hides new items from another.
+"""
+import os
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger("watermarks")
+
+WATERMARKS_PATH = Path(__file__).parent.parent / "data" / "ingest_watermarks.json"
+INGEST_INCREMENTAL = os.getenv("INGEST_INCREMENTAL", "false").lower() == "true"
+
+
+class WatermarkStore:
+    def __init__(self, path: Optional[Path] = WATERMARKS_PATH):
+        self.path = Path(path) if path else None
+        self._marks: Dict[str, Dict[str, Dict]] = {}
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def get(self, source: str, key: str) -> Dict:
+        with self._lock:
+            return dict(self._marks.get(source, {}).get(key, {}))
+
+    def set(self, source: str, key: str, mark: Dict) -> None:
+        with self._lock:
+            self._marks.setdefault(source, {})[key] = dict(mark)
+            self._dirty = True
+
+    def keys(self, source: str) -> Iterable[str]:
+        with self._lock:
+            return list(self._marks.get(source, {}))
+
+    def prune(self, source: str, keep: Iterable[str]) -> None:
+        """Drops marks of `source` whose key is not in `keep` (e.g. 4chan threads that fell off the catalog)."""
+        keep = set(keep)
+        with self._lock:
+            marks = self._marks.get(source, {})
+            for key in [k for k in marks if k not in keep]:
+                del marks[key]
+                self._dirty = True
+
+    def load(self) -> None:
+        if not self.path or not self.path.exists():
+            return
+        try:
+            with open(self.path) as f:
+                self._marks = json.load(f)
+        except Exception as e:
+            logger.error(f"Failed to load ingest watermarks: {e}")
+
+    def save(self) -> None:
+        """Writes the marks if anything changed, replacing the previous file atomically."""
+        if not self.path:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            payload = json.dumps(self._marks)
+            self._dirty = False
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(payload)
+            os.replace(tmp, self.path)
+        except Exception as e:
+            logger.error(f"Failed to save ingest watermarks: {e}")
+
+
+_stores: Dict[str, WatermarkStore] = {}
+_store_lock = threading.Lock()
+
+
+def watermarks_path(consumer: str) -> Path:
+    return WATERMARKS_PATH if consumer == "default" else WATERMARKS_PATH.with_name(f"ingest_watermarks.{consumer}.json")
+
+
+def get_watermark_store(consumer: str = "default") -> WatermarkStore:
+    """Process-wide store for one consumer's watermarks."""
+    with _store_lock:
+        store = _stores.get(consumer)
+        if store is None:
+            store = _stores[consumer] = WatermarkStore(watermarks_path(consumer))
+        return store
@@ -0,0 +1,222 @@
+"""
+Embedding Service for MarketSentinel
+One sentence-transformers model per process, shared by EmbeddingGenerator and the RAG index.
+Concurrent embed() calls are micro-batched into a single encode() call (flushed when the batch is full or the
+oldest request has waited max_wait seconds). Vectors are cached as float32 by text hash in a bounded
+in-memory LRU backed by a bounded SQLite file, so re-fetched posts and headlines are never embedded twice.
+"""
+import os
+import time
+import queue
+import sqlite3
+import hashlib
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("embedding_service")
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+CACHE_PATH = Path(__file__).parent.parent / "data" / "embedding_cache.sqlite"
+MEMORY_CACHE_SIZE = int(os.getenv("EMBED_MEMORY_CACHE_SIZE", "50000"))
+DISK_CACHE_SIZE = int(os.getenv("EMBED_DISK_CACHE_SIZE", "1000000"))
+MAX_BATCH = int(os.getenv("EMBED_MAX_BATCH", "64"))
+MAX_WAIT = float(os.getenv("EMBED_MAX_WAIT_MS", "10")) / 1000
+
+
+class EmbeddingCache:
+    """text-hash -> float32 vector. LRU in memory, oldest-used rows trimmed on disk."""
+
+    def __init__(self, path: Optional[Path] = CACHE_PATH, max_memory: int = MEMORY_CACHE_SIZE, max_disk: int = DISK_CACHE_SIZE):
+        self.max_memory = max_memory
+        self.max_disk = max_disk
+        self._mem: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if path is not None:
+            try:
+                Path(path).parent.mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(str(path), check_same_thread=False)
+                self._db.execute("CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vec BLOB NOT NULL, used REAL NOT NULL)")
+                self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_used ON embeddings(used)")
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"Embedding disk cache unavailable: {e}")
+                self._db = None
+
+    def _remember(self, key: str, vec: np.ndarray) -> None:
+        self._mem[key] = vec
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_memory:
+            self._mem.popitem(last=False)
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        found = {}
+        with self._lock:
+            missing = []
+            for key in keys:
+                vec = self._mem.get(key)
+                if vec is not None:
+                    self._mem.move_to_end(key)
+                    found[key] = vec
+                else:
+                    missing.append(key)
+            if missing and self._db is not None:
+                try:
+                    for start in range(0, len(missing), 500):
+                        chunk = missing[start:start + 500]
+                        rows = self._db.execute(
+                            f"SELECT key, vec FROM embeddings WHERE key IN ({','.join('?' * len(chunk))})", chunk
+                        ).fetchall()
+                        for key, blob in rows:
+                            vec = np.frombuffer(blob, dtype="float32")
+                            found[key] = vec
+                            self._remember(key, vec)
+                        if rows:
+                            now = time.time()
+                            self._db.executemany("UPDATE embeddings SET used = ? WHERE key = ?", [(now, k) for k, _ in rows])
+                    self._db.commit()
+                except Exception as e:
+                    logger.warning(f"Embedding disk cache read failed: {e}")
+        return found
+
+    def put_many(self, items: Dict[str, np.ndarray]) -> None:
+        if not items:
+            return
+        with self._lock:
+            for key, vec in items.items():
+                self._remember(key, vec)
+            if self._db is None:
+                return
+            try:
+                now = time.time()
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vec, used) VALUES (?, ?, ?)",
+                    [(k, np.asarray(v, dtype="float32").tobytes(), now) for k, v in items.items()],
+                )
+                (count,) = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+                if count > self.max_disk:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE key IN (SELECT key FROM embeddings ORDER BY used LIMIT ?)",
+                        (count - self.max_disk,),
+                    )
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"Embedding disk cache write failed: {e}")
+
+
+class _Request:
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        self.future: Future = Future()
+
+
+class EmbeddingService:
+    def __init__(self, model_name: str = DEFAULT_MODEL, model=None, cache: Optional[EmbeddingCache] = None,
+                 max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT):
+        self.model_name = model_name
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self._model = model
+        self._model_failed = False
+        self._model_lock = threading.Lock()
+        self._queue: "queue.Queue[_Request]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=f"embed-{model_name}", daemon=True)
+        self._worker.start()
+
+    @property
+    def model(self):
+        with self._model_lock:
+            if self._model is None and not self._model_failed:
+                try:
+                    from sentence_transformers import SentenceTransformer
+                    self._model = SentenceTransformer(self.model_name)
+                except Exception as e:
+                    logger.error(f"Failed to load embedding model: {e}")
+                    self._model_failed = True
+            return self._model
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        """Returns an (n, dim) float32 array; (n, 0) if the model is unavailable."""
+        if not texts:
+            return np.zeros((0, 0), dtype="float32")
+        keys = [self._key(t) for t in texts]
+        cached = self.cache.get_many(keys)
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached:
+                missing.setdefault(key, text)
+        if missing:
+            req = _Request(list(missing.values()))
+            self._queue.put(req)
+            vectors = req.future.result()
+            if vectors is None:
+                return np.zeros((len(texts), 0), dtype="float32")
+            fresh = dict(zip(missing.keys(), vectors))
+            self.cache.put_many(fresh)
+            cached.update(fresh)
+        return np.vstack([cached[k] for k in keys]).astype("float32", copy=False)
+
+    async def aembed(self, texts: List[str]) -> np.ndarray:
+        # Cache lookups and waiting on the batcher block, so keep them off the event loop
+        return await asyncio.to_thread(self.embed, texts)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            size = len(batch[0].texts)
+            deadline = time.monotonic() + self.max_wait
+            while size < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    req = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                batch.append(req)
+                size += len(req.texts)
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[_Request]) -> None:
+        unique: Dict[str, int] = {}
+        for req in batch:
+            for t in req.texts:
+                unique.setdefault(t, len(unique))
+        try:
+            model = self.model
+            if model is None:
+                for req in batch:
+                    req.future.set_result(None)
+                return
+            vectors = np.asarray(model.encode(list(unique), batch_size=self.max_batch, show_progress_bar=False), dtype="float32")
+            for req in batch:
+                req.future.set_result(vectors[[unique[t] for t in req.texts]])
+        except Exception as e:
+            logger.error(f"Embedding batch failed: {e}")
+            for req in batch:
+                if not req.future.done():
+                    req.future.set_exception(e)
+
+
+_services: Dict[str, EmbeddingService] = {}
+_services_lock = threading.Lock()
+
+
+def get_embedding_service(model_name: str = DEFAULT_MODEL) -> EmbeddingService:
+    """Process-wide embedding service for a model (the sentence-transformers/ prefix is optional)."""
+    name = model_name.split("/", 1)[1] if model_name.startswith("sentence-transformers/") else model_name
+    with _services_lock:
+        if name not in _services:
+            _services[name] = EmbeddingService(name)
+        return _services[name]
@@ -1,22 +1,21 @@
 """
 Embeddings for MarketSentinel
-Generates text embeddings using sentence-transformers.
+Generates text embeddings using sentence-transformers, via the process-wide embedding service.
 """
 import logging
 from typing import List
 
+from backend.app.nlp.embedding_service import get_embedding_service
+
 logger = logging.getLogger("embeddings")
 
 class EmbeddingGenerator:
     def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
-        try:
-            from sentence_transformers import SentenceTransformer
-            self.model = SentenceTransformer(model_name)
-        except Exception as e:
-            logger.error(f"Failed to load embedding model: {e}")
-            self.model = None
+        # The model is loaded once per process and shared; constructing generators is cheap
+        self.service = get_embedding_service(model_name)
 
     def embed(self, texts: List[str]) -> List[list]:
-        if not self.model:
+        vectors = self.service.embed(texts)
+        if not vectors.size:
             return [[] for _ in texts]
-        return self.model.encode(texts, show_progress_bar=False).tolist()
+        return vectors.tolist()
@@ -0,0 +1,117 @@
+"""
+FinBERT Scorer for MarketSentinel
+Batched FinBERT (ProsusAI/finbert) inference for the sentiment ensemble.
+Texts are tokenized once, sorted by length and packed into dynamic batches under a padded-token budget, so
+short 4chan/Reddit posts are not padded to the length of the longest article. On CPU-only torch builds an
+int8 dynamically-quantized model ("int8") or an ONNX Runtime export ("onnx") can be used instead of the
+fp32 model ("torch"). Scores are mapped to [0, 1] with 0.5 as neutral.
+"""
+import os
+import logging
+import threading
+from typing import List, Optional
+
+logger = logging.getLogger("finbert")
+
+FINBERT_MODEL = os.getenv("FINBERT_MODEL", "ProsusAI/finbert")
+FINBERT_BACKEND = os.getenv("FINBERT_BACKEND", "int8")  # torch | int8 | onnx
+FINBERT_THREADS = int(os.getenv("FINBERT_THREADS", "0"))  # 0 = torch default
+FINBERT_MAX_LENGTH = int(os.getenv("FINBERT_MAX_LENGTH", "128"))
+FINBERT_MAX_BATCH = int(os.getenv("FINBERT_MAX_BATCH", "64"))
+FINBERT_MAX_BATCH_TOKENS = int(os.getenv("FINBERT_MAX_BATCH_TOKENS", "4096"))
+# Throughput the CPU build is expected to sustain; see scripts/bench_sentiment.py
+FINBERT_TARGET_ITEMS_PER_SEC = float(os.getenv("FINBERT_TARGET_ITEMS_PER_SEC", "200"))
+
+
+def plan_batches(lengths: List[int], max_batch: int, max_tokens: int) -> List[List[int]]:
+    """Groups item indices into batches sorted by length, keeping batch_size * longest <= max_tokens."""
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, current, longest = [], [], 0
+    for i in order:
+        new_longest = max(longest, lengths[i])
+        if current and (len(current) >= max_batch or (len(current) + 1) * new_longest > max_tokens):
+            batches.append(current)
+            current, new_longest = [], lengths[i]
+        current.append(i)
+        longest = new_longest
+    if current:
+        batches.append(current)
+    return batches
+
+
+class FinBERTScorer:
+    def __init__(self, model_name: str = FINBERT_MODEL, backend: str = FINBERT_BACKEND, num_threads: int = FINBERT_THREADS,
+                 max_length: int = FINBERT_MAX_LENGTH, max_batch: int = FINBERT_MAX_BATCH, max_batch_tokens: int = FINBERT_MAX_BATCH_TOKENS):
+        self.model_name = model_name
+        self.backend = backend
+        self.num_threads = num_threads
+        self.max_length = max_length
+        self.max_batch = max_batch
+        self.max_batch_tokens = max_batch_tokens
+        self.tokenizer = None
+        self.model = None
+        self.pos_idx = self.neg_idx = None
+        self._failed = False
+        self._lock = threading.Lock()
+
+    def _load(self) -> bool:
+        if self.model is not None or self._failed:
+            return self.model is not None
+        try:
+            import torch
+            from transformers import AutoTokenizer, AutoModelForSequenceClassification
+            if self.num_threads > 0:
+                torch.set_num_threads(self.num_threads)
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            if self.backend == "onnx":
+                from optimum.onnxruntime import ORTModelForSequenceClassification
+                model = ORTModelForSequenceClassification.from_pretrained(self.model_name, export=True)
+            else:
+                model = AutoModelForSequenceClassification.from_pretrained(self.model_name).eval()
+                if self.backend == "int8":
+                    model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+            labels = {v.lower(): int(k) for k, v in model.config.id2label.items()}
+            self.pos_idx, self.neg_idx = labels["positive"], labels["negative"]
+            self.model = model
+            logger.info(f"Loaded FinBERT ({self.model_name}, backend={self.backend})")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to load FinBERT: {e}")
+            self._failed = True
+            return False
+
+    def score(self, texts: List[str]) -> List[Optional[float]]:
+        """Scores texts in [0, 1]; returns Nones if the model is unavailable."""
+        if not texts:
+            return []
+        with self._lock:
+            if not self._load():
+                return [None] * len(texts)
+            import torch
+            encoded = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+            input_ids = encoded["input_ids"]
+            scores: List[Optional[float]] = [None] * len(texts)
+            for batch in plan_batches([len(ids) for ids in input_ids], self.max_batch, self.max_batch_tokens):
+                features = self.tokenizer.pad(
+                    {"input_ids": [input_ids[i] for i in batch], "attention_mask": [encoded["attention_mask"][i] for i in batch]},
+                    return_tensors="pt",
+                )
+                with torch.inference_mode():
+                    probs = torch.softmax(self.model(**features).logits, dim=-1)
+                polarity = (probs[:, self.pos_idx] - probs[:, self.neg_idx]).tolist()
+                for i, p in zip(batch, polarity):
+                    scores[i] = 0.5 * (1.0 + p)
+            return scores
+
+
+_scorer: Optional[FinBERTScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_finbert_scorer() -> FinBERTScorer:
+    """Process-wide FinBERT scorer; the model is loaded on first use."""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = FinBERTScorer()
+        return _scorer
@@ -0,0 +1,97 @@
+"""
+Lexicon Sentiment for MarketSentinel
+Finance/social-media tuned lexicon scorer that works on whole batches.
+The batch is tokenized in one regex pass, tokens are mapped to integer ids through a prebuilt vocabulary,
+and per-item scores are reduced with NumPy (bincount) instead of a Python loop per item. A negator
+immediately before a term flips its polarity. Cheap enough to run on every post before the model stages.
+"""
+import re
+import logging
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("lexicon")
+
+# Term -> polarity weight (roughly -3..3, VADER scale)
+FINANCE_LEXICON: Dict[str, float] = {
+    # bullish
+    "beat": 1.5, "beats": 1.5, "bullish": 2.5, "bull": 1.5, "bulls": 1.5, "buy": 1.2, "buying": 1.2, "long": 0.8,
+    "calls": 1.0, "moon": 2.5, "mooning": 2.5, "rocket": 2.0, "rally": 2.0, "rallies": 2.0, "surge": 2.2,
+    "surges": 2.2, "soar": 2.3, "soars": 2.3, "jump": 1.5, "jumps": 1.5, "gain": 1.5, "gains": 1.5, "up": 0.6,
+    "upgrade": 2.0, "upgraded": 2.0, "outperform": 1.8, "record": 1.2, "growth": 1.3, "profit": 1.5,
+    "profitable": 1.8, "strong": 1.5, "stronger": 1.6, "breakout": 1.8, "buyback": 1.5, "dividend": 0.8,
+    "raise": 1.0, "raises": 1.0, "raised": 1.0, "tendies": 2.0, "lambo": 1.8, "undervalued": 1.5, "pump": 0.8,
+    "squeeze": 1.2, "green": 1.2, "ath": 1.5, "approval": 1.5, "approved": 1.5, "win": 1.5, "wins": 1.5,
+    # bearish
+    "miss": -1.5, "misses": -1.5, "missed": -1.5, "bearish": -2.5, "bear": -1.5, "bears": -1.5, "sell": -1.2,
+    "selling": -1.2, "short": -1.0, "puts": -1.0, "dump": -2.2, "dumping": -2.2, "crash": -2.8, "crashes": -2.8,
+    "plunge": -2.5, "plunges": -2.5, "tank": -2.2, "tanks": -2.2, "drop": -1.5, "drops": -1.5, "fall": -1.3,
+    "falls": -1.3, "loss": -1.8, "losses": -1.8, "down": -0.6, "downgrade": -2.0, "downgraded": -2.0,
+    "underperform": -1.8, "weak": -1.5, "weaker": -1.6, "lawsuit": -1.8, "sued": -1.8, "fraud": -3.0,
+    "recall": -1.6, "bankrupt": -3.0, "bankruptcy": -3.0, "default": -2.2, "layoffs": -1.5, "cut": -1.0,
+    "cuts": -1.0, "overvalued": -1.5, "bagholder": -2.0, "bagholders": -2.0, "rekt": -2.5, "red": -1.2,
+    "scam": -2.8, "rug": -2.5, "delisted": -2.8, "probe": -1.5, "investigation": -1.5, "warning": -1.5,
+    "🚀": 2.5, "📈": 1.8, "💎": 1.2, "📉": -1.8, "🐻": -1.2, "🐂": 1.2,
+}
+NEGATORS = ("not", "no", "never", "isn't", "isnt", "aren't", "arent", "wasn't", "wasnt", "don't", "dont",
+            "doesn't", "doesnt", "didn't", "didnt", "won't", "wont", "can't", "cant", "without", "hardly")
+# VADER-style normalization constant: score = s / sqrt(s^2 + alpha)
+ALPHA = 15.0
+NEGATION_FACTOR = -0.74
+
+_SEP = "\x00"
+_TOKEN_RE = re.compile(r"[a-z][a-z']*|[\U0001F300-\U0001FAFF]|\x00")
+
+
+class LexiconScorer:
+    def __init__(self, lexicon: Optional[Dict[str, float]] = None, negators=NEGATORS, alpha: float = ALPHA):
+        lexicon = lexicon or FINANCE_LEXICON
+        self.alpha = alpha
+        # id 0 is "unknown"; term ids follow, then negator ids
+        terms = list(lexicon)
+        negs = [n for n in negators if n not in lexicon]
+        self.vocab: Dict[str, int] = {t: i + 1 for i, t in enumerate(terms + negs)}
+        self.vocab[_SEP] = len(self.vocab) + 1
+        size = len(self.vocab) + 1
+        self.weights = np.zeros(size, dtype="float64")
+        self.weights[1:len(terms) + 1] = [lexicon[t] for t in terms]
+        self.is_negator = np.zeros(size, dtype=bool)
+        self.is_negator[[self.vocab[n] for n in negs]] = True
+        self.sep_id = self.vocab[_SEP]
+
+    def polarity(self, texts: List[str]) -> np.ndarray:
+        """Per-item polarity in [-1, 1]; NaN where no lexicon term occurs."""
+        n = len(texts)
+        if not n:
+            return np.zeros(0)
+        # One tokenization pass over the whole batch; separators mark item boundaries
+        tokens = _TOKEN_RE.findall(f" {_SEP} ".join(t.replace(_SEP, " ") for t in texts).lower())
+        ids = np.fromiter(map(self.vocab.get, tokens, repeat(0)), dtype=np.int64, count=len(tokens))
+        item = np.cumsum(ids == self.sep_id)
+        w = self.weights[ids]
+        prev_neg = np.zeros(len(ids), dtype=bool)
+        prev_neg[1:] = self.is_negator[ids[:-1]]
+        w = np.where(prev_neg, w * NEGATION_FACTOR, w)
+        hit = w != 0
+        sums = np.bincount(item, weights=w, minlength=n)[:n]
+        hits = np.bincount(item, weights=hit, minlength=n)[:n]
+        out = sums / np.sqrt(sums * sums + self.alpha)
+        out[hits == 0] = np.nan
+        return out
+
+    def score(self, texts: List[str]) -> List[Optional[float]]:
+        """Scores in [0, 1] (0.5 neutral); None for items without any lexicon term."""
+        scores = 0.5 * (1.0 + self.polarity(texts))
+        return [None if np.isnan(s) else float(s) for s in scores]
+
+
+_scorer: Optional[LexiconScorer] = None
+
+
+def get_lexicon_scorer() -> LexiconScorer:
+    global _scorer
+    if _scorer is None:
+        _scorer = LexiconScorer()
+    return _scorer
@@ -14,6 +14,14 @@ You are MarketSentinel Assistant — a concise, evidence-first financial researc
 7) Output only valid JSON using the specified schema.
 """
 
+SENTIMENT_BATCH_SYSTEM_PROMPT = """
+You are a financial sentiment classifier. You receive a JSON array of items, each with an integer "id" and a "text"
+(news headlines, Reddit/4chan/X posts, Slack messages). For every item, rate the market sentiment the text expresses
+toward the securities it mentions, from 0.0 (very bearish) through 0.5 (neutral or no market view) to 1.0 (very bullish).
+Sarcasm, memes and slang are common; judge the intended meaning.
+Output only valid JSON of the form {"scores": [{"id": 0, "score": 0.5}, ...]} with exactly one entry per input id.
+"""
+
 # 200+ diverse, robust, and edge-case scenarios for LLM prompt engineering
 FEW_SHOT_EXAMPLES = [
     # --- Macro & Policy Events ---
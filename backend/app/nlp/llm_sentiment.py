@@ -0,0 +1,134 @@
+"""
+LLM Sentiment for MarketSentinel
+Micro-batched LLM sentiment scoring through OpenRouterClient.
+Items are packed N at a time into one structured-output prompt (capped by an estimated token budget), batches
+run concurrently under a limit, and per-item scores are cached by text hash, so a refresh costs a handful of
+LLM calls instead of one per item.
+"""
+import os
+import json
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from cachetools import TTLCache
+
+from backend.app.clients.openrouter_client import OpenRouterClient
+from backend.app.nlp.llm_prompts import SENTIMENT_BATCH_SYSTEM_PROMPT
+
+logger = logging.getLogger("llm_sentiment")
+
+LLM_SENTIMENT_MAX_ITEMS = int(os.getenv("LLM_SENTIMENT_MAX_ITEMS", "25"))
+LLM_SENTIMENT_MAX_TOKENS = int(os.getenv("LLM_SENTIMENT_MAX_TOKENS", "3000"))
+LLM_SENTIMENT_CONCURRENCY = int(os.getenv("LLM_SENTIMENT_CONCURRENCY", "4"))
+LLM_SENTIMENT_MAX_CHARS = 600  # per item; longer texts are truncated before packing
+CHARS_PER_TOKEN = 4
+ITEM_TOKEN_OVERHEAD = 12  # json framing + id per item
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + ITEM_TOKEN_OVERHEAD
+
+
+def pack_batches(texts: List[str], max_items: int, max_tokens: int) -> List[List[int]]:
+    """Greedily packs item indices into batches under both an item cap and an estimated token cap."""
+    batches, current, used = [], [], 0
+    for i, text in enumerate(texts):
+        cost = estimate_tokens(text)
+        if current and (len(current) >= max_items or used + cost > max_tokens):
+            batches.append(current)
+            current, used = [], 0
+        current.append(i)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+
+def parse_scores(content: str) -> Dict[int, float]:
+    """Extracts {id: score} from a model reply, tolerating code fences or surrounding prose."""
+    if not content:
+        return {}
+    start, end = content.find("{"), content.rfind("}")
+    if start < 0 or end <= start:
+        return {}
+    try:
+        data = json.loads(content[start:end + 1])
+    except ValueError:
+        return {}
+    scores = {}
+    for row in data.get("scores", []) if isinstance(data, dict) else []:
+        try:
+            scores[int(row["id"])] = min(max(float(row["score"]), 0.0), 1.0)
+        except (KeyError, TypeError, ValueError):
+            continue
+    return scores
+
+
+class LLMSentimentScorer:
+    def __init__(self, client: Optional[OpenRouterClient] = None, max_items: int = LLM_SENTIMENT_MAX_ITEMS,
+                 max_tokens: int = LLM_SENTIMENT_MAX_TOKENS, concurrency: int = LLM_SENTIMENT_CONCURRENCY,
+                 cache_size: int = 20000, cache_ttl: int = 60 * 60 * 6):
+        self.client = client or OpenRouterClient()
+        self.max_items = max_items
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.cache = TTLCache(maxsize=cache_size, ttl=cache_ttl)
+        self._cache_lock = threading.Lock()
+
+    @property
+    def available(self) -> bool:
+        return bool(self.client.api_key)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha1(f"{self.client.model}\0{text}".encode("utf-8")).hexdigest()
+
+    def _score_batch(self, texts: List[str]) -> Dict[int, float]:
+        payload = json.dumps([{"id": i, "text": t} for i, t in enumerate(texts)], ensure_ascii=False)
+        response = self.client.classify(payload, SENTIMENT_BATCH_SYSTEM_PROMPT)
+        if not isinstance(response, dict) or "choices" not in response:
+            logger.warning(f"LLM sentiment batch failed: {response.get('error') if isinstance(response, dict) else response}")
+            return {}
+        content = response.get("choices", [{}])[0].get("message", {}).get("content", "")
+        return parse_scores(content)
+
+    def score(self, texts: List[str]) -> List[Optional[float]]:
+        """Scores in [0, 1] (0.5 neutral); None where the LLM is unavailable or skipped an item."""
+        if not texts or not self.available:
+            return [None] * len(texts)
+        keys = [self._key(t) for t in texts]
+        with self._cache_lock:
+            known = {k: self.cache[k] for k in keys if k in self.cache}
+        pending: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in known and key not in pending:
+                pending[key] = text[:LLM_SENTIMENT_MAX_CHARS]
+        if pending:
+            pending_keys, pending_texts = list(pending), list(pending.values())
+            batches = pack_batches(pending_texts, self.max_items, self.max_tokens)
+            with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(batches)))) as pool:
+                results = list(pool.map(lambda b: self._score_batch([pending_texts[i] for i in b]), batches))
+            fresh = {}
+            for batch, scores in zip(batches, results):
+                for local_id, score in scores.items():
+                    if 0 <= local_id < len(batch):
+                        fresh[pending_keys[batch[local_id]]] = score
+            with self._cache_lock:
+                self.cache.update(fresh)
+            known.update(fresh)
+        return [known.get(k) for k in keys]
+
+
+_scorer: Optional[LLMSentimentScorer] = None
+_scorer_lock = threading.Lock()
+
+
+def get_llm_sentiment_scorer() -> LLMSentimentScorer:
+    """Process-wide scorer so the per-item cache survives across refresh cycles."""
+    global _scorer
+    with _scorer_lock:
+        if _scorer is None:
+            _scorer = LLMSentimentScorer()
+        return _scorer
@@ -2,40 +2,69 @@
 Sentiment Ensemble for MarketSentinel
 Computes sentiment using FinBERT, LLM, and Lexicon for all sources (news, Reddit, 4chan, X.com, Slack, Google News).
 Outputs per-source and aggregate sentiment.
+Scores are in [0, 1] with 0.5 as neutral. Components that are unavailable are left out and the remaining
+weights are renormalized; an item with no component scores is neutral.
+The lexicon scores every item; only items it is unsure about (no lexicon terms, or a score within
+LEXICON_CONFIDENT_MARGIN of neutral, where the bullish/bearish thresholds sit) go on to FinBERT and the LLM.
+Clear-cut items keep their lexicon score.
 """
+import os
 import logging
-from typing import List, Dict
+from typing import List, Dict, Optional
+
+from backend.app.nlp.finbert import get_finbert_scorer
+from backend.app.nlp.lexicon import get_lexicon_scorer
+from backend.app.nlp.llm_sentiment import get_llm_sentiment_scorer
 
 logger = logging.getLogger("sentiment")
 
+NEUTRAL = 0.5
+LLM_SENTIMENT_ENABLED = os.getenv("LLM_SENTIMENT_ENABLED", "true").lower() == "true"
+# Lexicon scores at least this far from neutral skip the model stages; 0.5 sends every item through
+LEXICON_CONFIDENT_MARGIN = float(os.getenv("LEXICON_CONFIDENT_MARGIN", "0.35"))
+
 class SentimentEnsemble:
-    def __init__(self, finbert_weight=0.5, llm_weight=0.3, lexicon_weight=0.2):
+    def __init__(self, finbert_weight=0.5, llm_weight=0.3, lexicon_weight=0.2, use_finbert: bool = True, use_llm: bool = LLM_SENTIMENT_ENABLED,
+                 confident_margin: float = LEXICON_CONFIDENT_MARGIN):
         self.finbert_weight = finbert_weight
         self.llm_weight = llm_weight
         self.lexicon_weight = lexicon_weight
-        # Placeholders for actual model loading
-        self.finbert = None
-        self.vader = None
-        self.llm = None
+        self.confident_margin = confident_margin
+        # FinBERT is shared per process; building an ensemble does not reload it
+        self.finbert = get_finbert_scorer() if use_finbert else None
+        self.lexicon = get_lexicon_scorer()
+        # Batched LLM scoring; abstains (None) when no OpenRouter key is configured
+        self.llm = get_llm_sentiment_scorer() if use_llm else None
+
+    def _combine(self, scores: Dict[str, Optional[float]]) -> float:
+        weights = {"finbert": self.finbert_weight, "llm": self.llm_weight, "lexicon": self.lexicon_weight}
+        total = sum(weights[k] for k, v in scores.items() if v is not None)
+        if total <= 0:
+            return NEUTRAL
+        return sum(weights[k] * v for k, v in scores.items() if v is not None) / total
+
+    def _score_subset(self, scorer, texts: List[str], subset: List[int]) -> List[Optional[float]]:
+        """Scores texts[i] for i in `subset` in one batch; None everywhere else."""
+        scores: List[Optional[float]] = [None] * len(texts)
+        if scorer is None or not subset:
+            return scores
+        for i, score in zip(subset, scorer.score([texts[i] for i in subset])):
+            scores[i] = score
+        return scores
 
     def compute_sentiment(self, items: List[Dict]) -> List[Dict]:
         """
         Computes ensemble sentiment for each item from any source.
         Outputs per-source and aggregate sentiment.
         """
-        for item in items:
-            # Placeholder: replace with actual model inference
-            finbert_score = 0.0  # TODO: Run FinBERT
-            llm_score = 0.0      # TODO: Run LLM
-            lexicon_score = 0.0  # TODO: Run VADER or similar
-            item["sentiment"] = (
-                self.finbert_weight * finbert_score +
-                self.llm_weight * llm_score +
-                self.lexicon_weight * lexicon_score
-            )
-            item["sentiment_breakdown"] = {
-                "finbert": finbert_score,
-                "llm": llm_score,
-                "lexicon": lexicon_score
-            }
+        texts = [item.get("text", "") for item in items]
+        # Cheap vectorized lexicon stage first; FinBERT and the LLM only see the items it is unsure about
+        lexicon_scores = self.lexicon.score(texts)
+        unsure = [i for i, s in enumerate(lexicon_scores) if s is None or abs(s - NEUTRAL) < self.confident_margin]
+        finbert_scores = self._score_subset(self.finbert, texts, unsure)
+        llm_scores = self._score_subset(self.llm, texts, unsure)
+        for item, finbert_score, llm_score, lexicon_score in zip(items, finbert_scores, llm_scores, lexicon_scores):
+            breakdown = {"finbert": finbert_score, "llm": llm_score, "lexicon": lexicon_score}
+            item["sentiment"] = self._combine(breakdown)
+            item["sentiment_breakdown"] = breakdown
         return items
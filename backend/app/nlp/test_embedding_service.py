@@ -0,0 +1,32 @@
+import threading
+import numpy as np
+from backend.app.nlp.embedding_service import EmbeddingCache, EmbeddingService
+
+class FakeModel:
+    def __init__(self):
+        self.calls = []
+
+    def encode(self, texts, **kw):
+        self.calls.append(list(texts))
+        return np.array([[len(t), 1.0] for t in texts])
+
+def test_concurrent_requests_share_one_encode(tmp_path):
+    model = FakeModel()
+    svc = EmbeddingService("fake", model=model, cache=EmbeddingCache(tmp_path / "c.sqlite"), max_batch=64, max_wait=0.2)
+    out = {}
+    threads = [threading.Thread(target=lambda i=i: out.__setitem__(i, svc.embed([f"post {i}", "shared"]))) for i in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(model.calls) == 1
+    assert sorted(model.calls[0]) == sorted([f"post {i}" for i in range(8)] + ["shared"])
+    assert out[3].dtype == np.float32 and out[3].tolist() == [[6.0, 1.0], [6.0, 1.0]]
+
+def test_cache_persists_across_services(tmp_path):
+    first = FakeModel()
+    EmbeddingService("fake", model=first, cache=EmbeddingCache(tmp_path / "c.sqlite"), max_wait=0).embed(["AAPL up"])
+    second = FakeModel()
+    svc = EmbeddingService("fake", model=second, cache=EmbeddingCache(tmp_path / "c.sqlite"), max_wait=0)
+    assert svc.embed(["AAPL up"]).tolist() == [[7.0, 1.0]]
+    assert second.calls == []
@@ -0,0 +1,29 @@
+import json
+from backend.app.nlp.llm_sentiment import LLMSentimentScorer, pack_batches, parse_scores
+
+class FakeClient:
+    api_key = "demo-key"
+    model = "fake"
+
+    def __init__(self):
+        self.prompts = []
+
+    def classify(self, prompt, system_prompt, cache_key=None):
+        self.prompts.append(prompt)
+        items = json.loads(prompt)
+        scores = [{"id": it["id"], "score": 0.9 if "moon" in it["text"] else 0.1} for it in items]
+        return {"choices": [{"message": {"content": "```json\n" + json.dumps({"scores": scores}) + "\n```"}}]}
+
+def test_batches_and_caches_per_item():
+    client = FakeClient()
+    scorer = LLMSentimentScorer(client=client, max_items=3, concurrency=2)
+    texts = ["to the moon", "rug pull", "moon soon", "bagholders", "moon", "to the moon"]
+    assert scorer.score(texts) == [0.9, 0.1, 0.9, 0.1, 0.9, 0.9]
+    assert len(client.prompts) == 2
+    assert scorer.score(["rug pull", "moon"]) == [0.1, 0.9]
+    assert len(client.prompts) == 2
+
+def test_pack_and_parse():
+    assert pack_batches(["x" * 400] * 5, max_items=10, max_tokens=250) == [[0, 1], [2, 3], [4]]
+    assert parse_scores('noise {"scores": [{"id": 1, "score": 1.4}, {"id": "x"}]}') == {1: 1.0}
+    assert parse_scores("no json") == {}
@@ -0,0 +1,41 @@
+from backend.app.nlp.finbert import plan_batches
+from backend.app.nlp.sentiment import SentimentEnsemble
+
+def test_plan_batches_sorted_and_bounded():
+    lengths = [100, 5, 7, 90, 6, 120]
+    batches = plan_batches(lengths, max_batch=2, max_tokens=200)
+    assert sorted(i for b in batches for i in b) == list(range(6))
+    assert batches[0] == [1, 4]
+    for b in batches:
+        assert len(b) <= 2 and len(b) * max(lengths[i] for i in b) <= 200 or len(b) == 1
+
+def test_ensemble_renormalizes_available_components():
+    class FakeFinBERT:
+        def score(self, texts):
+            return [0.9 for _ in texts]
+    ensemble = SentimentEnsemble(use_finbert=False, use_llm=False)
+    assert ensemble.compute_sentiment([{"text": "x"}])[0]["sentiment"] == 0.5  # no lexicon terms either
+    ensemble.finbert = FakeFinBERT()
+    assert ensemble.compute_sentiment([{"text": "x"}])[0]["sentiment"] == 0.9
+
+def test_lexicon_batch_scores():
+    from backend.app.nlp.lexicon import LexiconScorer
+    scores = LexiconScorer().score(["AAPL beat estimates, bullish 🚀", "TSLA crash and fraud probe", "not bullish at all", "hello world"])
+    assert scores[0] > 0.8 and scores[1] < 0.2 and scores[2] < 0.5
+    assert scores[3] is None
+
+def test_model_stages_only_see_items_the_lexicon_is_unsure_about():
+    seen = []
+
+    class FakeFinBERT:
+        def score(self, texts):
+            seen.extend(texts)
+            return [0.2 for _ in texts]
+
+    ensemble = SentimentEnsemble(use_finbert=False, use_llm=False)
+    ensemble.finbert = FakeFinBERT()
+    texts = ["AAPL beat estimates, bullish 🚀 rally", "TSLA up a bit", "no terms here"]
+    items = ensemble.compute_sentiment([{"text": t} for t in texts])
+    assert seen == texts[1:]
+    assert items[0]["sentiment_breakdown"]["finbert"] is None and items[0]["sentiment"] > 0.85
+    assert items[2]["sentiment"] == 0.2
@@ -0,0 +1,14 @@
+import re
+from backend.app.nlp.ticker_matcher import TickerMatcher, get_ticker_matcher
+
+def test_matches_like_per_ticker_regex():
+    tickers = ["AAPL", "TSLA", "MSFT", "RELIANCE.NS", "A", "AA", "AAL"]
+    texts = ["aapl and $TSLA up", "RELIANCE results", "AA vs AAL vs A", "AAPLX MSFTs", ""]
+    matcher = TickerMatcher(tickers)
+    for text in texts:
+        expected = {t for t in tickers if re.search(rf"\b{re.escape(t.split('.')[0])}\b", text, flags=re.IGNORECASE)}
+        assert matcher.find(text) == expected
+
+def test_matcher_cached_per_ticker_set():
+    assert get_ticker_matcher(["AAPL", "TSLA"]) is get_ticker_matcher(["TSLA", "AAPL"])
+    assert get_ticker_matcher(["AAPL"]) is not get_ticker_matcher(["AAPL", "TSLA"])
@@ -0,0 +1,67 @@
+"""
+Ticker Matcher for MarketSentinel
+Finds every watchlist ticker mentioned in a text in a single regex pass.
+All symbols are compiled into one trie-shaped alternation (shared prefixes are factored out), so scanning
+cost no longer grows with one regex per ticker. Matchers are cached per ticker set and only rebuilt when
+the watchlist changes.
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import Dict, Iterable, List, Set, Tuple
+
+logger = logging.getLogger("ticker_matcher")
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    trie: Dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: Dict) -> str:
+        terminal = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if terminal:
+            # Optional tail: prefer the longer symbol, fall back to the shorter one
+            return "(?:" + body + ")?" if len(branches) > 1 or len(body) > 1 else body + "?"
+        return body
+
+    return build(trie)
+
+
+class TickerMatcher:
+    def __init__(self, tickers: Iterable[str]):
+        self.tickers = tuple(tickers)
+        # Match on the base symbol ("RELIANCE" for "RELIANCE.NS"), case-insensitively
+        self.by_base: Dict[str, List[str]] = {}
+        for t in self.tickers:
+            base = t.split(".")[0].lower()
+            if base:
+                self.by_base.setdefault(base, []).append(t)
+        self.pattern = re.compile(rf"\b(?:{_trie_regex(self.by_base)})\b", re.IGNORECASE) if self.by_base else None
+
+    def find(self, text: str) -> Set[str]:
+        """Returns the set of tickers mentioned in text."""
+        if not self.pattern or not text:
+            return set()
+        found: Set[str] = set()
+        for m in self.pattern.finditer(text):
+            found.update(self.by_base.get(m.group(0).lower(), ()))
+        return found
+
+
+@lru_cache(maxsize=32)
+def _cached_matcher(key: Tuple[str, ...]) -> TickerMatcher:
+    logger.debug(f"Compiling ticker matcher for {len(key)} tickers")
+    return TickerMatcher(key)
+
+
+def get_ticker_matcher(tickers: Iterable[str]) -> TickerMatcher:
+    """Matcher for a ticker set; compiled once per distinct set."""
+    return _cached_matcher(tuple(sorted(set(tickers))))
@@ -1,24 +1,149 @@
 """
 Deduplication for MarketSentinel
 Removes duplicate items from ingested data based on text hash.
+In "near" mode, items are also compared by MinHash signatures over word shingles, with locality-sensitive
+hashing (LSH) bands so each item is only compared against likely matches. This catches cross-posted
+headlines, quote-reposts and lightly edited copies. By default each dedupe() call is independent (stateless).
+With window_seconds set, seen items are remembered across calls for that rolling window, which also bounds
+memory when one deduper is reused across ingestion cycles.
 """
-import logging
-from typing import List, Dict
+import re
+import time
+import zlib
 import hashlib
+import logging
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 logger = logging.getLogger("dedupe")
 
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_WORD_RE = re.compile(r"\w+")
+
+
+def choose_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """Picks (bands, rows) with bands * rows == num_perm whose S-curve midpoint (1/b)^(1/r) is closest to threshold."""
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        midpoint = (1.0 / bands) ** (1.0 / rows)
+        err = abs(midpoint - threshold)
+        if best is None or err < best[0]:
+            best = (err, bands, rows)
+    return best[1], best[2]
+
+
+class MinHasher:
+    def __init__(self, num_perm: int = 128, shingle_size: int = 3, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, (1 << 61) - 1, size=num_perm, dtype=np.uint64)
+
+    def shingles(self, text: str) -> List[str]:
+        words = _WORD_RE.findall(text.lower())
+        k = self.shingle_size
+        if len(words) <= k:
+            return [" ".join(words)] if words else []
+        return [" ".join(words[i:i + k]) for i in range(len(words) - k + 1)]
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hv = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in set(shingles)), dtype=np.uint64)
+        # (a * h + b) mod p for every (shingle, permutation) pair, reduced to the minimum per permutation
+        with np.errstate(over="ignore"):
+            phv = ((np.outer(hv, self.a) + self.b) % _MERSENNE) & _MAX_HASH
+        return phv.min(axis=0).astype(np.uint32)
+
+
 class DataDeduper:
-    def dedupe(self, items: List[Dict]) -> List[Dict]:
-        """
-        Deduplicates a list of items based on text hash.
-        """
-        seen = set()
-        deduped = []
+    def __init__(self, mode: str = "exact", threshold: float = 0.8, num_perm: int = 128, shingle_size: int = 3,
+                 window_seconds: Optional[float] = None):
+        self.mode = mode
+        self.threshold = threshold
+        self.window_seconds = window_seconds
+        self.hasher = MinHasher(num_perm, shingle_size) if mode == "near" else None
+        self.bands, self.rows = choose_bands(num_perm, threshold) if mode == "near" else (0, 0)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._exact: Dict[str, float] = {}
+        self._signatures: Dict[int, np.ndarray] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._order: deque = deque()  # (seen_at, exact_hash, entry_id or None)
+        self._next_id = 0
+
+    def _evict(self, now: float) -> None:
+        if self.window_seconds is None:
+            self._reset()  # stateless: nothing carries over from earlier calls
+            return
+        cutoff = now - self.window_seconds
+        while self._order and self._order[0][0] < cutoff:
+            seen_at, h, entry_id = self._order.popleft()
+            if self._exact.get(h) == seen_at:
+                del self._exact[h]
+            if entry_id is not None:
+                sig = self._signatures.pop(entry_id, None)
+                if sig is not None:
+                    for key in self._band_keys(sig):
+                        ids = self._buckets.get(key)
+                        if ids:
+                            ids.remove(entry_id)
+                            if not ids:
+                                del self._buckets[key]
+
+    def _band_keys(self, sig: np.ndarray) -> List[Tuple[int, bytes]]:
+        r = self.rows
+        return [(b, sig[b * r:(b + 1) * r].tobytes()) for b in range(self.bands)]
+
+    def _is_near_duplicate(self, sig: np.ndarray, keys: List[Tuple[int, bytes]]) -> bool:
+        checked = set()
+        for key in keys:
+            for entry_id in self._buckets.get(key, ()):
+                if entry_id in checked:
+                    continue
+                checked.add(entry_id)
+                # Fraction of equal MinHash slots estimates Jaccard similarity of the shingle sets
+                if np.mean(self._signatures[entry_id] == sig) >= self.threshold:
+                    return True
+        return False
+
+    def iter_dedupe(self, items: Iterable[Dict], now: Optional[float] = None) -> Iterator[Dict]:
+        """Lazily yields the first copy of each item; see dedupe."""
+        now = time.time() if now is None else now
+        self._evict(now)
         for item in items:
             text = item.get("text", "")
             h = hashlib.md5(text.encode("utf-8")).hexdigest()
-            if h not in seen:
-                seen.add(h)
-                deduped.append(item)
-        return deduped
+            if h in self._exact:
+                continue
+            entry_id = None
+            if self.hasher is not None:
+                sig = self.hasher.signature(text)
+                if sig is not None:
+                    keys = self._band_keys(sig)
+                    if self._is_near_duplicate(sig, keys):
+                        continue
+                    entry_id = self._next_id
+                    self._next_id += 1
+                    self._signatures[entry_id] = sig
+                    for key in keys:
+                        self._buckets.setdefault(key, []).append(entry_id)
+            self._exact[h] = now
+            self._order.append((now, h, entry_id))
+            yield item
+
+    def dedupe(self, items: Iterable[Dict], now: Optional[float] = None) -> List[Dict]:
+        """
+        Deduplicates a list of items based on text hash (and MinHash similarity in "near" mode).
+        With window_seconds set, items already seen by earlier calls within the window are dropped as well.
+        """
+        return list(self.iter_dedupe(items, now))
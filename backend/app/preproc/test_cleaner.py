@@ -5,3 +5,16 @@ def test_clean():
     items = [{"text": "  hello  "}]
     cleaned = cleaner.clean(items)
     assert cleaned[0]["text"] == "hello"
+
+def test_clean_single_pass_rules():
+    cleaner = DataCleaner()
+    item = {"text": "  SHIT,  mail a.b@x.com\n from 10.0.0.1  ", "source": "4chan"}
+    cleaned = next(cleaner.iter_clean([item]))
+    assert cleaned == {"text": "[filtered], mail [anon_email] from [anon_ip]", "source": "4chan"}
+    assert item["text"].startswith("  SHIT")  # input is not mutated
+
+def test_clean_parallel_keeps_order():
+    cleaner = DataCleaner()
+    items = [{"text": f" post  {i} "} for i in range(50)]
+    cleaned = list(cleaner.iter_clean_parallel(items, workers=2, chunk_size=7))
+    assert [c["text"] for c in cleaned] == [f"post {i}" for i in range(50)]
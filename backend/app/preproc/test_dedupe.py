@@ -5,3 +5,19 @@ def test_dedupe():
     items = [{"text": "foo"}, {"text": "foo"}, {"text": "bar"}]
     deduped = deduper.dedupe(items)
     assert len(deduped) == 2
+    # Stateless by default: a later call does not remember earlier items
+    assert len(deduper.dedupe(items)) == 2
+
+def test_dedupe_near_duplicates():
+    deduper = DataDeduper(mode="near", threshold=0.7, window_seconds=6 * 3600)
+    headline = "Tesla shares surge after record quarterly deliveries beat analyst expectations"
+    items = [
+        {"text": headline},
+        {"text": headline + " !!"},
+        {"text": "RT " + headline.lower()},
+        {"text": "Apple cuts iPhone production as demand in China weakens"},
+    ]
+    assert len(deduper.dedupe(items, now=0)) == 2
+    # Seen stories are remembered for the window, then forgotten
+    assert deduper.dedupe([{"text": headline}], now=60) == []
+    assert len(deduper.dedupe([{"text": headline}], now=deduper.window_seconds + 120)) == 1
@@ -0,0 +1,287 @@
+"""
+RAG Index Service for MarketSentinel
+Long-lived, incrementally updated FAISS index shared by all RAG requests in the process.
+Documents are chunked and keyed by content hash, so only unseen chunks are embedded. Chunks not seen again
+within the retention window are evicted; a min-heap keyed by last-seen time makes the per-request eviction check
+O(1) when nothing has expired. The index is snapshotted to disk (and once more on shutdown) and, on restart,
+the vectors are memory-mapped and streamed into FAISS instead of being re-embedded. Each snapshot is written to its own versioned directory and
+published by atomically replacing the CURRENT pointer file, so a crash mid-save leaves the previous snapshot
+intact and a reader never sees files from two different saves.
+"""
+import os
+import json
+import time
+import heapq
+import hashlib
+import shutil
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger("index_service")
+
+INDEX_DIR = Path(__file__).parent.parent / "data" / "rag_index"
+RETENTION_SECONDS = float(os.getenv("RAG_RETENTION_HOURS", "72")) * 3600
+SNAPSHOT_INTERVAL = float(os.getenv("RAG_SNAPSHOT_INTERVAL", "60"))
+# Rows copied from the memory-mapped snapshot into FAISS per add call on load
+LOAD_BATCH_ROWS = 65536
+
+EmbedFn = Callable[[List[str]], Any]
+
+
+def content_id(text: str) -> int:
+    """Stable positive int64 id derived from the chunk text."""
+    digest = hashlib.sha1(text.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") & 0x7FFFFFFFFFFFFFFF
+
+
+def split_text(text: str, chunk_size: int = 800, chunk_overlap: int = 160) -> List[str]:
+    """Character splitter that prefers whitespace boundaries (same sizes the LangChain splitter used)."""
+    text = text.strip()
+    if len(text) <= chunk_size:
+        return [text] if text else []
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            cut = text.rfind(" ", start + chunk_overlap + 1, end)
+            if cut > start:
+                end = cut
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - chunk_overlap, start + 1)
+    return [c for c in chunks if c]
+
+
+class RAGIndexService:
+    def __init__(self, embed_fn: Optional[EmbedFn] = None, dim: int = 384, index_dir: Path = INDEX_DIR,
+                 retention_seconds: float = RETENTION_SECONDS, snapshot_interval: float = SNAPSHOT_INTERVAL,
+                 chunk_size: int = 800, chunk_overlap: int = 160):
+        self._embed_fn = embed_fn
+        self.dim = dim
+        self.index_dir = Path(index_dir)
+        self.retention_seconds = retention_seconds
+        self.snapshot_interval = snapshot_interval
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.entries: Dict[int, Dict] = {}
+        # (seen_at, id) min-heap; may lag an entry's seen_at, which evict_expired corrects lazily
+        self._expiry: List[tuple] = []
+        self.index = None
+        self._lock = threading.RLock()
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._last_snapshot = time.time()
+        try:
+            import faiss
+            # Inner product over L2-normalized vectors == cosine similarity
+            self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(dim))
+        except Exception as e:
+            logger.error(f"Failed to initialize FAISS: {e}")
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def embed_fn(self) -> EmbedFn:
+        if self._embed_fn is None:
+            from backend.app.nlp.embedding_service import get_embedding_service
+            self._embed_fn = get_embedding_service().embed
+        return self._embed_fn
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        vectors = self.embed_fn(texts)
+        if not len(vectors) or not len(vectors[0]):
+            return None
+        arr = np.asarray(vectors, dtype="float32").reshape(len(texts), self.dim)
+        norms = np.linalg.norm(arr, axis=1, keepdims=True)
+        return arr / np.maximum(norms, 1e-12)
+
+    def add(self, items: List[Dict], now: Optional[float] = None) -> int:
+        """Indexes items not seen before; returns the number of newly embedded chunks."""
+        if self.index is None:
+            return 0
+        now = now or time.time()
+        new_ids, new_texts, new_meta = [], [], []
+        pending = set()
+        with self._lock:
+            for it in items:
+                text = it.get("text") or it.get("summary") or it.get("snippet") or ""
+                meta = {k: v for k, v in it.items() if k != "text"}
+                for chunk in split_text(text, self.chunk_size, self.chunk_overlap):
+                    cid = content_id(chunk)
+                    if cid in self.entries:
+                        self.entries[cid]["seen_at"] = now
+                    elif cid not in pending:
+                        pending.add(cid)
+                        new_ids.append(cid)
+                        new_texts.append(chunk)
+                        new_meta.append(meta)
+        if not new_ids:
+            return 0
+        # Embed outside the lock so concurrent queries are not blocked by model inference
+        vectors = self._embed(new_texts)
+        if vectors is None:
+            return 0
+        with self._lock:
+            keep = [i for i, cid in enumerate(new_ids) if cid not in self.entries]
+            if not keep:
+                return 0
+            ids = np.asarray([new_ids[i] for i in keep], dtype="int64")
+            self.index.add_with_ids(vectors[keep], ids)
+            for i in keep:
+                self.entries[new_ids[i]] = {"text": new_texts[i], "metadata": new_meta[i], "seen_at": now}
+                heapq.heappush(self._expiry, (now, new_ids[i]))
+            self._dirty = True
+        self.maybe_snapshot()
+        return len(keep)
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Removes chunks not seen within the retention window. Only heap entries older than the cutoff are
+        visited; one whose chunk was seen again since is pushed back with its current seen_at."""
+        if self.index is None:
+            return 0
+        cutoff = (now or time.time()) - self.retention_seconds
+        with self._lock:
+            heap, expired = self._expiry, []
+            while heap and heap[0][0] < cutoff:
+                _, cid = heapq.heappop(heap)
+                entry = self.entries.get(cid)
+                if entry is None:
+                    continue
+                if entry["seen_at"] >= cutoff:
+                    heapq.heappush(heap, (entry["seen_at"], cid))
+                else:
+                    expired.append(cid)
+            if not expired:
+                return 0
+            self.index.remove_ids(np.asarray(expired, dtype="int64"))
+            for cid in expired:
+                del self.entries[cid]
+            self._dirty = True
+        return len(expired)
+
+    def search(self, query: str, k: int = 4) -> List[Dict]:
+        if self.index is None or not self.entries:
+            return []
+        q = self._embed([query])
+        if q is None:
+            return []
+        with self._lock:
+            scores, ids = self.index.search(q, min(k, len(self.entries)))
+            hits = []
+            for score, cid in zip(scores[0], ids[0]):
+                entry = self.entries.get(int(cid))
+                if entry is not None:
+                    hits.append({"text": entry["text"], **entry["metadata"], "score": float(score)})
+        return hits
+
+    def maybe_snapshot(self) -> None:
+        if self._dirty and time.time() - self._last_snapshot >= self.snapshot_interval:
+            self.save()
+
+    def _snapshot_dir(self) -> Optional[Path]:
+        pointer = self.index_dir / "CURRENT"
+        if pointer.exists():
+            return self.index_dir / pointer.read_text().strip()
+        # Snapshots written before versioned directories were introduced
+        return self.index_dir if (self.index_dir / "ids.npy").exists() else None
+
+    def save(self) -> bool:
+        """Writes ids, vectors and entry metadata to a new snapshot directory, then publishes it atomically."""
+        if self.index is None:
+            return False
+        with self._save_lock:
+            try:
+                # Copy the state under the lock; the disk writes happen outside it, so queries are not blocked
+                with self._lock:
+                    ids = np.asarray(list(self.entries.keys()), dtype="int64")
+                    vectors = self.index.reconstruct_batch(ids) if len(ids) else np.zeros((0, self.dim), dtype="float32")
+                    entries = [{"id": int(cid), **self.entries[int(cid)]} for cid in ids]
+                    self._dirty = False
+                self.index_dir.mkdir(parents=True, exist_ok=True)
+                name = f"snapshot-{time.time_ns()}"
+                tmp = self.index_dir / f".{name}"
+                tmp.mkdir()
+                np.save(tmp / "ids.npy", ids)
+                np.save(tmp / "vectors.npy", vectors.astype("float32"))
+                with open(tmp / "entries.jsonl", "w") as f:
+                    for entry in entries:
+                        f.write(json.dumps(entry, default=str) + "\n")
+                os.replace(tmp, self.index_dir / name)
+                pointer = self.index_dir / "CURRENT.tmp"
+                pointer.write_text(name)
+                os.replace(pointer, self.index_dir / "CURRENT")
+                self._last_snapshot = time.time()
+                self._prune_snapshots(keep=name)
+                return True
+            except Exception as e:
+                self._dirty = True
+                logger.error(f"Failed to snapshot RAG index: {e}")
+                return False
+
+    def _prune_snapshots(self, keep: str) -> None:
+        for path in self.index_dir.iterdir():
+            if path.is_dir() and path.name.lstrip(".").startswith("snapshot-") and path.name != keep:
+                shutil.rmtree(path, ignore_errors=True)
+        for name in ("ids.npy", "vectors.npy", "entries.jsonl"):
+            (self.index_dir / name).unlink(missing_ok=True)
+
+    def load(self) -> int:
+        """Restores the last published snapshot. The vectors are memory-mapped and added to FAISS in batches, so
+        restart does not hold a second full copy of the matrix in memory."""
+        if self.index is None:
+            return 0
+        with self._lock:
+            try:
+                snapshot = self._snapshot_dir()
+                if snapshot is None:
+                    return 0
+                ids = np.load(snapshot / "ids.npy")
+                vectors = np.load(snapshot / "vectors.npy", mmap_mode="r")
+                entries = {}
+                with open(snapshot / "entries.jsonl") as f:
+                    for line in f:
+                        row = json.loads(line)
+                        entries[row.pop("id")] = row
+                self.index.reset()
+                for start in range(0, len(ids), LOAD_BATCH_ROWS):
+                    end = start + LOAD_BATCH_ROWS
+                    self.index.add_with_ids(np.ascontiguousarray(vectors[start:end]), np.ascontiguousarray(ids[start:end]))
+                del vectors
+                self.entries = entries
+                self._expiry = [(e["seen_at"], cid) for cid, e in entries.items()]
+                heapq.heapify(self._expiry)
+                self._dirty = False
+                logger.info(f"Loaded RAG index snapshot with {len(entries)} chunks")
+                return len(entries)
+            except Exception as e:
+                logger.error(f"Failed to load RAG index snapshot: {e}")
+                return 0
+
+_service: Optional[RAGIndexService] = None
+_service_lock = threading.Lock()
+
+
+def get_index_service() -> RAGIndexService:
+    """Process-wide index service, restored from the last snapshot on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = RAGIndexService()
+            _service.load()
+        return _service
+
+
+def save_index_service() -> bool:
+    """Snapshots the process-wide index if it was created and has unsaved adds (e.g. on shutdown)."""
+    with _service_lock:
+        service = _service
+    if service is None or not service._dirty:
+        return False
+    return service.save()
@@ -1,57 +1,86 @@
 """
 LangChain RAG Helper for MarketSentinel
-Builds a FAISS vector store over provided documents and answers queries using a RetrievalQA chain.
+Indexes provided documents into the process-wide RAG index service and answers queries using a RetrievalQA chain.
 Uses HuggingFace (sentence-transformers/all-MiniLM-L6-v2) embeddings (free) and ChatOpenAI with
 OpenRouter (via OpenAI-compatible base URL).
 """
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
 import os
 import logging
+from functools import partial
 
 logger = logging.getLogger("langchain_rag")
 
+# Same wording as LangChain's default "stuff" QA prompt, for the non-LangChain streaming path
+RAG_PROMPT_TEMPLATE = (
+    "Use the following pieces of context to answer the question at the end. If you don't know the answer, "
+    "just say that you don't know, don't try to make up an answer.\n\n{context}\n\nQuestion: {question}\nHelpful Answer:"
+)
+
+
+def make_retriever(search_fn, k: int = 4):
+    """Wraps a `search(query, k) -> List[Dict]` callable as a LangChain retriever."""
+    from langchain_core.retrievers import BaseRetriever
+    from langchain_core.documents import Document
+
+    class _SearchRetriever(BaseRetriever):
+        search_fn: Any
+        k: int = 4
+
+        def _get_relevant_documents(self, query: str, *, run_manager=None):
+            hits = self.search_fn(query, self.k)
+            return [Document(page_content=h.get("text", ""), metadata={k: v for k, v in h.items() if k != "text"}) for h in hits]
+
+    return _SearchRetriever(search_fn=search_fn, k=k)
+
+
 class RAGPipeline:
-    def __init__(self, model_name: str = "sentence-transformers/all-MiniLM-L6-v2"):
-        self.model_name = model_name
-        self.vectorstore = None
+    def __init__(self, index_service=None, top_k: int = 4, filters: Optional[Dict] = None,
+                 index_args: Optional[Dict] = None):
+        # index_service must expose add(items) and search(query, k); defaults to the shared FAISS index.
+        # filters are passed through to search() as keyword arguments (e.g. tickers/since for pgvector),
+        # index_args to add() (e.g. the request's tickers for pgvector).
+        self.index_service = index_service
+        self.top_k = top_k
+        self.filters = filters or {}
+        self.index_args = index_args or {}
         self.retriever = None
         self.chain = None
 
-    def _to_documents(self, items: List[Dict]):
-        try:
-            from langchain_core.documents import Document
-        except Exception:
-            # older versions
-            from langchain.schema import Document  # type: ignore
-        docs = []
-        for it in items:
-            text = it.get("text") or it.get("summary") or it.get("snippet") or ""
-            meta = {k: v for k, v in it.items() if k != "text"}
-            if text:
-                docs.append(Document(page_content=text, metadata=meta))
-        return docs
-
     def index(self, docs_like: List[Dict]):
+        """Adds unseen documents to the index; only new content is embedded."""
+        if self.index_service is None:
+            from backend.app.rag.index_service import get_index_service
+            self.index_service = get_index_service()
         try:
-            try:
-                from langchain_huggingface import HuggingFaceEmbeddings  # preferred
-            except Exception:
-                from langchain_community.embeddings import HuggingFaceEmbeddings  # fallback
-            from langchain_community.vectorstores import FAISS
-            from langchain.text_splitter import RecursiveCharacterTextSplitter
+            self.index_service.add(docs_like, **self.index_args)
+            if hasattr(self.index_service, "evict_expired"):
+                self.index_service.evict_expired()
         except Exception as e:
-            logger.error(f"LangChain not available: {e}")
+            logger.error(f"RAG indexing failed: {e}")
             return False
-        docs = self._to_documents(docs_like)
-        if not docs:
+        if not len(self.index_service):
             return False
-        splitter = RecursiveCharacterTextSplitter(chunk_size=800, chunk_overlap=160)
-        chunks = splitter.split_documents(docs)
-        embeddings = HuggingFaceEmbeddings(model_name=self.model_name)
-        self.vectorstore = FAISS.from_documents(chunks, embeddings)
-        self.retriever = self.vectorstore.as_retriever()
+        try:
+            self.retriever = make_retriever(self._search_fn(), k=self.top_k)
+        except Exception as e:
+            # Retrieval still works without LangChain (see retrieve/build_prompt); only make_chain needs it
+            logger.error(f"LangChain not available: {e}")
         return True
 
+    def _search_fn(self):
+        return partial(self.index_service.search, **self.filters) if self.filters else self.index_service.search
+
+    def retrieve(self, query: str) -> List[Dict]:
+        if self.index_service is None:
+            return []
+        return self._search_fn()(query, self.top_k)
+
+    def build_prompt(self, query: str, hits: List[Dict]) -> str:
+        """Stuffs retrieved chunks into the same QA prompt the RetrievalQA "stuff" chain uses."""
+        context = "\n\n".join(h.get("text", "") for h in hits)
+        return RAG_PROMPT_TEMPLATE.format(context=context, question=query)
+
     def make_chain(self, temperature: float = 0.0):
         try:
             # Map OpenRouter -> OpenAI-compatible env expected by langchain-openai
@@ -0,0 +1,190 @@
+"""
+pgvector Retrieval Backend for MarketSentinel
+Drop-in index service for RAGPipeline backed by documents.embedding in Postgres, so every API worker shares
+one persistent index. Search is an HNSW cosine-distance scan (ORDER BY embedding <=> query LIMIT k) with
+ticker and time filters in the WHERE clause; hnsw.ef_search bounds the work per query. Each row carries every
+ticker its chunk mentions (documents.tickers, matched with &&); untagged rows (general market news) match any
+ticker filter. Chunks are keyed by
+"<source_id>#<n>", so re-indexed items are skipped, and chunk rows never collide with the whole-document rows
+services/pg_store.py stores under the bare source_id (whose text is not what a chunk embedding describes).
+"""
+import os
+import logging
+import threading
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.app.nlp.ticker_matcher import get_ticker_matcher
+from backend.app.rag.index_service import EmbedFn, RETENTION_SECONDS, split_text
+from backend.app.services.pg_store import DATABASE_URL, PG_POOL_MAX, PG_POOL_MIN, item_published_at, source_id_for, vector_literal
+
+logger = logging.getLogger("pgvector_retriever")
+
+PGVECTOR_EF_SEARCH = int(os.getenv("PGVECTOR_EF_SEARCH", "64"))
+# pgvector >= 0.8: keep scanning the HNSW graph until k rows pass the filters; set to "off" for older versions
+PGVECTOR_ITERATIVE_SCAN = os.getenv("PGVECTOR_ITERATIVE_SCAN", "relaxed_order")
+
+_UPSERT = """
+INSERT INTO documents (source_id, ticker, tickers, title, url, text, published_at, embedding)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s::vector)
+ON CONFLICT (source_id) DO UPDATE SET embedding = EXCLUDED.embedding WHERE documents.embedding IS NULL
+"""
+
+
+def build_search_sql(query_vector: str, k: int, tickers: Optional[List[str]] = None,
+                     since: Optional[datetime] = None) -> Tuple[str, List[Any]]:
+    """SQL and params for a nearest-neighbour search with the ticker/time filters pushed into WHERE."""
+    where, filters = ["embedding IS NOT NULL"], []
+    if tickers:
+        where.append("(tickers && %s::text[] OR tickers = '{}')")
+        filters.append(list(tickers))
+    if since is not None:
+        where.append("COALESCE(published_at, created_at) >= %s")
+        filters.append(since)
+    sql = (
+        "SELECT source_id, ticker, tickers, title, url, text, published_at, 1 - (embedding <=> %s::vector) AS score "
+        f"FROM documents WHERE {' AND '.join(where)} ORDER BY embedding <=> %s::vector LIMIT %s"
+    )
+    return sql, [query_vector, *filters, query_vector, int(k)]
+
+
+class PgVectorIndex:
+    def __init__(self, dsn: Optional[str] = DATABASE_URL, embed_fn: Optional[EmbedFn] = None, dim: int = 384,
+                 tickers: Optional[List[str]] = None, ef_search: int = PGVECTOR_EF_SEARCH,
+                 chunk_size: int = 800, chunk_overlap: int = 160):
+        self.dsn = dsn
+        self._embed_fn = embed_fn
+        self.dim = dim
+        # Default ticker universe used to tag documents that carry no ticker of their own (add() can override it)
+        self.tickers = tickers
+        self.ef_search = ef_search
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @property
+    def embed_fn(self) -> EmbedFn:
+        if self._embed_fn is None:
+            from backend.app.nlp.embedding_service import get_embedding_service
+            self._embed_fn = get_embedding_service().embed
+        return self._embed_fn
+
+    @contextmanager
+    def _conn(self):
+        with self._pool_lock:
+            if self._pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+                self._pool = ThreadedConnectionPool(PG_POOL_MIN, PG_POOL_MAX, self.dsn)
+        conn = self._pool.getconn()
+        try:
+            with conn:  # commits, or rolls back on error
+                with conn.cursor() as cur:
+                    yield cur
+        finally:
+            self._pool.putconn(conn)
+
+    def _embed(self, texts: List[str]) -> Optional[np.ndarray]:
+        vectors = self.embed_fn(texts)
+        if not len(vectors) or not len(vectors[0]):
+            return None
+        arr = np.asarray(vectors, dtype="float32").reshape(len(texts), self.dim)
+        return arr / np.maximum(np.linalg.norm(arr, axis=1, keepdims=True), 1e-12)
+
+    def _tickers(self, item: Dict, text: str, tickers: Optional[List[str]]) -> List[str]:
+        """All tickers the chunk is about: the item's own tags, else every universe ticker mentioned in it."""
+        own = [item["ticker"]] if item.get("ticker") else list(item.get("tickers") or [])
+        if own:
+            return sorted(set(own))
+        return sorted(get_ticker_matcher(tickers).find(text)) if tickers else []
+
+    def __len__(self) -> int:
+        try:
+            with self._conn() as cur:
+                cur.execute("SELECT EXISTS (SELECT 1 FROM documents WHERE embedding IS NOT NULL)")
+                if not cur.fetchone()[0]:
+                    return 0
+                # Planner estimate; an exact count(*) is a full scan at millions of rows
+                cur.execute("SELECT GREATEST(reltuples::bigint, 1) FROM pg_class WHERE oid = 'documents'::regclass")
+                return int(cur.fetchone()[0])
+        except Exception as e:
+            logger.error(f"pgvector size check failed: {e}")
+            return 0
+
+    def add(self, items: List[Dict], tickers: Optional[List[str]] = None) -> int:
+        """Embeds and stores chunks whose id has no embedding yet; returns the number stored. `tickers` is the
+        universe used to tag items without a ticker (defaults to the index's own)."""
+        tickers = tickers or self.tickers
+        rows = []
+        for item in items:
+            text = item.get("text") or item.get("summary") or item.get("snippet") or ""
+            base = source_id_for(item)
+            for i, chunk in enumerate(split_text(text, self.chunk_size, self.chunk_overlap)):
+                rows.append((f"{base}#{i}", item, chunk))
+        if not rows:
+            return 0
+        with self._conn() as cur:
+            cur.execute("SELECT source_id FROM documents WHERE source_id = ANY(%s) AND embedding IS NOT NULL",
+                        ([r[0] for r in rows],))
+            done = {r[0] for r in cur.fetchall()}
+        seen, todo = set(done), []
+        for row in rows:
+            if row[0] not in seen:
+                seen.add(row[0])
+                todo.append(row)
+        if not todo:
+            return 0
+        vectors = self._embed([chunk for _, _, chunk in todo])
+        if vectors is None:
+            return 0
+        values = []
+        for (sid, it, chunk), vec in zip(todo, vectors):
+            tags = self._tickers(it, chunk, tickers)
+            # `ticker` keeps the first tag for older readers of the table; search filters on `tickers`
+            values.append((sid, tags[0] if tags else "", tags, it.get("title"), it.get("url") or it.get("link"), chunk,
+                           item_published_at(it), vector_literal(vec)))
+        with self._conn() as cur:
+            cur.executemany(_UPSERT, values)
+        return len(values)
+
+    def search(self, query: str, k: int = 4, tickers: Optional[List[str]] = None,
+               since: Optional[datetime] = None) -> List[Dict]:
+        q = self._embed([query])
+        if q is None:
+            return []
+        sql, params = build_search_sql(vector_literal(q[0]), k, tickers, since)
+        with self._conn() as cur:
+            # SET LOCAL only lasts for this transaction, so pooled connections stay clean
+            cur.execute("SET LOCAL hnsw.ef_search = %s", (max(self.ef_search, k),))
+            if PGVECTOR_ITERATIVE_SCAN != "off":
+                cur.execute("SET LOCAL hnsw.iterative_scan = %s", (PGVECTOR_ITERATIVE_SCAN,))
+            cur.execute(sql, params)
+            cols = [c[0] for c in cur.description]
+            hits = []
+            for row in cur.fetchall():
+                hit = dict(zip(cols, row))
+                if hit.get("published_at") is not None:
+                    hit["published_at"] = hit["published_at"].isoformat()
+                hits.append(hit)
+        return hits
+
+
+_index: Optional[PgVectorIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_pgvector_index() -> PgVectorIndex:
+    """Process-wide pgvector index (one connection pool per process); pass request tickers to add()/search()."""
+    global _index
+    with _index_lock:
+        if _index is None:
+            _index = PgVectorIndex()
+        return _index
+
+
+def recent_window(seconds: float = RETENTION_SECONDS) -> datetime:
+    """Default lower bound for `since`: the same retention window the in-process index keeps."""
+    return datetime.now(timezone.utc) - timedelta(seconds=seconds)
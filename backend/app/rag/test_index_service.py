@@ -0,0 +1,56 @@
+import pytest
+pytest.importorskip("faiss")
+import numpy as np
+from backend.app.rag.index_service import RAGIndexService
+
+def fake_embed(texts):
+    calls.append(list(texts))
+    return [np.random.default_rng(abs(hash(t)) % 2**32).random(8).tolist() for t in texts]
+
+calls = []
+
+def test_incremental_add_evict_and_reload(tmp_path):
+    calls.clear()
+    svc = RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path, retention_seconds=100)
+    assert svc.add([{"text": "AAPL beats earnings", "source": "news"}, {"text": "TSLA recall"}], now=1000) == 2
+    assert svc.add([{"text": "AAPL beats earnings"}, {"text": "MSFT guidance"}], now=1050) == 1
+    assert calls[-1] == ["MSFT guidance"]
+    assert svc.search("TSLA recall", k=1)[0]["text"] == "TSLA recall"
+    assert svc.evict_expired(now=1120) == 1  # TSLA recall last seen at t=1000
+    assert svc.save()
+    restored = RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path)
+    assert restored.load() == 2
+    hit = restored.search("AAPL beats earnings", k=1)[0]
+    assert hit["text"] == "AAPL beats earnings" and hit["source"] == "news"
+
+def test_snapshots_are_versioned_and_published_atomically(tmp_path):
+    svc = RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path)
+    svc.add([{"text": "AAPL beats earnings"}])
+    assert svc.save()
+    svc.add([{"text": "TSLA recall"}])
+    assert svc.save()
+    # A save that crashed before publishing leaves an unpublished directory that load ignores
+    (tmp_path / ".snapshot-0").mkdir()
+    (tmp_path / ".snapshot-0" / "ids.npy").write_bytes(b"partial")
+    current = (tmp_path / "CURRENT").read_text()
+    assert sorted(p.name for p in tmp_path.iterdir()) == [".snapshot-0", "CURRENT", current]
+    assert RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path).load() == 2
+
+def test_eviction_only_visits_expired_heap_entries(tmp_path):
+    svc = RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path, retention_seconds=100)
+    svc.add([{"text": "AAPL beats earnings"}, {"text": "TSLA recall"}], now=1000)
+    svc.add([{"text": "AAPL beats earnings"}], now=1090)  # seen again: its heap entry is now stale
+    assert svc.evict_expired(now=1050) == 0
+    assert svc.evict_expired(now=1150) == 1 and [e["text"] for e in svc.entries.values()] == ["AAPL beats earnings"]
+    assert len(svc._expiry) == 1 and svc._expiry[0][0] == 1090
+    assert svc.evict_expired(now=1200) == 1 and not svc.entries
+
+def test_shutdown_save_persists_unsaved_adds(tmp_path, monkeypatch):
+    from backend.app.rag import index_service
+    svc = RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path, snapshot_interval=3600)
+    monkeypatch.setattr(index_service, "_service", svc)
+    svc.add([{"text": "AAPL beats earnings"}])
+    assert not (tmp_path / "CURRENT").exists()
+    assert index_service.save_index_service()
+    assert not index_service.save_index_service()  # nothing new to write
+    assert RAGIndexService(embed_fn=fake_embed, dim=8, index_dir=tmp_path).load() == 1
@@ -0,0 +1,86 @@
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from backend.app.rag.langchain_rag import RAGPipeline
+from backend.app.rag.pgvector_retriever import PgVectorIndex, build_search_sql
+
+def test_filters_are_pushed_into_sql():
+    since = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    sql, params = build_search_sql("[1,0]", 5, ["AAPL"], since)
+    assert "tickers && %s::text[]" in sql and "COALESCE(published_at, created_at) >= %s" in sql
+    assert sql.count("%s") == len(params) and params == ["[1,0]", ["AAPL"], since, "[1,0]", 5]
+    sql, params = build_search_sql("[1,0]", 3)
+    assert "&&" not in sql and params == ["[1,0]", "[1,0]", 3]
+
+def test_pipeline_passes_filters_to_index():
+    class FakeIndex:
+        def search(self, query, k, tickers=None, since=None):
+            return [{"text": query, "tickers": tickers, "k": k}]
+
+    rag = RAGPipeline(index_service=FakeIndex(), top_k=2, filters={"tickers": ["TSLA"]})
+    assert rag.retrieve("q") == [{"text": "q", "tickers": ["TSLA"], "k": 2}]
+
+def test_add_keys_every_chunk_and_tags_with_request_tickers(monkeypatch):
+    from contextlib import contextmanager
+    from backend.app.rag import pgvector_retriever
+    written = []
+
+    class Cursor:
+        def execute(self, sql, params):
+            pass
+
+        def fetchall(self):
+            return []
+
+        def fetchone(self):
+            return (False,)
+
+        def executemany(self, sql, values):
+            written.extend(values)
+
+    @contextmanager
+    def conn():
+        yield Cursor()
+
+    index = PgVectorIndex("postgresql://unused", embed_fn=lambda texts: np.ones((len(texts), 4)), dim=4)
+    monkeypatch.setattr(index, "_conn", conn)
+    rag = RAGPipeline(index_service=index, index_args={"tickers": ["TSLA"]})
+    rag.index([{"source": "news", "url": "u1", "text": "TSLA deliveries slip"}])
+    assert [(row[0], row[1], row[2]) for row in written] == [("news:u1#0", "TSLA", ["TSLA"])]
+    written.clear()
+    rag = RAGPipeline(index_service=index, index_args={"tickers": ["AAPL", "TSLA"]})
+    rag.index([{"source": "news", "url": "u2", "text": "TSLA and AAPL both slip"}, {"source": "news", "url": "u3", "text": "Fed holds rates"}])
+    assert [(row[1], row[2]) for row in written] == [("AAPL", ["AAPL", "TSLA"]), ("", [])]
+    assert index.tickers is None
+    assert pgvector_retriever.get_pgvector_index() is pgvector_retriever.get_pgvector_index()
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="needs a local Postgres with pgvector (TEST_DATABASE_URL)")
+def test_pgvector_roundtrip():
+    import psycopg2
+    from pathlib import Path
+    dsn = os.getenv("TEST_DATABASE_URL")
+    with psycopg2.connect(dsn) as conn, conn.cursor() as cur:
+        cur.execute((Path(__file__).parents[3] / "supabase_schema.sql").read_text())
+        cur.execute("TRUNCATE nlp_results, raw_items, documents CASCADE")
+
+    def embed(texts):
+        out = np.zeros((len(texts), 384), dtype="float32")
+        for i, t in enumerate(texts):
+            out[i, 0 if "apple" in t.lower() else 1] = 1.0
+        return out
+
+    index = PgVectorIndex(dsn, embed_fn=embed, tickers=["AAPL", "TSLA"])
+    assert index.add([{"source": "news", "url": "u1", "text": "AAPL: Apple beats"},
+                      {"source": "news", "url": "u2", "text": "TSLA deliveries slip"},
+                      {"source": "news", "url": "u3", "text": "Apple and TSLA suppliers, AAPL too"}]) == 3
+    assert index.add([{"source": "news", "url": "u1", "text": "AAPL: Apple beats"}]) == 0
+    assert len(index) > 0
+    hits = index.search("apple", k=1)
+    assert hits[0]["ticker"] == "AAPL"
+    assert sorted(h["source_id"] for h in index.search("apple", k=5, tickers=["TSLA"])) == ["news:u2#0", "news:u3#0"]
+    # Untagged rows match any ticker filter
+    assert index.add([{"source": "news", "url": "u4", "text": "Fed holds rates"}]) == 1
+    assert "news:u4#0" in {h["source_id"] for h in index.search("rates", k=5, tickers=["TSLA"])}
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+from backend.app.rag.vector_store import VectorStore
+
+pytest.importorskip("faiss")
+
+def _corpus(n=2000, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.standard_normal((n, dim)).astype("float32")
+    docs = [{"text": f"doc{i}", "ticker": ["AAPL", "TSLA"][i % 2], "ts": float(i)} for i in range(n)]
+    return x, docs
+
+@pytest.mark.parametrize("index_type", ["flat", "ivfpq", "hnsw"])
+def test_add_remove_filter_and_reload(index_type, tmp_path):
+    x, docs = _corpus()
+    store = VectorStore(dim=32, index_type=index_type, nlist=16, pq_m=8, nprobe=16)
+    ids = store.add(x, docs)
+    assert ids[:2] == [0, 1] and len(store) == 2000
+
+    assert store.query(x[10], top_k=1)[0]["text"] == "doc10"
+    hits = store.query(x[10], top_k=5, tickers=["TSLA"], start=500, end=1500)
+    assert len(hits) == 5 and all(h["ticker"] == "TSLA" and 500 <= h["ts"] <= 1500 for h in hits)
+
+    assert store.remove([10, 11, 99999]) == 2
+    assert all(h["text"] != "doc10" for h in store.query(x[10], top_k=5))
+    assert all(h["text"] != "doc10" for h in store.query(x[10], top_k=5, tickers=["AAPL"]))
+    assert store.expire(before_ts=100) == 98 and len(store) == 1900
+
+    store.save(tmp_path / "store")
+    loaded = VectorStore.load(tmp_path / "store")
+    assert len(loaded) == 1900 and loaded.index_type == index_type
+    assert loaded.query(x[500], top_k=1)[0]["text"] == "doc500"
+    assert loaded.add(x[:1], [{"text": "new"}]) == [2000]
+
+def test_hnsw_rebuild_drops_tombstones():
+    x, docs = _corpus(n=500)
+    store = VectorStore(dim=32, index_type="hnsw")
+    store.add(x, docs)
+    store.remove(range(100))
+    hits = store.query(x[0], top_k=5)
+    assert len(hits) == 5 and "doc0" not in [h["text"] for h in hits]
+    store.rebuild()
+    assert not store.tombstones and store.index.ntotal == 400
+    assert store.query(x[0], top_k=1)[0]["text"] != "doc0"
+
+def test_removals_compact_metadata_in_batches():
+    x, docs = _corpus(n=3000)
+    store = VectorStore(dim=32, index_type="flat")
+    store.add(x, docs)
+    store.remove(range(1000))
+    assert store._n == 3000  # only mask bits cleared so far
+    store.remove(range(1000, 1600))
+    assert store._n == 1400 and store._dead == 0
+    hits = store.query(x[2000], top_k=3, tickers=["AAPL"], start=1500)
+    assert hits[0]["text"] == "doc2000" and all(h["ts"] >= 1600 for h in hits)
+
+def test_failed_save_keeps_the_previous_snapshot(tmp_path, monkeypatch):
+    import faiss
+    x, docs = _corpus(n=200)
+    store = VectorStore(dim=32, index_type="flat")
+    store.add(x, docs)
+    store.save(tmp_path / "store")
+    store.remove(range(100))
+
+    def crash(*a, **kw):
+        raise IOError("disk full")
+
+    monkeypatch.setattr(faiss, "write_index", crash)
+    with pytest.raises(IOError):
+        store.save(tmp_path / "store")
+    monkeypatch.undo()
+    assert len(VectorStore.load(tmp_path / "store")) == 200
+    store.save(tmp_path / "store")
+    assert len(VectorStore.load(tmp_path / "store")) == 100
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["store"]
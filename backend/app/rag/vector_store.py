@@ -1,33 +1,281 @@
 """
 Vector Store for MarketSentinel
 Stores and retrieves document embeddings using FAISS or Chroma.
+The FAISS index type is configurable: exact "flat", compressed "ivfpq" (trained on the first batch) or graph
+"hnsw". Entries carry int64 ids, so they can be removed or expired; HNSW cannot delete in place, so removed ids
+are tombstoned and dropped on rebuild(). Queries can be pre-filtered by ticker and time range: the metadata is
+kept in preallocated NumPy columns with a liveness mask, and the matching ids are passed to FAISS as an
+IDSelector. Removing clears mask bits (O(k) via an id -> row map); dead rows are compacted in one batch once they
+outnumber the live ones. Small candidate sets are scored exactly instead, since graph/IVF search over a very
+selective filter can return fewer than k hits. save() writes a sibling temp directory and swaps it in with
+renames, so a crash mid-save never leaves a mix of old and new files.
 """
+import os
+import json
+import shutil
 import logging
-from typing import List
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
 
 logger = logging.getLogger("vector_store")
 
+INDEX_TYPES = ("flat", "ivfpq", "hnsw")
+# Filters selecting at most this many entries are answered by exact scoring of the candidates
+EXACT_FILTER_THRESHOLD = 4096
+# Dead metadata rows are compacted once there are more of them than live rows (and at least this many)
+META_COMPACT_MIN = 1024
+
+
 class VectorStore:
-    def __init__(self, dim: int = 384):
+    def __init__(self, dim: int = 384, index_type: str = "flat", nlist: int = 1024, pq_m: int = 48, pq_bits: int = 8,
+                 nprobe: int = 16, hnsw_m: int = 32, ef_construction: int = 80, ef_search: int = 64,
+                 exact_filter_threshold: int = EXACT_FILTER_THRESHOLD):
+        if index_type not in INDEX_TYPES:
+            raise ValueError(f"index_type must be one of {INDEX_TYPES}, got {index_type!r}")
+        self.dim = dim
+        self.index_type = index_type
+        self.nlist = nlist
+        self.pq_m = pq_m
+        self.pq_bits = pq_bits
+        self.nprobe = nprobe
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.ef_search = ef_search
+        self.exact_filter_threshold = exact_filter_threshold
+        self.docs: Dict[int, dict] = {}
+        self.tombstones = set()
+        self._next_id = 0
+        self._tickers: Dict[str, int] = {}
+        self._reset_meta(np.zeros(0, dtype="int64"), np.zeros(0, dtype="float64"), np.zeros(0, dtype="int32"))
         try:
-            import faiss
-            self.index = faiss.IndexFlatL2(dim)
-            self.docs = []
+            self.index = self._new_index(nlist)
         except Exception as e:
             logger.error(f"Failed to initialize FAISS: {e}")
             self.index = None
-            self.docs = []
 
-    def add(self, embeddings: List[list], docs: List[dict]):
-        if not self.index:
+    def _new_index(self, nlist: int):
+        import faiss
+        if self.index_type == "flat":
+            return faiss.IndexIDMap2(faiss.IndexFlatL2(self.dim))
+        if self.index_type == "hnsw":
+            hnsw = faiss.IndexHNSWFlat(self.dim, self.hnsw_m)
+            hnsw.hnsw.efConstruction = self.ef_construction
+            return faiss.IndexIDMap2(hnsw)
+        index = faiss.IndexIVFPQ(faiss.IndexFlatL2(self.dim), self.dim, nlist, self.pq_m, self.pq_bits)
+        # Hashtable direct map: ids can be removed and reconstructed
+        index.set_direct_map_type(faiss.DirectMap.Hashtable)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # -- metadata columns -------------------------------------------------------------------------------
+
+    def _reset_meta(self, ids: np.ndarray, ts: np.ndarray, codes: np.ndarray) -> None:
+        self._ids, self._ts, self._codes = ids, ts, codes
+        self._live = np.ones(len(ids), dtype=bool)
+        self._n = len(ids)
+        self._dead = 0
+        self._rows: Dict[int, int] = dict(zip(ids.tolist(), range(len(ids))))
+
+    def _meta(self):
+        """(ids, ts, ticker codes, live mask) views over the used rows."""
+        n = self._n
+        return self._ids[:n], self._ts[:n], self._codes[:n], self._live[:n]
+
+    def _append_meta(self, ids: Iterable[int], docs: List[dict]) -> None:
+        ids = [int(i) for i in ids]
+        n, k = self._n, len(ids)
+        if n + k > len(self._ids):
+            # Grow geometrically so appends are amortized O(1) per row
+            cap = max(2 * len(self._ids), n + k, 1024)
+            self._ids, self._ts, self._codes, self._live = (
+                np.concatenate([col[:n], np.zeros(cap - n, dtype=col.dtype)])
+                for col in (self._ids, self._ts, self._codes, self._live))
+        codes = [self._tickers.setdefault(d["ticker"], len(self._tickers)) if d.get("ticker") else -1 for d in docs]
+        self._ids[n:n + k] = ids
+        self._ts[n:n + k] = [float(d.get("ts") or d.get("timestamp") or 0.0) for d in docs]
+        self._codes[n:n + k] = codes
+        self._live[n:n + k] = True
+        self._rows.update(zip(ids, range(n, n + k)))
+        self._n = n + k
+
+    def _drop_meta(self, ids: Iterable[int]) -> None:
+        for i in ids:
+            row = self._rows.pop(i, None)
+            if row is not None:
+                self._live[row] = False
+                self._dead += 1
+        if self._dead >= max(META_COMPACT_MIN, self._n - self._dead):
+            self._compact_meta()
+
+    def _compact_meta(self) -> None:
+        ids, ts, codes, live = self._meta()
+        self._reset_meta(ids[live], ts[live], codes[live])
+
+    def _candidates(self, tickers: Optional[List[str]], start: Optional[float], end: Optional[float]) -> np.ndarray:
+        ids, ts, codes, live = self._meta()
+        mask = live.copy()
+        if tickers is not None:
+            mask &= np.isin(codes, [self._tickers[t] for t in tickers if t in self._tickers])
+        if start is not None:
+            mask &= ts >= start
+        if end is not None:
+            mask &= ts <= end
+        return ids[mask]
+
+    # -- writes -----------------------------------------------------------------------------------------
+
+    def train(self, embeddings) -> None:
+        """Trains the IVF-PQ coarse quantizer and codebooks; add() does this on the first batch if needed."""
+        x = np.ascontiguousarray(embeddings, dtype="float32")
+        nlist = min(self.nlist, max(1, len(x) // 39))
+        if nlist != self.index.nlist:
+            logger.warning(f"Only {len(x)} training vectors; using nlist={nlist} instead of {self.nlist}")
+            self.index = self._new_index(nlist)
+        self.index.train(x)
+
+    def add(self, embeddings: List[list], docs: List[dict], ids: Optional[List[int]] = None) -> List[int]:
+        """Adds vectors with their docs (optional "ticker" and "ts" metadata); returns the assigned ids."""
+        if self.index is None or not len(docs):
+            return []
+        x = np.ascontiguousarray(embeddings, dtype="float32").reshape(len(docs), self.dim)
+        if ids is None:
+            ids = list(range(self._next_id, self._next_id + len(docs)))
+        ids_arr = np.asarray(ids, dtype="int64")
+        self._next_id = max(self._next_id, int(ids_arr.max()) + 1)
+        if not self.index.is_trained:
+            self.train(x)
+        self.index.add_with_ids(x, ids_arr)
+        for i, doc in zip(ids, docs):
+            self.docs[int(i)] = doc
+        self._append_meta(ids, docs)
+        return [int(i) for i in ids]
+
+    def remove(self, ids: Iterable[int]) -> int:
+        """Removes entries by id. HNSW entries are tombstoned until rebuild()."""
+        if self.index is None:
+            return 0
+        ids = {int(i) for i in ids if int(i) in self.docs}
+        if not ids:
+            return 0
+        if self.index_type == "hnsw":
+            self.tombstones |= ids
+        else:
+            import faiss
+            # IDSelectorArray: the only selector an IVF hashtable direct map accepts for removal
+            arr = np.fromiter(ids, dtype="int64")
+            self.index.remove_ids(faiss.IDSelectorArray(len(arr), faiss.swig_ptr(arr)))
+        self._drop_meta(ids)
+        for i in ids:
+            del self.docs[i]
+        return len(ids)
+
+    def expire(self, before_ts: float) -> int:
+        """Removes entries whose ts is older than before_ts."""
+        ids, ts, _, live = self._meta()
+        return self.remove(ids[live & (ts < before_ts)].tolist())
+
+    def rebuild(self) -> None:
+        """Rebuilds the HNSW graph from the live entries, reclaiming tombstoned slots. Flat and IVF-PQ indexes
+        remove in place, so there is nothing to reclaim (and retraining IVF-PQ on its own lossy reconstructions
+        would only degrade the codebooks)."""
+        if self.index is None or self.index_type != "hnsw" or not self.tombstones:
             return
-        import numpy as np
-        self.index.add(np.array(embeddings).astype('float32'))
-        self.docs.extend(docs)
+        live = np.asarray(sorted(self.docs), dtype="int64")
+        vectors = self.index.reconstruct_batch(live) if len(live) else np.zeros((0, self.dim), dtype="float32")
+        self._compact_meta()
+        self.tombstones = set()
+        self.index = self._new_index(self.nlist)
+        if len(live):
+            self.index.add_with_ids(vectors, live)
 
-    def query(self, embedding: list, top_k: int = 3) -> List[dict]:
-        if not self.index or not self.docs:
+    # -- reads ------------------------------------------------------------------------------------------
+
+    def _search_params(self, selector):
+        import faiss
+        if self.index_type == "hnsw":
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.ef_search)
+        if self.index_type == "ivfpq":
+            return faiss.SearchParametersIVF(sel=selector, nprobe=self.nprobe)
+        return faiss.SearchParameters(sel=selector)
+
+    def search(self, embedding: list, top_k: int = 3, tickers: Optional[List[str]] = None,
+               start: Optional[float] = None, end: Optional[float] = None) -> List[dict]:
+        """Nearest docs as copies with an added squared-L2 "distance", pre-filtered by ticker and ts range."""
+        if self.index is None or not self.docs:
             return []
-        import numpy as np
-        D, I = self.index.search(np.array([embedding]).astype('float32'), top_k)
-        return [self.docs[i] for i in I[0] if i < len(self.docs)]
+        import faiss
+        q = np.ascontiguousarray(embedding, dtype="float32").reshape(1, self.dim)
+        filtered = tickers is not None or start is not None or end is not None
+        selector = None
+        if filtered:
+            candidates = self._candidates(tickers, start, end)
+            if not len(candidates):
+                return []
+            if len(candidates) <= self.exact_filter_threshold:
+                vectors = self.index.reconstruct_batch(candidates)
+                dist = ((vectors - q) ** 2).sum(axis=1)
+                order = np.argsort(dist)[:top_k]
+                return [{**self.docs[int(candidates[o])], "distance": float(dist[o])} for o in order]
+            selector = faiss.IDSelectorBatch(candidates)
+        elif self.tombstones:
+            # Unfiltered: exclude the tombstones rather than enumerating every live id
+            dead = faiss.IDSelectorBatch(np.fromiter(self.tombstones, dtype="int64"))
+            selector = faiss.IDSelectorNot(dead)
+        D, I = self.index.search(q, top_k, params=self._search_params(selector))
+        return [{**self.docs[int(i)], "distance": float(d)} for d, i in zip(D[0], I[0]) if int(i) in self.docs]
+
+    def query(self, embedding: list, top_k: int = 3, **filters) -> List[dict]:
+        return [{k: v for k, v in hit.items() if k != "distance"} for hit in self.search(embedding, top_k, **filters)]
+
+    # -- persistence ------------------------------------------------------------------------------------
+
+    def save(self, path) -> None:
+        """Writes the FAISS index, metadata columns and docs under `path` (a directory), replacing it whole."""
+        import faiss
+        path = Path(path)
+        tmp, old = path.with_name(path.name + ".tmp"), path.with_name(path.name + ".old")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        faiss.write_index(self.index, str(tmp / "index.faiss"))
+        ids, ts, codes, live = self._meta()
+        np.savez(tmp / "meta.npz", ids=ids[live], ts=ts[live], ticker=codes[live],
+                 tombstones=np.fromiter(self.tombstones, dtype="int64"))
+        config = {k: getattr(self, k) for k in ("dim", "index_type", "nlist", "pq_m", "pq_bits", "nprobe", "hnsw_m",
+                                                 "ef_construction", "ef_search", "exact_filter_threshold")}
+        with open(tmp / "store.json", "w") as f:
+            json.dump({"config": config, "next_id": self._next_id, "tickers": self._tickers}, f)
+        with open(tmp / "docs.jsonl", "w") as f:
+            for i, doc in self.docs.items():
+                f.write(json.dumps({"id": i, "doc": doc}, default=str) + "\n")
+        # A directory cannot be replaced in one rename: move the old one aside first; load() falls back to it
+        # if the process dies between the two renames
+        if path.exists():
+            shutil.rmtree(old, ignore_errors=True)
+            os.replace(path, old)
+        os.replace(tmp, path)
+        shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(cls, path) -> "VectorStore":
+        import faiss
+        path = Path(path)
+        if not path.exists() and path.with_name(path.name + ".old").exists():
+            path = path.with_name(path.name + ".old")
+        with open(path / "store.json") as f:
+            state = json.load(f)
+        store = cls(**state["config"])
+        store.index = faiss.read_index(str(path / "index.faiss"))
+        store._next_id = state["next_id"]
+        store._tickers = state["tickers"]
+        meta = np.load(path / "meta.npz")
+        store._reset_meta(meta["ids"].astype("int64"), meta["ts"].astype("float64"), meta["ticker"].astype("int32"))
+        store.tombstones = set(meta["tombstones"].tolist())
+        with open(path / "docs.jsonl") as f:
+            for line in f:
+                row = json.loads(line)
+                store.docs[row["id"]] = row["doc"]
+        return store
@@ -0,0 +1,53 @@
+"""
+Cleaner Benchmark for MarketSentinel
+Measures DataCleaner throughput (items/sec, and per core) single-process and on a process pool.
+
+    python -m backend.app.scripts.bench_cleaner --items 500000 --workers 1 2 4
+"""
+import os
+import time
+import random
+import argparse
+
+from backend.app.preproc.cleaner import DataCleaner
+from backend.app.scripts.bench_sentiment import synthetic_posts
+
+
+def synthetic_items(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    items = []
+    for i, text in enumerate(synthetic_posts(n, seed)):
+        # Sprinkle in the things the cleaner rewrites
+        if i % 7 == 0:
+            text += f"  dm me at user{i}@example.com"
+        if i % 11 == 0:
+            text += f" from 10.0.{rng.randint(0, 255)}.{rng.randint(0, 255)}"
+        if i % 13 == 0:
+            text = "shit " + text
+        items.append({"source": "bench", "text": "  " + text + "\n"})
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=200000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+    items = synthetic_items(args.items)
+    cleaner = DataCleaner()
+    start = time.perf_counter()
+    for _ in cleaner.iter_clean(items):
+        pass
+    rate = len(items) / (time.perf_counter() - start)
+    print(f"in-process: {rate:10.1f} items/sec")
+    for workers in args.workers:
+        start = time.perf_counter()
+        for _ in cleaner.iter_clean_parallel(items, workers=workers, chunk_size=args.chunk_size):
+            pass
+        rate = len(items) / (time.perf_counter() - start)
+        print(f"pool x{workers:<3}: {rate:10.1f} items/sec ({rate / workers:8.1f} per core)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Order Book Simulator Benchmark for MarketSentinel
+Replays a synthetic L2 stream (depth updates around a random-walk mid, ~20% trades at the touch) through the
+market-making simulator and reports events/sec. The first call includes numba compilation, so it is timed separately.
+
+    python -m backend.app.scripts.bench_lob --events 20000000 --latency 50
+"""
+import time
+import argparse
+
+import numpy as np
+
+from backend.app.hft.lob_sim import simulate_market_making
+
+
+def synthetic_events(n: int, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    mid = 10000 + np.cumsum(rng.choice(np.array([-1, 0, 0, 0, 0, 0, 0, 0, 0, 1]), n))
+    side = rng.choice(np.array([1, -1], dtype=np.int8), n)
+    kind = (rng.random(n) < 0.2).astype(np.int8)
+    level = rng.geometric(0.4, n) - 1
+    depth_price = np.where(side > 0, mid - level, mid + 1 + level)
+    # Trades: a buy aggressor lifts the ask (mid + 1), a sell aggressor hits the bid (mid)
+    trade_price = np.where(side > 0, mid + 1, mid)
+    return {
+        "ts": np.cumsum(rng.integers(1, 20, n)).astype(np.int64),
+        "kind": kind,
+        "side": side,
+        "price": np.where(kind == 1, trade_price, depth_price).astype(np.int64),
+        "qty": np.where(kind == 1, rng.integers(1, 5, n), rng.integers(0, 50, n)).astype(np.float64),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--events", type=int, default=10_000_000)
+    parser.add_argument("--latency", type=int, default=50)
+    parser.add_argument("--half-spread", type=float, default=1.0)
+    parser.add_argument("--skew", type=float, default=0.05)
+    args = parser.parse_args()
+    events = synthetic_events(args.events)
+    params = {"half_spread": args.half_spread, "skew": args.skew, "latency": args.latency, "max_position": 20}
+    start = time.perf_counter()
+    simulate_market_making({k: v[:1000] for k, v in events.items()}, **params)
+    print(f"warm-up (includes compilation): {time.perf_counter() - start:.2f}s")
+    start = time.perf_counter()
+    result = simulate_market_making(events, **params)
+    elapsed = time.perf_counter() - start
+    print(f"replayed {args.events} events in {elapsed:.2f}s ({args.events / elapsed / 1e6:.1f}M events/sec)")
+    print({k: v for k, v in result.items() if k != "trades"})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Sentiment Benchmark for MarketSentinel
+Measures lexicon and FinBERT throughput (items/sec, per backend) on synthetic posts and compares FinBERT to the target.
+
+    python -m backend.app.scripts.bench_sentiment --backends torch int8 --items 2000 --threads 4
+"""
+import time
+import random
+import argparse
+
+from backend.app.nlp.finbert import FinBERTScorer, FINBERT_TARGET_ITEMS_PER_SEC
+from backend.app.nlp.lexicon import LexiconScorer
+
+WORDS = ("stock earnings beat miss guidance moon dump bullish bearish revenue growth shares rally crash "
+         "upgrade downgrade buyback dividend lawsuit recall margin outlook strong weak record loss").split()
+
+
+def synthetic_posts(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    # Mostly short social posts with a tail of longer news summaries
+    return [" ".join(rng.choice(WORDS) for _ in range(rng.choice([8, 12, 20, 30, 60, 120]))) for _ in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8"])
+    parser.add_argument("--items", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--target", type=float, default=FINBERT_TARGET_ITEMS_PER_SEC)
+    args = parser.parse_args()
+    posts = synthetic_posts(args.items)
+    lexicon_posts = synthetic_posts(50000, seed=1)
+    start = time.perf_counter()
+    LexiconScorer().score(lexicon_posts)
+    print(f"lexicon: {len(lexicon_posts) / (time.perf_counter() - start):8.1f} items/sec")
+    for backend in args.backends:
+        scorer = FinBERTScorer(backend=backend, num_threads=args.threads)
+        scorer.score(posts[:16])  # load + warm up
+        start = time.perf_counter()
+        scores = scorer.score(posts)
+        elapsed = time.perf_counter() - start
+        if scores and scores[0] is None:
+            print(f"{backend:>6}: model unavailable")
+            continue
+        ips = len(posts) / elapsed
+        status = "OK" if ips >= args.target else "BELOW TARGET"
+        print(f"{backend:>6}: {ips:8.1f} items/sec ({elapsed:.2f}s for {len(posts)}) target {args.target:.0f} -> {status}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Sweep Benchmark for MarketSentinel
+Runs a parameter grid over synthetic minute bars and per-bar component scores, and reports combinations/sec
+per pool size so the scaling with cores can be checked.
+
+    python -m backend.app.scripts.bench_sweep --bars 20000 --tickers 100 --workers 1 2 4 8
+"""
+import os
+import time
+import argparse
+
+import numpy as np
+
+from backend.app.backtest.sweep import SweepRunner, param_grid
+from backend.app.scripts.bench_backtest import synthetic_market
+
+
+def synthetic_grid(n_weights: int, n_thresholds: int, n_holds: int):
+    rng = np.random.default_rng(0)
+    weights = rng.dirichlet(np.ones(3), n_weights).round(3).tolist()
+    thresholds = [(0.5 + d, 0.5 - d) for d in np.linspace(0.02, 0.2, n_thresholds).round(3).tolist()]
+    holds = np.unique(np.geomspace(1, 390, n_holds).astype(int)).tolist()
+    return param_grid([tuple(w) for w in weights], thresholds, holds)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bars", type=int, default=20000)
+    parser.add_argument("--tickers", type=int, default=100)
+    parser.add_argument("--grid", type=int, nargs=3, default=[20, 25, 20], metavar=("WEIGHTS", "THRESHOLDS", "HOLDS"))
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    args = parser.parse_args()
+    close, _ = synthetic_market(args.bars, args.tickers)
+    rng = np.random.default_rng(1)
+    components = rng.beta(2, 2, (3, args.bars, args.tickers)).astype("float32")
+    components[:, rng.random(args.bars) < 0.7] = np.nan  # most bars carry no new evidence
+    grid = synthetic_grid(*args.grid)
+    print(f"{len(grid)} combinations over {args.bars} bars x {args.tickers} tickers")
+    for workers in args.workers:
+        start = time.perf_counter()
+        results = SweepRunner(close, components, workers=workers).run(grid)
+        rate = len(grid) / (time.perf_counter() - start)
+        best = max(results, key=lambda r: r["metrics"]["sharpe"])
+        print(f"workers x{workers:<3}: {rate:8.1f} combos/sec ({rate / workers:6.1f} per core); best {best['params']}")
+
+
+if __name__ == "__main__":
+    main()
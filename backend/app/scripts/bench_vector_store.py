@@ -0,0 +1,94 @@
+"""
+Vector Store Benchmark for MarketSentinel
+Recall@k vs query latency for the VectorStore index types on a synthetic clustered corpus (MiniLM-sized, 384
+dims, unit-normalized). Ground truth is an exact flat search. Each index is swept over its search-time knob
+(nprobe for IVF-PQ, efSearch for HNSW); a filtered run (one ticker, recent half) is reported for each setting too.
+
+    python -m backend.app.scripts.bench_vector_store --n 1000000 --queries 200
+"""
+import time
+import argparse
+
+import numpy as np
+
+from backend.app.rag.vector_store import VectorStore
+
+TICKERS = ["AAPL", "TSLA", "NVDA", "AMZN", "MSFT", "GME", "AMC", "META"]
+
+
+def synthetic_corpus(n: int, dim: int, clusters: int = 1000, noise: float = 1.0, seed: int = 0):
+    """Gaussian blobs around random centers, normalized like sentence embeddings."""
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((clusters, dim)).astype("float32")
+    x = np.empty((n, dim), dtype="float32")
+    step = 100000
+    for lo in range(0, n, step):
+        hi = min(n, lo + step)
+        x[lo:hi] = centers[rng.integers(0, clusters, hi - lo)] + noise * rng.standard_normal((hi - lo, dim)).astype("float32")
+    x /= np.linalg.norm(x, axis=1, keepdims=True)
+    docs = [{"ticker": TICKERS[i % len(TICKERS)], "ts": float(i)} for i in range(n)]
+    return x, docs
+
+
+def ground_truth(x: np.ndarray, q: np.ndarray, k: int, mask=None) -> np.ndarray:
+    import faiss
+    ids = np.arange(len(x)) if mask is None else np.flatnonzero(mask)
+    flat = faiss.IndexFlatL2(x.shape[1])
+    flat.add(x[ids])
+    _, I = flat.search(q, k)
+    return ids[I]
+
+
+def run(store: VectorStore, q: np.ndarray, truth: np.ndarray, k: int, **filters):
+    latencies, recalls = [], []
+    for qi, t in zip(q, truth):
+        start = time.perf_counter()
+        hits = store.search(qi, top_k=k, **filters)
+        latencies.append(time.perf_counter() - start)
+        found = {int(h["id"]) for h in hits}
+        recalls.append(len(found & set(t.tolist())) / k)
+    lat = np.asarray(latencies) * 1000
+    return float(np.mean(recalls)), float(np.percentile(lat, 50)), float(np.percentile(lat, 99))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1000000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--types", nargs="+", default=["flat", "ivfpq", "hnsw"])
+    parser.add_argument("--pq-m", type=int, help="PQ sub-quantizers (must divide --dim); default dim // 8")
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 16, 64])
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[16, 32, 64, 128, 256])
+    args = parser.parse_args()
+
+    x, docs = synthetic_corpus(args.n + args.queries, args.dim)
+    x, q, docs = x[:args.n], x[args.n:], docs[:args.n]
+    for i, doc in enumerate(docs):
+        doc["id"] = i
+    truth = ground_truth(x, q, args.k)
+    ts = np.arange(args.n, dtype="float64")
+    codes = np.arange(args.n) % len(TICKERS)
+    filters = {"tickers": [TICKERS[0]], "start": float(args.n // 2)}
+    truth_filtered = ground_truth(x, q, args.k, (codes == 0) & (ts >= filters["start"]))
+
+    for index_type in args.types:
+        store = VectorStore(dim=args.dim, index_type=index_type, nlist=int(4 * np.sqrt(args.n)),
+                            pq_m=args.pq_m or args.dim // 8)
+        start = time.perf_counter()
+        store.add(x, docs)
+        print(f"{index_type}: built {args.n} vectors in {time.perf_counter() - start:.1f}s")
+        knob, values = {"ivfpq": ("nprobe", args.nprobe), "hnsw": ("ef_search", args.ef_search)}.get(index_type, (None, [None]))
+        for value in values:
+            if knob:
+                setattr(store, knob, value)
+            label = f"{knob}={value}" if knob else "exact"
+            recall, p50, p99 = run(store, q, truth, args.k)
+            f_recall, f_p50, f_p99 = run(store, q, truth_filtered, args.k, **filters)
+            print(f"  {label:<14} recall@{args.k} {recall:.3f}  p50 {p50:7.2f}ms  p99 {p99:7.2f}ms"
+                  f"  | filtered recall {f_recall:.3f}  p50 {f_p50:7.2f}ms  p99 {f_p99:7.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
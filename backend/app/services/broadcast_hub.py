@@ -0,0 +1,97 @@
+"""
+Broadcast Hub for MarketSentinel
+Runs a single background producer per process and fans each tick's payloads out to every WebSocket subscriber.
+Each subscriber gets a small bounded send queue; when a client falls behind, its oldest payloads are dropped,
+and a client that stays behind for too many ticks is disconnected instead of slowing everyone else down.
+"""
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Set
+
+logger = logging.getLogger("broadcast_hub")
+
+# Producer receives the set of topics with live subscribers and returns {topic: payload}
+Producer = Callable[[Set[str]], Awaitable[Dict[str, Any]]]
+
+
+class Subscription:
+    def __init__(self, topic: str, queue_size: int):
+        self.topic = topic
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.lagged_ticks = 0
+        self.closed = False
+
+    async def get(self) -> Optional[Any]:
+        """Next payload for this subscriber, or None once the hub has dropped it."""
+        return await self.queue.get()
+
+
+class BroadcastHub:
+    def __init__(self, producer: Producer, interval: float = 15.0, queue_size: int = 4, max_lagged_ticks: int = 3):
+        self.producer = producer
+        self.interval = interval
+        self.queue_size = queue_size
+        self.max_lagged_ticks = max_lagged_ticks
+        self.subscribers: Dict[str, Set[Subscription]] = {}
+        self.latest: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def active_topics(self) -> Set[str]:
+        return {topic for topic, subs in self.subscribers.items() if subs}
+
+    def subscribe(self, topic: str) -> Subscription:
+        """Registers a subscriber and starts the producer if it is not already running."""
+        sub = Subscription(topic, self.queue_size)
+        self.subscribers.setdefault(topic, set()).add(sub)
+        # Late joiners get the last payload right away instead of waiting for the next tick
+        if topic in self.latest:
+            sub.queue.put_nowait(self.latest[topic])
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        self.subscribers.get(sub.topic, set()).discard(sub)
+        sub.closed = True
+        if not self.active_topics() and self._task is not None:
+            # Nobody is listening; stop scraping until the next subscriber arrives
+            self._task.cancel()
+            self._task = None
+
+    def publish(self, topic: str, payload: Any) -> None:
+        self.latest[topic] = payload
+        for sub in list(self.subscribers.get(topic, ())):
+            if sub.queue.full():
+                sub.lagged_ticks += 1
+                if sub.lagged_ticks > self.max_lagged_ticks:
+                    logger.warning(f"Dropping slow {topic} subscriber after {sub.lagged_ticks} lagged ticks")
+                    self._evict(sub)
+                    continue
+                # Keep the freshest data: discard the oldest queued payload
+                sub.queue.get_nowait()
+            else:
+                sub.lagged_ticks = 0
+            sub.queue.put_nowait(payload)
+
+    def _evict(self, sub: Subscription) -> None:
+        self.subscribers.get(sub.topic, set()).discard(sub)
+        sub.closed = True
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    async def tick(self) -> None:
+        """Runs the producer once and publishes its payloads."""
+        payloads = await self.producer(self.active_topics())
+        for topic, payload in (payloads or {}).items():
+            self.publish(topic, payload)
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Broadcast producer failed: {e}")
+            await asyncio.sleep(self.interval)
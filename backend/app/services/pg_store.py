@@ -0,0 +1,181 @@
+"""
+Postgres persistence for MarketSentinel
+Direct asyncpg writes of cleaned items and NLP results into raw_items, documents and nlp_results.
+A cycle's rows are COPY'd into a temporary staging table in one statement and fanned out with set-based
+INSERT ... SELECT ... ON CONFLICT DO NOTHING, so re-ingested items (same source_id) are skipped.
+documents.embedding is only written for items that already carry an "embedding"; the API does not embed at
+ingest time, so those rows stay NULL (the pgvector retriever stores its own per-chunk rows).
+Sync endpoints run each request under its own asyncio.run loop, so the store owns one long-lived loop on a
+daemon thread and a single pool bound to it; persist() hands its writes to that loop from any caller.
+Enabled when DATABASE_URL is set.
+"""
+import os
+import json
+import hashlib
+import logging
+import asyncio
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from backend.app.nlp.ticker_matcher import get_ticker_matcher
+
+logger = logging.getLogger("pg_store")
+
+DATABASE_URL = os.getenv("DATABASE_URL")
+PG_POOL_MIN = int(os.getenv("PG_POOL_MIN", "1"))
+PG_POOL_MAX = int(os.getenv("PG_POOL_MAX", "5"))
+
+_STAGE_COLUMNS = [
+    "source", "source_id", "raw_json", "ticker", "ticker_candidates", "title", "url", "text", "published_at",
+    "embedding", "sentiment_score", "confidence", "llm_response",
+]
+_CREATE_STAGE = """
+CREATE TEMP TABLE pg_store_stage (
+    source TEXT, source_id TEXT, raw_json JSONB, ticker TEXT, ticker_candidates TEXT[], title TEXT, url TEXT,
+    text TEXT, published_at TIMESTAMPTZ, embedding TEXT, sentiment_score FLOAT8, confidence FLOAT8, llm_response JSONB
+) ON COMMIT DROP
+"""
+# raw_items first; NLP results are only written for items that were actually new
+_INSERT_RAW_AND_NLP = """
+WITH inserted AS (
+    INSERT INTO raw_items (source, source_id, raw_json)
+    SELECT DISTINCT ON (source_id) source, source_id, raw_json FROM pg_store_stage
+    ON CONFLICT (source_id) DO NOTHING
+    RETURNING id, source_id
+)
+INSERT INTO nlp_results (item_id, ticker_candidates, sentiment_score, confidence, llm_response)
+SELECT DISTINCT ON (i.source_id) i.id, s.ticker_candidates, s.sentiment_score, s.confidence, s.llm_response
+FROM inserted i JOIN pg_store_stage s ON s.source_id = i.source_id
+"""
+_INSERT_DOCUMENTS = """
+INSERT INTO documents (source_id, ticker, tickers, title, url, text, published_at, embedding)
+SELECT DISTINCT ON (source_id) source_id, ticker, ticker_candidates, title, url, text, published_at, embedding::vector
+FROM pg_store_stage WHERE ticker IS NOT NULL
+ON CONFLICT (source_id) DO NOTHING
+"""
+
+
+# Native id fields per source, most specific first. On 4chan "id" is the poster's per-thread hash, not the post.
+_SOURCE_ID_KEYS = {"4chan": ("source_id", "no", "url")}
+_DEFAULT_ID_KEYS = ("source_id", "id", "no", "url", "ts")
+
+
+def source_id_for(item: Dict) -> str:
+    """Stable id of an item within its source: native id/post number/url when present, else a text hash."""
+    source = item.get("source", "unknown")
+    for key in _SOURCE_ID_KEYS.get(source, _DEFAULT_ID_KEYS):
+        value = item.get(key)
+        if value:
+            native = f"{item.get('thread')}/{value}" if key == "no" and item.get("thread") else value
+            return f"{source}:{native}"
+    return f"{source}:{hashlib.sha1(item.get('text', '').encode('utf-8')).hexdigest()}"
+
+
+def vector_literal(vec) -> Optional[str]:
+    if vec is None or len(vec) == 0:
+        return None
+    return "[" + ",".join(f"{float(x):.7g}" for x in vec) + "]"
+
+
+def item_published_at(item: Dict) -> Optional[datetime]:
+    ts = item.get("published_ts") or item.get("created_utc") or item.get("time")
+    try:
+        return datetime.fromtimestamp(float(ts), tz=timezone.utc) if ts else None
+    except (TypeError, ValueError):
+        return None
+
+
+def to_stage_records(items: Iterable[Dict], tickers: Optional[List[str]] = None) -> List[tuple]:
+    """Maps analyzed items to staging rows (one tuple per item, in _STAGE_COLUMNS order)."""
+    matcher = get_ticker_matcher(tickers) if tickers else None
+    records = []
+    for item in items:
+        text = item.get("text", "")
+        candidates = sorted(matcher.find(text)) if matcher else list(item.get("tickers") or [])
+        raw = {k: v for k, v in item.items() if k != "embedding"}
+        breakdown = item.get("sentiment_breakdown")
+        records.append((
+            item.get("source", "unknown"),
+            source_id_for(item),
+            json.dumps(raw, default=str),
+            candidates[0] if candidates else None,
+            candidates,
+            item.get("title"),
+            item.get("url"),
+            text,
+            item_published_at(item),
+            vector_literal(item.get("embedding")),
+            item.get("sentiment"),
+            item.get("confidence"),
+            json.dumps(breakdown) if breakdown is not None else None,
+        ))
+    return records
+
+
+class PgStore:
+    def __init__(self, dsn: Optional[str] = DATABASE_URL, min_size: int = PG_POOL_MIN, max_size: int = PG_POOL_MAX):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self._pool = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.dsn)
+
+    def _store_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="pg-store", daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    async def _on_store_loop(self, coro):
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, self._store_loop()))
+
+    async def _get_pool(self):
+        # Only ever runs on the store loop, so no lock is needed around the lazy create
+        if self._pool is None:
+            import asyncpg
+            self._pool = await asyncpg.create_pool(self.dsn, min_size=self.min_size, max_size=self.max_size)
+        return self._pool
+
+    async def _close_pool(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await pool.close()
+
+    async def close(self) -> None:
+        if self._loop is not None:
+            await self._on_store_loop(self._close_pool())
+
+    async def persist(self, items: List[Dict], tickers: Optional[List[str]] = None) -> int:
+        """Persists one cycle of analyzed items in a single transaction; returns the number of rows staged."""
+        records = to_stage_records(items, tickers)
+        if not records:
+            return 0
+        await self._on_store_loop(self._copy(records))
+        return len(records)
+
+    async def _copy(self, records: List[tuple]) -> None:
+        pool = await self._get_pool()
+        async with pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(_CREATE_STAGE)
+                await conn.copy_records_to_table("pg_store_stage", records=records, columns=_STAGE_COLUMNS)
+                await conn.execute(_INSERT_RAW_AND_NLP)
+                await conn.execute(_INSERT_DOCUMENTS)
+
+
+_store: Optional[PgStore] = None
+
+
+def get_pg_store() -> PgStore:
+    global _store
+    if _store is None:
+        _store = PgStore()
+    return _store
@@ -0,0 +1,193 @@
+"""
+Streaming Signal Aggregator for MarketSentinel
+Folds newly scored items into per-ticker state instead of re-averaging every item on each refresh. Per ticker
+it keeps a sliding window (heap plus running sum/count), a time-decayed EWMA and a faster EWMA whose gap to
+the slow one is the momentum. Each update is O(log n) per (item, ticker) and reading a signal is O(1),
+so refresh cost follows the number of new items, not the window size. Items are placed at their own publish
+time (fold time if they carry none), and items already older than the window are skipped. An item's source_id
+is remembered until its timestamp leaves the window, so full re-fetches (non-incremental ingestion) of the
+same feed are never double counted. Items arrive out of publish order, so the window and seen ids are heaps.
+Signal ids are uuid5 of the ticker, so a ticker's signal keeps its id across refreshes.
+"""
+import os
+import math
+import time
+import heapq
+import itertools
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from backend.app.nlp.ticker_matcher import get_ticker_matcher
+from backend.app.services.pg_store import item_published_at, source_id_for
+
+SIGNAL_WINDOW_SECONDS = float(os.getenv("SIGNAL_WINDOW_SECONDS", str(6 * 3600)))
+SIGNAL_EWMA_HALFLIFE = float(os.getenv("SIGNAL_EWMA_HALFLIFE", "3600"))
+# The fast EWMA (momentum) uses halflife / SIGNAL_MOMENTUM_RATIO
+SIGNAL_MOMENTUM_RATIO = float(os.getenv("SIGNAL_MOMENTUM_RATIO", "4"))
+# Mean sentiment above/below which a ticker is bullish/bearish (tune with backtest/sweep.py)
+BULLISH_THRESHOLD = float(os.getenv("SIGNAL_BULLISH_THRESHOLD", "0.6"))
+BEARISH_THRESHOLD = float(os.getenv("SIGNAL_BEARISH_THRESHOLD", "0.4"))
+NEUTRAL = 0.5
+SIGNAL_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "marketsentinel/signals")
+
+
+def signal_id(ticker: str) -> str:
+    return str(uuid.uuid5(SIGNAL_NAMESPACE, ticker))
+
+
+class _Ewma:
+    """Irregularly sampled EWMA: sum and weight decay by 0.5 ** (dt / halflife); the mean is their ratio.
+    A sample older than the latest one enters already decayed."""
+    __slots__ = ("halflife", "sum", "weight", "ts")
+
+    def __init__(self, halflife: float):
+        self.halflife = halflife
+        self.sum = 0.0
+        self.weight = 0.0
+        self.ts = None
+
+    def update(self, value: float, ts: float) -> None:
+        weight = 1.0
+        if self.ts is not None and ts > self.ts:
+            decay = math.pow(0.5, (ts - self.ts) / self.halflife)
+            self.sum *= decay
+            self.weight *= decay
+        elif self.ts is not None:
+            weight = math.pow(0.5, (self.ts - ts) / self.halflife)
+        self.ts = ts if self.ts is None else max(ts, self.ts)
+        self.sum += value * weight
+        self.weight += weight
+
+    @property
+    def value(self) -> Optional[float]:
+        return self.sum / self.weight if self.weight > 0 else None
+
+
+class TickerState:
+    __slots__ = ("window", "window_sum", "total", "slow", "fast")
+
+    def __init__(self, halflife: float, fast_halflife: float):
+        self.window = []  # min-heap of (ts, seq, score)
+        self.window_sum = 0.0
+        self.total = 0
+        self.slow = _Ewma(halflife)
+        self.fast = _Ewma(fast_halflife)
+
+    def add(self, score: float, ts: float, seq: int) -> None:
+        heapq.heappush(self.window, (ts, seq, score))
+        self.window_sum += score
+        self.total += 1
+        self.slow.update(score, ts)
+        self.fast.update(score, ts)
+
+    def expire(self, cutoff: float) -> None:
+        window = self.window
+        while window and window[0][0] < cutoff:
+            self.window_sum -= heapq.heappop(window)[2]
+        if not window:
+            self.window_sum = 0.0  # drop accumulated float error
+
+
+class SignalAggregator:
+    def __init__(self, window_seconds: float = SIGNAL_WINDOW_SECONDS, halflife: float = SIGNAL_EWMA_HALFLIFE,
+                 momentum_ratio: float = SIGNAL_MOMENTUM_RATIO, bullish: float = BULLISH_THRESHOLD,
+                 bearish: float = BEARISH_THRESHOLD):
+        self.window_seconds = window_seconds
+        self.halflife = halflife
+        self.fast_halflife = halflife / momentum_ratio
+        self.bullish = bullish
+        self.bearish = bearish
+        self._states: Dict[str, TickerState] = {}
+        self._seen: Dict[str, float] = {}
+        self._seen_heap: List[tuple] = []  # (ts, source_id), so ids expire with their item
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+
+    def _state(self, ticker: str) -> TickerState:
+        state = self._states.get(ticker)
+        if state is None:
+            state = self._states[ticker] = TickerState(self.halflife, self.fast_halflife)
+        return state
+
+    def _expire(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        heap, seen = self._seen_heap, self._seen
+        while heap and heap[0][0] < cutoff:
+            seen.pop(heapq.heappop(heap)[1], None)
+        for state in self._states.values():
+            state.expire(cutoff)
+
+    def fold(self, items: Iterable[Dict], tickers: List[str], now: Optional[float] = None) -> int:
+        """Folds scored items into the per-ticker state at their publish time; returns how many were new."""
+        now = time.time() if now is None else now
+        cutoff = now - self.window_seconds
+        matcher = get_ticker_matcher(tickers)
+        folded = 0
+        with self._lock:
+            for item in items:
+                key = source_id_for(item)
+                if key in self._seen:
+                    continue
+                published = item_published_at(item)
+                ts = min(published.timestamp(), now) if published else now
+                if ts < cutoff:
+                    continue
+                self._seen[key] = ts
+                heapq.heappush(self._seen_heap, (ts, key))
+                score = float(item.get("sentiment", NEUTRAL))
+                seq = next(self._seq)
+                for t in matcher.find(item.get("text", "")):
+                    self._state(t).add(score, ts, seq)
+                folded += 1
+            self._expire(now)
+        return folded
+
+    def signal(self, ticker: str, now: Optional[float] = None) -> Dict:
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._states.get(ticker)
+            if state is not None:
+                state.expire(now - self.window_seconds)
+            count = len(state.window) if state else 0
+            score = state.window_sum / count if count else NEUTRAL
+            slow = state.slow.value if state else None
+            fast = state.fast.value if state else None
+            total = state.total if state else 0
+        signal_type = "bullish" if score > self.bullish else ("bearish" if score < self.bearish else "neutral")
+        return {
+            "id": signal_id(ticker),
+            "ticker": ticker,
+            "type": signal_type,
+            "score": round(score, 2),
+            "confidence": round(abs(score - NEUTRAL) * 2, 2),  # 0 to 1
+            "action": "buy" if signal_type == "bullish" else ("short" if signal_type == "bearish" else "hold"),
+            "timestamp": datetime.fromtimestamp(now, tz=timezone.utc).isoformat(),
+            "evidenceCount": count,
+            "evidenceTotal": total,
+            "ewma": round(slow, 4) if slow is not None else None,
+            "momentum": round(fast - slow, 4) if slow is not None else 0.0,
+        }
+
+    def signals(self, tickers: List[str], now: Optional[float] = None) -> List[Dict]:
+        now = time.time() if now is None else now
+        return [self.signal(t, now) for t in tickers]
+
+    def update(self, items: Iterable[Dict], tickers: List[str], now: Optional[float] = None) -> List[Dict]:
+        """fold() then signals(): the per-refresh entry point."""
+        now = time.time() if now is None else now
+        self.fold(items, tickers, now)
+        return self.signals(tickers, now)
+
+
+_aggregator: Optional[SignalAggregator] = None
+_aggregator_lock = threading.Lock()
+
+
+def get_signal_aggregator() -> SignalAggregator:
+    global _aggregator
+    with _aggregator_lock:
+        if _aggregator is None:
+            _aggregator = SignalAggregator()
+        return _aggregator
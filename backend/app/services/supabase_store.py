@@ -1,10 +1,20 @@
 """
 Supabase persistence helpers for MarketSentinel.
 If SUPABASE_URL/KEY are not set or any call fails, functions fall back to in-memory lists.
+Watchlists are cached in process (read-through, patched on mutation) and mutations are single upserts/deletes.
+Signal rows are written behind: store_signals only enqueues, and a background thread inserts them in batches
+(by size or age), skipping ticks identical to the previous one and spilling to a local JSONL file while
+Supabase is unreachable. Spilled rows are replayed on the next successful flush.
 """
 import os
+import json
+import atexit
 import logging
-from typing import List, Dict, Optional
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Dict, Optional
 
 logger = logging.getLogger("supabase_store")
 
@@ -12,6 +22,11 @@ _SUPABASE_URL = os.getenv("SUPABASE_URL")
 _SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 _supabase = None
 
+WATCHLIST_CACHE_TTL = float(os.getenv("WATCHLIST_CACHE_TTL", "60"))
+SIGNAL_BATCH_SIZE = int(os.getenv("SIGNAL_BATCH_SIZE", "500"))
+SIGNAL_FLUSH_SECONDS = float(os.getenv("SIGNAL_FLUSH_SECONDS", "5"))
+SIGNAL_SPILL_PATH = Path(__file__).parent.parent / "data" / "signals_spill.jsonl"
+
 _inmem_watchlists = {"demo": []}
 
 try:
@@ -23,21 +38,66 @@ except Exception as e:
     _supabase = None
 
 
+# Read-through caches: user -> watchlist id, watchlist id -> (tickers, loaded_at). Mutations hold the user's
+# lock while they write and patch the cache, and cache misses load under it too, so concurrent requests for one
+# user cannot interleave a stale read with a write. Ticker lists expire after WATCHLIST_CACHE_TTL to pick up changes made by other processes.
+_watchlist_ids: Dict[str, str] = {}
+_watchlist_tickers: Dict[str, tuple] = {}
+_cache_lock = threading.Lock()
+_user_locks: Dict[str, threading.Lock] = {}
+
+
+def _user_lock(user_id: str) -> threading.Lock:
+    with _cache_lock:
+        return _user_locks.setdefault(user_id, threading.Lock())
+
+
+def _invalidate(user_id: str) -> None:
+    with _cache_lock:
+        wl_id = _watchlist_ids.pop(user_id, None)
+        _watchlist_tickers.pop(wl_id, None)
+
+
 def _ensure_watchlist(user_id: str) -> Optional[str]:
     """Ensure a single default watchlist exists for user; return watchlist_id or None on failure."""
     if not _supabase:
         return None
+    with _cache_lock:
+        if user_id in _watchlist_ids:
+            return _watchlist_ids[user_id]
     try:
-        # Try to find existing
-        data = _supabase.table("watchlists").select("id").eq("user_id", user_id).limit(1).execute()
-        if data.data:
-            return data.data[0]["id"]
-        # Create new
-        inserted = _supabase.table("watchlists").insert({"user_id": user_id, "name": "default"}).execute()
-        return inserted.data[0]["id"] if inserted.data else None
+        # One round trip: returns the existing row or creates it (unique on user_id, name)
+        res = _supabase.table("watchlists").upsert({"user_id": user_id, "name": "default"}, on_conflict="user_id,name").execute()
+        wl_id = res.data[0]["id"] if res.data else None
     except Exception as e:
         logger.warning(f"_ensure_watchlist failed: {e}")
         return None
+    if wl_id:
+        with _cache_lock:
+            _watchlist_ids[user_id] = wl_id
+    return wl_id
+
+
+def _cached_tickers(wl_id: str) -> Optional[List[str]]:
+    with _cache_lock:
+        cached = _watchlist_tickers.get(wl_id)
+    if cached is None or time.monotonic() - cached[1] > WATCHLIST_CACHE_TTL:
+        return None
+    return list(cached[0])
+
+
+def _cache_tickers(wl_id: str, tickers: List[str]) -> None:
+    with _cache_lock:
+        _watchlist_tickers[wl_id] = (list(tickers), time.monotonic())
+
+
+def _load_tickers(wl_id: str) -> List[str]:
+    tickers = _cached_tickers(wl_id)
+    if tickers is None:
+        res = _supabase.table("watchlist_tickers").select("ticker").eq("watchlist_id", wl_id).execute()
+        tickers = [row["ticker"] for row in (res.data or [])]
+        _cache_tickers(wl_id, tickers)
+    return tickers
 
 
 def get_watchlist(user_id: str) -> List[str]:
@@ -46,23 +106,39 @@ def get_watchlist(user_id: str) -> List[str]:
             wl_id = _ensure_watchlist(user_id)
             if not wl_id:
                 return []
-            res = _supabase.table("watchlist_tickers").select("ticker").eq("watchlist_id", wl_id).execute()
-            return [row["ticker"] for row in (res.data or [])]
+            tickers = _cached_tickers(wl_id)
+            if tickers is not None:
+                return tickers
+            # Miss: read under the user's lock so a read that races a mutation cannot cache the stale list
+            with _user_lock(user_id):
+                return _load_tickers(wl_id)
         except Exception as e:
             logger.warning(f"get_watchlist supabase failed: {e}")
+            _invalidate(user_id)
     # Fallback
     return _inmem_watchlists.get(user_id, [])
 
 
 def add_ticker(user_id: str, ticker: str) -> List[str]:
     if _supabase:
-        try:
-            wl_id = _ensure_watchlist(user_id)
-            if wl_id:
-                _supabase.table("watchlist_tickers").insert({"watchlist_id": wl_id, "ticker": ticker}).execute()
-                return get_watchlist(user_id)
-        except Exception as e:
-            logger.warning(f"add_ticker supabase failed: {e}")
+        with _user_lock(user_id):
+            try:
+                wl_id = _ensure_watchlist(user_id)
+                if wl_id:
+                    # Unique on (watchlist_id, ticker), so adding an existing ticker is a no-op
+                    _supabase.table("watchlist_tickers").upsert(
+                        {"watchlist_id": wl_id, "ticker": ticker}, on_conflict="watchlist_id,ticker", ignore_duplicates=True
+                    ).execute()
+                    tickers = _cached_tickers(wl_id)
+                    if tickers is None:
+                        return _load_tickers(wl_id)
+                    if ticker not in tickers:
+                        tickers.append(ticker)
+                        _cache_tickers(wl_id, tickers)
+                    return tickers
+            except Exception as e:
+                logger.warning(f"add_ticker supabase failed: {e}")
+                _invalidate(user_id)
     # Fallback
     lst = _inmem_watchlists.setdefault(user_id, [])
     if ticker not in lst and len(lst) < 6:
@@ -72,13 +148,21 @@ def add_ticker(user_id: str, ticker: str) -> List[str]:
 
 def remove_ticker(user_id: str, ticker: str) -> List[str]:
     if _supabase:
-        try:
-            wl_id = _ensure_watchlist(user_id)
-            if wl_id:
-                _supabase.table("watchlist_tickers").delete().eq("watchlist_id", wl_id).eq("ticker", ticker).execute()
-                return get_watchlist(user_id)
-        except Exception as e:
-            logger.warning(f"remove_ticker supabase failed: {e}")
+        with _user_lock(user_id):
+            try:
+                wl_id = _ensure_watchlist(user_id)
+                if wl_id:
+                    _supabase.table("watchlist_tickers").delete().eq("watchlist_id", wl_id).eq("ticker", ticker).execute()
+                    tickers = _cached_tickers(wl_id)
+                    if tickers is None:
+                        return _load_tickers(wl_id)
+                    if ticker in tickers:
+                        tickers.remove(ticker)
+                        _cache_tickers(wl_id, tickers)
+                    return tickers
+            except Exception as e:
+                logger.warning(f"remove_ticker supabase failed: {e}")
+                _invalidate(user_id)
     # Fallback
     lst = _inmem_watchlists.setdefault(user_id, [])
     if ticker in lst:
@@ -86,21 +170,140 @@ def remove_ticker(user_id: str, ticker: str) -> List[str]:
     return lst
 
 
+class SignalWriter:
+    """Write-behind queue for signal rows; `insert` receives one batch (list of rows) and raises on failure."""
+
+    def __init__(self, insert: Callable[[List[Dict]], None], batch_size: int = SIGNAL_BATCH_SIZE,
+                 flush_interval: float = SIGNAL_FLUSH_SECONDS, spill_path: Optional[Path] = SIGNAL_SPILL_PATH):
+        self.insert = insert
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spill_path = Path(spill_path) if spill_path else None
+        self._pending: List[Dict] = []
+        self._last_tick = None
+        self._cond = threading.Condition()
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="signal-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, rows: List[Dict]) -> bool:
+        """Enqueues one tick of rows without blocking; returns False if it repeats the previous tick."""
+        tick = [{k: v for k, v in r.items() if k != "created_at"} for r in rows]
+        with self._cond:
+            if not rows or tick == self._last_tick:
+                return False
+            self._last_tick = tick
+            self._pending.extend(rows)
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+        return True
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                closed = self._closed
+            self.flush()
+            if closed:
+                return
+
+    def _take(self) -> List[Dict]:
+        with self._cond:
+            rows, self._pending = self._pending, []
+        return rows
+
+    def _insert_batches(self, rows: List[Dict]) -> int:
+        """Inserts rows batch by batch; returns how many were inserted before the first failure."""
+        done = 0
+        for start in range(0, len(rows), self.batch_size):
+            batch = rows[start:start + self.batch_size]
+            try:
+                self.insert(batch)
+            except Exception as e:
+                logger.warning(f"store_signals supabase failed, spilling {len(rows) - done} rows: {e}")
+                break
+            done += len(batch)
+        return done
+
+    def flush(self) -> None:
+        """Inserts everything spilled earlier, then everything pending; whatever was not inserted (after the
+        first failed batch) replaces the spill file, so no row is inserted twice."""
+        with self._io_lock:
+            rows = self._take()
+            spilled = self._read_spill()
+            if not rows and not spilled:
+                return
+            queue = spilled + rows
+            done = self._insert_batches(queue)
+            if spilled or done < len(queue):
+                self._write_spill(queue[done:])
+
+    def _write_spill(self, rows: List[Dict]) -> None:
+        if not self.spill_path:
+            return
+        try:
+            if not rows:
+                self.spill_path.unlink(missing_ok=True)
+                return
+            self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.spill_path.with_name(self.spill_path.name + ".tmp")
+            with open(tmp, "w") as f:
+                for row in rows:
+                    f.write(json.dumps(row) + "\n")
+            os.replace(tmp, self.spill_path)
+        except Exception as e:
+            logger.error(f"Failed to spill signal rows: {e}")
+
+    def _read_spill(self) -> List[Dict]:
+        if not self.spill_path or not self.spill_path.exists():
+            return []
+        try:
+            with open(self.spill_path) as f:
+                return [json.loads(line) for line in f if line.strip()]
+        except Exception as e:
+            logger.error(f"Failed to read spilled signal rows: {e}")
+            return []
+
+    def close(self) -> None:
+        """Flushes what is pending and stops the background thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=max(self.flush_interval, 5))
+
+
+def _insert_signal_rows(rows: List[Dict]) -> None:
+    _supabase.table("signals").insert(rows).execute()
+
+
+_signal_writer: Optional[SignalWriter] = None
+_signal_writer_lock = threading.Lock()
+
+
+def get_signal_writer() -> SignalWriter:
+    global _signal_writer
+    with _signal_writer_lock:
+        if _signal_writer is None:
+            _signal_writer = SignalWriter(_insert_signal_rows)
+            atexit.register(_signal_writer.close)
+        return _signal_writer
+
+
 def store_signals(signals: List[Dict]) -> None:
+    """Queues signal rows for the background writer; never blocks on the network."""
     if not _supabase:
         return
-    try:
-        rows = [
-            {
-                "ticker": s.get("ticker"),
-                "signal_type": s.get("type"),
-                "score": s.get("score"),
-                "confidence": s.get("confidence"),
-            }
-            for s in signals
-        ]
-        # Insert ignoring errors
-        if rows:
-            _supabase.table("signals").insert(rows).execute()
-    except Exception as e:
-        logger.warning(f"store_signals supabase failed: {e}")
+    created_at = datetime.now(timezone.utc).isoformat()
+    rows = [
+        {
+            "ticker": s.get("ticker"),
+            "signal_type": s.get("type"),
+            "score": s.get("score"),
+            "confidence": s.get("confidence"),
+            "created_at": created_at,
+        }
+        for s in signals
+    ]
+    get_signal_writer().submit(rows)
@@ -0,0 +1,37 @@
+import asyncio
+from backend.app.services.broadcast_hub import BroadcastHub
+
+def test_single_producer_fans_out():
+    calls = []
+
+    async def producer(topics):
+        calls.append(set(topics))
+        return {"signals": {"tick": len(calls)}}
+
+    async def scenario():
+        hub = BroadcastHub(producer, interval=60)
+        subs = [hub.subscribe("signals") for _ in range(5)]
+        received = [await s.get() for s in subs]
+        for s in subs:
+            hub.unsubscribe(s)
+        return received
+
+    received = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert received == [{"tick": 1}] * 5
+
+def test_slow_consumer_is_dropped():
+    async def producer(topics):
+        return {}
+
+    async def scenario():
+        hub = BroadcastHub(producer, interval=60, queue_size=2, max_lagged_ticks=1)
+        fast, slow = hub.subscribe("signals"), hub.subscribe("signals")
+        for i in range(4):
+            hub.publish("signals", i)
+            await fast.get()
+        result = (slow.closed, await slow.get(), fast.closed)
+        hub.unsubscribe(fast)
+        return result
+
+    assert asyncio.run(scenario()) == (True, None, False)
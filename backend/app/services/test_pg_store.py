@@ -0,0 +1,59 @@
+import os
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from backend.app.services.pg_store import PgStore, source_id_for, to_stage_records
+
+def test_stage_records():
+    items = [
+        {"source": "4chan", "thread": 1, "no": 5, "text": "TSLA to the moon", "sentiment": 0.8},
+        {"source": "news", "url": "https://x/1", "text": "Apple beats", "published_ts": 0, "embedding": [0.5, 0.25]},
+        {"source": "reddit", "text": "no ids here"},
+    ]
+    records = to_stage_records(items, ["TSLA", "AAPL"])
+    assert [r[1] for r in records[:2]] == ["4chan:1/5", "news:https://x/1"]
+    assert records[0][3:5] == ("TSLA", ["TSLA"]) and records[0][10] == 0.8
+    assert records[1][9] == "[0.5,0.25]" and records[1][3] is None
+    assert source_id_for(items[2]) == source_id_for(dict(items[2]))
+
+def test_4chan_posts_are_keyed_by_post_number_not_poster_id():
+    # "id" is the poster's hash on ID-enabled boards, shared by all of their posts in a thread
+    a = {"source": "4chan", "thread": 1, "no": 5, "id": "Ab3dE", "text": "first"}
+    b = {"source": "4chan", "thread": 1, "no": 6, "id": "Ab3dE", "text": "second"}
+    assert (source_id_for(a), source_id_for(b)) == ("4chan:1/5", "4chan:1/6")
+    assert source_id_for({"source": "reddit", "id": "t3_x", "url": "u"}) == "reddit:t3_x"
+
+def test_persist_runs_on_one_store_loop_across_asyncio_run():
+    store = PgStore("postgresql://unused")
+    loops = []
+
+    async def copy(records):
+        loops.append(asyncio.get_running_loop())
+
+    store._copy = copy
+    for _ in range(3):
+        assert asyncio.run(store.persist([{"source": "news", "url": "https://x/1", "text": "AAPL"}])) == 1
+    assert len(set(loops)) == 1 and loops[0] is store._store_loop()
+
+@pytest.mark.skipif(not os.getenv("TEST_DATABASE_URL"), reason="needs a local Postgres with pgvector (TEST_DATABASE_URL)")
+def test_persist_dedupes_on_source_id():
+    import asyncpg
+    dsn = os.getenv("TEST_DATABASE_URL")
+    schema = (Path(__file__).parents[3] / "supabase_schema.sql").read_text()
+    items = [{"source": "news", "url": f"https://x/{i}", "text": f"AAPL story {i}", "embedding": [0.0] * 384} for i in range(2000)]
+
+    async def run():
+        conn = await asyncpg.connect(dsn)
+        await conn.execute(schema)
+        await conn.execute("TRUNCATE nlp_results, raw_items, documents CASCADE")
+        store = PgStore(dsn)
+        await store.persist(items, ["AAPL"])
+        await store.persist(items[:10] + [{"source": "news", "url": "https://x/new", "text": "AAPL new"}], ["AAPL"])
+        counts = [await conn.fetchval(f"SELECT count(*) FROM {t}") for t in ("raw_items", "nlp_results", "documents")]
+        await store.close()
+        await conn.close()
+        return counts
+
+    assert asyncio.run(run()) == [2001, 2001, 2001]
@@ -0,0 +1,39 @@
+from backend.app.services.signal_aggregator import SignalAggregator, signal_id
+
+def _item(i, text, sentiment):
+    return {"source": "test", "id": str(i), "text": text, "sentiment": sentiment}
+
+def test_folds_only_new_items_and_tracks_window_and_momentum():
+    agg = SignalAggregator(window_seconds=100, halflife=40, momentum_ratio=4)
+    tickers = ["AAPL", "TSLA"]
+    first = [_item(1, "AAPL beats", 0.9), _item(2, "AAPL and TSLA", 0.7), _item(3, "nothing here", 0.1)]
+    assert agg.fold(first, tickers, now=0) == 3
+    # A full re-fetch of the same items is not double counted
+    assert agg.fold(first, tickers, now=10) == 0
+
+    aapl, tsla = agg.signals(tickers, now=10)
+    assert aapl["evidenceCount"] == 2 and aapl["score"] == 0.8 and aapl["type"] == "bullish"
+    assert aapl["id"] == signal_id("AAPL") and aapl["momentum"] == 0.0
+    assert tsla["evidenceCount"] == 1
+
+    agg.fold([_item(4, "AAPL misses", 0.1)], tickers, now=50)
+    aapl = agg.signal("AAPL", now=50)
+    assert aapl["evidenceCount"] == 3 and aapl["momentum"] < 0 and aapl["ewma"] < 0.8
+
+    # The first batch leaves the window; the EWMA and total still remember it
+    aapl = agg.signal("AAPL", now=120)
+    assert aapl["evidenceCount"] == 1 and aapl["score"] == 0.1 and aapl["type"] == "bearish"
+    assert aapl["evidenceTotal"] == 3 and aapl["id"] == signal_id("AAPL")
+    assert agg.signal("MSFT", now=120)["type"] == "neutral"
+
+def test_items_are_windowed_by_publish_time():
+    agg = SignalAggregator(window_seconds=100, halflife=40)
+    feed = [{**_item(1, "AAPL old", 0.9), "time": 950}, {**_item(2, "AAPL new", 0.1), "time": 1040},
+            {**_item(3, "AAPL stale", 0.9), "time": 500}]
+    assert agg.fold(feed, ["AAPL"], now=1050) == 2  # the stale item is already outside the window
+    assert agg.signal("AAPL", now=1050)["evidenceCount"] == 2
+    # Re-fetching the same feed a window later does not re-fold anything, even items that have since expired
+    assert agg.fold(feed, ["AAPL"], now=1100) == 0
+    aapl = agg.signal("AAPL", now=1100)
+    assert aapl["evidenceCount"] == 1 and aapl["score"] == 0.1
+    assert agg.fold(feed, ["AAPL"], now=1200) == 0
@@ -0,0 +1,138 @@
+import json
+from backend.app.services.supabase_store import SignalWriter
+
+def test_signal_writer_batches_coalesces_and_spills(tmp_path):
+    inserted = []
+    online = {"up": False}
+
+    def insert(rows):
+        if not online["up"]:
+            raise ConnectionError("supabase unreachable")
+        inserted.append(list(rows))
+
+    writer = SignalWriter(insert, batch_size=100, flush_interval=60, spill_path=tmp_path / "spill.jsonl")
+    tick = [{"ticker": "AAPL", "signal_type": "bullish", "score": 0.7, "confidence": 0.8, "created_at": "t1"}]
+    assert writer.submit(tick)
+    # Same signals on the next tick are coalesced even though the timestamp moved
+    assert not writer.submit([{**tick[0], "created_at": "t2"}])
+    writer.flush()
+    assert inserted == [] and (tmp_path / "spill.jsonl").exists()
+
+    online["up"] = True
+    writer.submit([{**tick[0], "score": 0.9, "created_at": "t3"}])
+    writer.close()
+    assert [r["created_at"] for batch in inserted for r in batch] == ["t1", "t3"]
+    assert not (tmp_path / "spill.jsonl").exists()
+
+def test_signal_writer_respills_exactly_the_rows_not_inserted(tmp_path):
+    inserted = []
+    calls = {"n": 0}
+
+    def insert(rows):
+        calls["n"] += 1
+        if calls["n"] == 2:
+            raise ConnectionError("supabase dropped the connection")
+        inserted.extend(r["i"] for r in rows)
+
+    spill = tmp_path / "spill.jsonl"
+    spill.write_text("".join(f'{{"i": {i}}}\n' for i in range(5)))
+    writer = SignalWriter(insert, batch_size=2, flush_interval=60, spill_path=spill)
+    writer.submit([{"i": 5}])
+    writer.flush()  # of batches [0, 1], [2, 3], [4, 5] the second fails
+    assert inserted == [0, 1]
+    assert [json.loads(line)["i"] for line in spill.read_text().splitlines()] == [2, 3, 4, 5]
+    writer.close()
+    assert inserted == list(range(6)) and not spill.exists()
+
+
+class _FakeQuery:
+    def __init__(self, db, table):
+        self.db, self.table, self.op, self.filters, self.row = db, table, "select", {}, None
+
+    def select(self, *cols):
+        return self
+
+    def upsert(self, row, on_conflict="", ignore_duplicates=False):
+        self.op, self.row = "upsert", row
+        return self
+
+    def delete(self):
+        self.op = "delete"
+        return self
+
+    def eq(self, col, value):
+        self.filters[col] = value
+        return self
+
+    def execute(self):
+        self.db.round_trips += 1
+        rows = self.db.rows.setdefault(self.table, [])
+        if self.op == "upsert":
+            keys = ("user_id", "name") if self.table == "watchlists" else ("watchlist_id", "ticker")
+            match = [r for r in rows if all(r[k] == self.row[k] for k in keys)]
+            if not match:
+                match = [{"id": f"wl{len(rows)}", **self.row}]
+                rows.extend(match)
+            data = match
+        elif self.op == "delete":
+            data = [r for r in rows if all(r.get(k) == v for k, v in self.filters.items())]
+            self.db.rows[self.table] = [r for r in rows if r not in data]
+        else:
+            data = [r for r in rows if all(r.get(k) == v for k, v in self.filters.items())]
+        return type("Result", (), {"data": data})()
+
+
+class _FakeSupabase:
+    def __init__(self):
+        self.rows, self.round_trips = {}, 0
+
+    def table(self, name):
+        return _FakeQuery(self, name)
+
+
+def test_watchlist_cache_and_single_round_trip_mutations(monkeypatch):
+    from backend.app.services import supabase_store
+    fake = _FakeSupabase()
+    monkeypatch.setattr(supabase_store, "_supabase", fake)
+    monkeypatch.setattr(supabase_store, "_watchlist_ids", {})
+    monkeypatch.setattr(supabase_store, "_watchlist_tickers", {})
+
+    assert supabase_store.get_watchlist("u1") == []  # upsert watchlist + select tickers
+    assert fake.round_trips == 2
+    assert supabase_store.add_ticker("u1", "AAPL") == ["AAPL"]
+    assert supabase_store.add_ticker("u1", "AAPL") == ["AAPL"]
+    assert supabase_store.remove_ticker("u1", "AAPL") == []
+    assert supabase_store.get_watchlist("u1") == []
+    assert fake.round_trips == 5
+    assert fake.rows["watchlist_tickers"] == []
+
+def test_watchlist_miss_does_not_cache_a_read_that_raced_a_mutation(monkeypatch):
+    import threading
+    from backend.app.services import supabase_store
+    fake = _FakeSupabase()
+    monkeypatch.setattr(supabase_store, "_supabase", fake)
+    monkeypatch.setattr(supabase_store, "_watchlist_ids", {"u1": "wl0"})
+    monkeypatch.setattr(supabase_store, "_watchlist_tickers", {})
+    monkeypatch.setattr(supabase_store, "_user_locks", {})
+    reading, release = threading.Event(), threading.Event()
+    execute = _FakeQuery.execute
+
+    def slow_execute(self):
+        if self.op == "select" and not reading.is_set():
+            result = execute(self)  # the first read snapshots the list before the concurrent add lands
+            reading.set()
+            release.wait(1)
+            return result
+        return execute(self)
+
+    monkeypatch.setattr(_FakeQuery, "execute", slow_execute)
+    reader = threading.Thread(target=supabase_store.get_watchlist, args=("u1",))
+    reader.start()
+    reading.wait(1)
+    writer = threading.Thread(target=supabase_store.add_ticker, args=("u1", "AAPL"))
+    writer.start()
+    writer.join(0.2)  # blocked on the user's lock until the read is done
+    release.set()
+    reader.join()
+    writer.join()
+    assert supabase_store.get_watchlist("u1") == ["AAPL"]
@@ -1,5 +1,7 @@
 -- Supabase/Postgres schema for MarketSentinel
 
+CREATE EXTENSION IF NOT EXISTS vector;
+
 CREATE TABLE IF NOT EXISTS users (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     email TEXT UNIQUE NOT NULL,
@@ -21,6 +23,29 @@ CREATE TABLE IF NOT EXISTS watchlist_tickers (
     added_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- Targets for the single-round-trip upserts in services/supabase_store.py. Existing duplicates would make the
+-- unique indexes fail, so first fold each user's duplicate watchlists into the oldest one, then drop repeats.
+WITH ranked AS (
+    SELECT id, first_value(id) OVER (PARTITION BY user_id, name ORDER BY created_at, id) AS keep_id
+    FROM watchlists WHERE user_id IS NOT NULL
+)
+UPDATE watchlist_tickers wt SET watchlist_id = r.keep_id
+FROM ranked r WHERE wt.watchlist_id = r.id AND r.id <> r.keep_id;
+DELETE FROM watchlists WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (PARTITION BY user_id, name ORDER BY created_at, id) AS n
+        FROM watchlists WHERE user_id IS NOT NULL
+    ) d WHERE n > 1
+);
+DELETE FROM watchlist_tickers WHERE id IN (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (PARTITION BY watchlist_id, ticker ORDER BY added_at, id) AS n
+        FROM watchlist_tickers WHERE watchlist_id IS NOT NULL
+    ) d WHERE n > 1
+);
+CREATE UNIQUE INDEX IF NOT EXISTS watchlists_user_name ON watchlists (user_id, name);
+CREATE UNIQUE INDEX IF NOT EXISTS watchlist_tickers_watchlist_ticker ON watchlist_tickers (watchlist_id, ticker);
+
 CREATE TABLE IF NOT EXISTS raw_items (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     source TEXT NOT NULL,
@@ -29,8 +54,12 @@ CREATE TABLE IF NOT EXISTS raw_items (
     fetched_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+-- services/pg_store.py skips items it has already stored (ON CONFLICT (source_id) DO NOTHING)
+CREATE UNIQUE INDEX IF NOT EXISTS raw_items_source_id ON raw_items (source_id);
+
 CREATE TABLE IF NOT EXISTS documents (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    source_id TEXT,
     ticker TEXT NOT NULL,
     title TEXT,
     url TEXT,
@@ -42,6 +71,16 @@ CREATE TABLE IF NOT EXISTS documents (
     created_at TIMESTAMP WITH TIME ZONE DEFAULT now()
 );
 
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS source_id TEXT;
+CREATE UNIQUE INDEX IF NOT EXISTS documents_source_id ON documents (source_id);
+-- RAG retrieval (rag/pgvector_retriever.py): HNSW over normalized MiniLM vectors, plus the metadata filters
+CREATE INDEX IF NOT EXISTS documents_embedding_hnsw ON documents USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+CREATE INDEX IF NOT EXISTS documents_ticker_published ON documents (ticker, published_at);
+-- Every ticker a row mentions; the retriever filters with tickers && ARRAY[...] (an empty array matches any filter)
+ALTER TABLE documents ADD COLUMN IF NOT EXISTS tickers TEXT[] NOT NULL DEFAULT '{}';
+UPDATE documents SET tickers = ARRAY[ticker] WHERE tickers = '{}' AND ticker <> '';
+CREATE INDEX IF NOT EXISTS documents_tickers ON documents USING gin (tickers);
+
 CREATE TABLE IF NOT EXISTS nlp_results (
     id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
     item_id UUID REFERENCES raw_items(id),